@@ -27,5 +27,8 @@ setuptools.setup(
         "Topic :: Software Development :: Libraries",
         "Development Status :: 3 - Alpha",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
+    extras_require={
+        "numpy": ["numpy"],
+    },
 )
@@ -0,0 +1,163 @@
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+"""A device answering the enumeration ioctls from a table, without hardware.
+
+The table maps pixel formats to their frame sizes::
+
+    {V4l2PixFormats.YUYV: [(640, 480, [(1, 30), (1, 15)]),
+                           Stepwise(16, 1920, 16, 16, 1080, 8, (1, 30)),
+                           ],
+     }
+
+Discrete sizes are (width, height, intervals) tuples, where every interval is
+a (numerator, denominator) tuple.
+"""
+from collections import namedtuple, Counter
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from v4l2ctl import EndOfEnumeration, V4l2BufferType  # noqa E402
+from v4l2ctl.ioctls import V4l2FrameSizeTypes, \
+                           V4l2FrameIvalTypes  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlstructs import V4l2IoctlCapability, \
+                                            V4l2IoctlFmtDesc, \
+                                            V4l2IoctlFrameSizeEnum, \
+                                            V4l2IoctlFrameIvalEnum  # noqa E402
+from v4l2ctl.v4l2format import V4l2Format  # noqa E402
+
+
+#: A stepwise frame size with one interval for all sizes.
+Stepwise = namedtuple("Stepwise", ["min_width", "max_width", "step_width",
+                                   "min_height", "max_height", "step_height",
+                                   "interval"])
+
+
+class FakeRequest(object):
+    """Stands in for an IoctlAbstraction."""
+    def __init__(self, func):
+        self._func = func
+
+    def __call__(self, **kwargs):
+        return self._func(**kwargs)
+
+    reuse = __call__
+
+
+class FakeIocOps(object):
+    def __init__(self, formats, card="Fake camera", bus_info="usb-1"):
+        self.formats = formats
+        self.card = card
+        self.bus_info = bus_info
+        #: The number of calls per ioctl.
+        self.calls = Counter()
+        for name in ("query_cap", "enum_fmt", "enum_frame_sizes",
+                     "enum_frame_intervals"):
+            setattr(self, name, FakeRequest(getattr(self, name)))
+
+    def _end(self, name):
+        return EndOfEnumeration("/dev/fake", name, 0, -1)
+
+    def query_cap(self):
+        self.calls["query_cap"] += 1
+        return V4l2IoctlCapability(driver=b"fake",
+                                   card=self.card.encode(),
+                                   bus_info=self.bus_info.encode(),
+                                   version=0x050400,
+                                   )
+
+    def enum_fmt(self, index, type):
+        self.calls["enum_fmt"] += 1
+        try:
+            pixel_format = list(self.formats)[index]
+        except IndexError:
+            raise self._end("VIDIOC_ENUM_FMT") from None
+        return V4l2IoctlFmtDesc(index=index,
+                                type=type,
+                                description=pixel_format.name.encode(),
+                                pixelformat=pixel_format,
+                                )
+
+    def enum_frame_sizes(self, index, pixel_format):
+        self.calls["enum_frame_sizes"] += 1
+        sizes = self.formats[pixel_format]
+        if index >= len(sizes):
+            raise self._end("VIDIOC_ENUM_FRAMESIZES")
+        size = sizes[index]
+        frm_size = V4l2IoctlFrameSizeEnum(index=index,
+                                          pixel_format=pixel_format)
+        if isinstance(size, Stepwise):
+            frm_size.type = (V4l2FrameSizeTypes.CONTINUOUS
+                             if size.step_width == size.step_height == 1
+                             else V4l2FrameSizeTypes.STEPWISE)
+            for field in Stepwise._fields[:-1]:
+                setattr(frm_size.stepwise, field, getattr(size, field))
+        else:
+            frm_size.type = V4l2FrameSizeTypes.DISCRETE
+            frm_size.discrete.width, frm_size.discrete.height = size[:2]
+        return frm_size
+
+    def enum_frame_intervals(self, index, pixel_format, width, height):
+        self.calls["enum_frame_intervals"] += 1
+        intervals = []
+        for size in self.formats[pixel_format]:
+            if isinstance(size, Stepwise):
+                if (size.min_width <= width <= size.max_width and
+                        size.min_height <= height <= size.max_height):
+                    intervals = [size.interval]
+                    break
+            elif size[:2] == (width, height):
+                intervals = size[2]
+                break
+        if index >= len(intervals):
+            raise self._end("VIDIOC_ENUM_FRAMEINTERVALS")
+        frm_ival = V4l2IoctlFrameIvalEnum(index=index,
+                                          pixel_format=pixel_format,
+                                          width=width,
+                                          height=height,
+                                          type=V4l2FrameIvalTypes.DISCRETE,
+                                          )
+        frm_ival.discrete.numerator, frm_ival.discrete.denominator = \
+            intervals[index]
+        return frm_ival
+
+
+class FakeDevice(object):
+    """The part of V4l2Device needed to enumerate formats."""
+    def __init__(self, formats, **kwargs):
+        self._ioc_ops = FakeIocOps(formats, **kwargs)
+        self.buffer_type = V4l2BufferType.VIDEO_CAPTURE
+        self.device = "/dev/fake"
+
+    @property
+    def calls(self):
+        return self._ioc_ops.calls
+
+    def iter_buffer_formats(self, buffer_type):
+        idx = 0
+        while True:
+            try:
+                fmt_desc = self._ioc_ops.enum_fmt(index=idx, type=buffer_type)
+            except EndOfEnumeration:
+                break
+            yield V4l2Format(self._ioc_ops, fmt_desc)
+            idx += 1
+
+    @property
+    def formats(self):
+        return self.iter_buffer_formats(self.buffer_type)
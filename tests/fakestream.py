@@ -0,0 +1,231 @@
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+"""Streams running without hardware.
+
+:class:`PipeStream` is a started stream whose device file is a pipe. Writing
+buffer indices to the pipe (see :meth:`PipeStream.make_ready`) makes these
+buffers ready to be dequeued, in order.
+"""
+from collections import Counter, namedtuple, deque
+import mmap
+import os
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from v4l2ctl import V4l2MmapStream, V4l2BufferType, \
+                    IoctlError, IoctlWouldBlock  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlstructs import V4l2IoctlBuffer  # noqa E402
+
+
+class FakeIocOps(object):
+    """Exports every buffer plane as a duplicate of /dev/null and records the
+    queued buffers.
+
+    The buffers are buffer_size bytes each, one after the other in the device
+    file. DQBUF returns the buffers appended to ready, and a request fails
+    with IoctlError while its name is in failing.
+    """
+    buffer_size = mmap.PAGESIZE
+
+    def __init__(self):
+        self.calls = Counter()
+        self.exported = []
+        self.queued = []
+        self.ready = deque()
+        self.failing = set()
+        self.requested_counts = []
+        request = namedtuple("Request", ["precompile"])
+        self.queue_buffer = request(self._precompile_queue)
+        self.dequeue_buffer = request(self._precompile_dequeue)
+        self.export_buffer = request(self._precompile_export)
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if name in self.failing:
+            raise IoctlError("/dev/fake", name, 0, -1)
+
+    def _precompile_queue(self, **fields):
+        planes = None
+        if fields.get("type") == V4l2BufferType.VIDEO_CAPTURE_MPLANE:
+            planes = fields.pop("m").planes
+        elif "m" in fields:
+            # Like the real request, keep a copy of the preset fields.
+            fields["userptr"] = fields.pop("m").userptr
+
+        def queue_buffer(**kwargs):
+            self.queued.append(dict(fields, **kwargs))
+            if planes is not None:
+                # The driver writes the plane information back.
+                for plane in range(fields["length"]):
+                    planes[plane].bytesused = 0
+                    planes[plane].data_offset = 0
+        return queue_buffer
+
+    def _precompile_dequeue(self, **fields):
+        def dequeue_buffer():
+            self.calls["dequeue_buffer"] += 1
+            if not self.ready:
+                raise IoctlWouldBlock("/dev/fake", "DequeueBuffer", 0, -1)
+            return self.ready.popleft()
+        return dequeue_buffer
+
+    def _precompile_export(self, **fields):
+        def export_buffer(index, plane):
+            self.calls["export_buffer"] += 1
+            fd = os.open(os.devnull, fields["flags"])
+            self.exported.append(fd)
+            return namedtuple("Export", ["fd"])(fd)
+        return export_buffer
+
+    def request_buffers(self, count, type, memory):
+        self.requested_counts.append(count)
+        self._call("request_buffers")
+        return namedtuple("RequestBuffers", ["count"])(count)
+
+    def query_buffer(self, index, type, memory):
+        self._call("query_buffer")
+        buf = V4l2IoctlBuffer(index=index,
+                              type=type,
+                              memory=memory,
+                              length=self.buffer_size)
+        buf.m.offset = index * self.buffer_size
+        return buf
+
+    def stream_on(self, value):
+        self._call("stream_on")
+
+    def stream_off(self, value):
+        self._call("stream_off")
+
+
+class FakeStreamDevice(object):
+    """The part of V4l2Device needed by streams."""
+    def __init__(self, buffer_type, sizeimage=0, device="/dev/fake"):
+        self._ioc_ops = FakeIocOps()
+        self.buffer_type = buffer_type
+        self.device = device
+        self.active_format = namedtuple("Format", ["sizeimage"])(sizeimage)
+        #: The number of _open() calls not balanced by close() yet.
+        self.opened = 0
+        self.private = False
+
+    def _open(self, private=False):
+        self.opened += 1
+        self.private = private
+
+    def close(self):
+        self.opened -= 1
+
+
+#: What the fake DQBUF returns.
+FakeBuffer = namedtuple("FakeBuffer", ["index", "bytesused", "sequence",
+                                       "timestamp", "flags", "field",
+                                       "length"],
+                        defaults=[1])
+FakeTimeval = namedtuple("FakeTimeval", ["tv_sec", "tv_usec"])
+
+
+def fake_buffer(index, bytesused, sequence=0):
+    """A filled single-planar buffer without a timestamp."""
+    return FakeBuffer(index, bytesused, sequence, FakeTimeval(0, 0), 0, 1)
+
+
+class PipeStream(V4l2MmapStream):
+    """A started stream over a pipe, with buffers holding b"frame<index>".
+
+    The frames are numbered and timestamped as if captured every period
+    microseconds.
+    """
+    period = 33333
+    buffer_type = V4l2BufferType.VIDEO_CAPTURE
+
+    def __init__(self, buffer_count=3, device="/dev/fake"):
+        self.read_fd, self.write_fd = os.pipe()
+        fake_device = FakeStreamDevice(self.buffer_type, device=device)
+        fake_device.fileno = lambda: self.read_fd
+        super().__init__(fake_device)
+        self._views = [self._make_views(index)
+                       for index in range(buffer_count)]
+        self._streaming = True
+        self._dequeue_buffer = self._read_index
+        self._sequence = 0
+
+    @staticmethod
+    def _make_views(index):
+        return (memoryview("frame{}".format(index).encode()),)
+
+    def make_ready(self, *indices):
+        os.write(self.write_fd, bytes(indices))
+
+    def drop(self, count=1):
+        """Skip sequence numbers, as if the driver dropped frames."""
+        self._sequence += count
+
+    def _read_index(self):
+        try:
+            index = os.read(self.read_fd, 1)
+        except BlockingIOError:
+            raise IoctlWouldBlock(self._device.device, "DequeueBuffer", 0,
+                                  -1) from None
+        sequence = self._sequence
+        self._sequence += 1
+        usec = 100000000 + sequence * self.period
+        return FakeBuffer(index[0],
+                          len(self._views[index[0]][0]),
+                          sequence,
+                          FakeTimeval(usec // 1000000, usec % 1000000),
+                          0,
+                          1)
+
+    @property
+    def requeued(self):
+        """The indices of the buffers handed back to the driver."""
+        return [fields["index"] for fields in self._device._ioc_ops.queued]
+
+    def close(self):
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+class MplanePipeStream(PipeStream):
+    """A multi-planar PipeStream, with buffers holding b"frame<index>Y" and
+    b"UV<index>".
+
+    DQBUF writes the plane information into the stream's plane array, like
+    the driver does. Then, after_dequeue is called once, if set, e.g., to
+    release a frame as if another thread did it at this very moment.
+    """
+    buffer_type = V4l2BufferType.VIDEO_CAPTURE_MPLANE
+    after_dequeue = None
+
+    @staticmethod
+    def _make_views(index):
+        return (memoryview("frame{}Y".format(index).encode()),
+                memoryview("UV{}".format(index).encode()))
+
+    def _read_index(self):
+        buf = super()._read_index()
+        views = self._views[buf.index]
+        for plane, view in enumerate(views):
+            self._planes[plane].bytesused = len(view)
+            self._planes[plane].data_offset = 0
+        after_dequeue, self.after_dequeue = self.after_dequeue, None
+        if after_dequeue is not None:
+            after_dequeue()
+        return buf._replace(length=len(views))
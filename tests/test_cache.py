@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import os
+import site
+import warnings
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from fakedevice import FakeDevice, Stepwise  # noqa E402
+from v4l2ctl import V4l2FormatCache, V4l2BufferType  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlformatenums import V4l2PixFormats  # noqa E402
+
+
+FORMATS = {V4l2PixFormats.YUYV: [(640, 480, [(1, 30), (1, 15)]),
+                                 (1280, 720, [(1, 10)]),
+                                 ],
+           V4l2PixFormats.MJPEG: [Stepwise(16, 1920, 16, 16, 1080, 8,
+                                           (1, 30)),
+                                  ],
+           }
+
+
+def walk(formats):
+    return [(fmt.format, fmt.description,
+             [(size.type, size.width, size.height,
+               [ival.interval for ival in size.intervals()]
+               if size.type == 1 else None)
+              for size in fmt.sizes()])
+            for fmt in formats]
+
+
+class FormatCacheTest(TestCase):
+    def setUp(self):
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "cache" / "formats.json"
+
+    def test_miss_enumerates(self):
+        device = FakeDevice(FORMATS)
+        formats = V4l2FormatCache(self.path).formats(device)
+        self.assertEqual(walk(formats), walk(FakeDevice(FORMATS).formats))
+        self.assertTrue(self.path.exists())
+
+    def test_hit_from_file(self):
+        V4l2FormatCache(self.path).formats(FakeDevice(FORMATS))
+
+        device = FakeDevice(FORMATS)
+        formats = V4l2FormatCache(self.path).formats(device)
+        tree = walk(formats)
+        # Only the identity has been checked.
+        self.assertEqual(dict(device.calls), {"query_cap": 1})
+        self.assertEqual(tree, walk(FakeDevice(FORMATS).formats))
+
+    def test_other_device(self):
+        cache = V4l2FormatCache(self.path)
+        cache.formats(FakeDevice(FORMATS))
+        other = FakeDevice({V4l2PixFormats.GREY: [(8, 8, [(1, 1)])]},
+                           bus_info="usb-2")
+        formats = cache.formats(other)
+        self.assertIn("enum_fmt", other.calls)
+        self.assertEqual([fmt.format for fmt in formats],
+                         [V4l2PixFormats.GREY])
+
+    def test_buffer_types(self):
+        cache = V4l2FormatCache(self.path)
+        device = FakeDevice(FORMATS)
+        cache.formats(device)
+        enum_calls = device.calls["enum_fmt"]
+        cache.formats(device, V4l2BufferType.VIDEO_OUTPUT)
+        self.assertGreater(device.calls["enum_fmt"], enum_calls)
+
+    def test_invalidate(self):
+        cache = V4l2FormatCache(self.path)
+        device = FakeDevice(FORMATS)
+        cache.formats(device)
+        cache.invalidate(device)
+        enum_calls = device.calls["enum_fmt"]
+        V4l2FormatCache(self.path).formats(device)
+        self.assertGreater(device.calls["enum_fmt"], enum_calls)
+
+    def test_corrupt_file(self):
+        self.path.parent.mkdir()
+        self.path.write_text("{not json")
+        device = FakeDevice(FORMATS)
+        formats = V4l2FormatCache(self.path).formats(device)
+        self.assertEqual(len(formats), 2)
+
+    def test_unwritable(self):
+        # A directory in the way of the file.
+        self.path.parent.mkdir()
+        self.path.mkdir()
+        device = FakeDevice(FORMATS)
+        cache = V4l2FormatCache(self.path)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            formats = cache.formats(device)
+        self.assertEqual(walk(formats), walk(FakeDevice(FORMATS).formats))
+        self.assertEqual(len(caught), 1)
+        self.assertIs(caught[0].category, RuntimeWarning)
+        # The temporary file was removed.
+        self.assertEqual(sorted(os.listdir(self.path.parent)),
+                         ["formats.json", "formats.json.lock"])
+        # Still cached in memory.
+        calls = device.calls["enum_fmt"]
+        with warnings.catch_warnings(record=True):
+            cache.formats(device)
+        self.assertEqual(device.calls["enum_fmt"], calls)
+
+    def test_merged_with_other_writers(self):
+        first = V4l2FormatCache(self.path)
+        first.formats(FakeDevice(FORMATS))
+        second = V4l2FormatCache(self.path)
+        second.formats(FakeDevice(FORMATS))
+        # Written by the first one after the second one loaded the file.
+        other = FakeDevice({V4l2PixFormats.GREY: [(8, 8, [(1, 1)])]},
+                           bus_info="usb-2")
+        first.formats(other)
+        second.formats(FakeDevice(FORMATS), V4l2BufferType.VIDEO_OUTPUT)
+
+        other_again = FakeDevice({V4l2PixFormats.GREY: [(8, 8, [(1, 1)])]},
+                                 bus_info="usb-2")
+        V4l2FormatCache(self.path).formats(other_again)
+        self.assertNotIn("enum_fmt", other_again.calls)
+
+    def test_stepwise_intervals_live(self):
+        device = FakeDevice(FORMATS)
+        V4l2FormatCache(self.path).formats(device)
+        formats = V4l2FormatCache(self.path).formats(device)
+        stepwise = next(formats[1].sizes())
+        calls = device.calls["enum_frame_intervals"]
+        next(stepwise.intervals())
+        self.assertEqual(device.calls["enum_frame_intervals"], calls + 1)
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from collections import Counter
+from ctypes import sizeof
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from v4l2ctl import V4l2Device, V4l2BufferType, V4l2DataFormat, \
+                    V4l2PlaneFormat, FeatureNotSupported  # noqa E402
+from v4l2ctl.ioctls import V4l2IocOps  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlstructs import V4l2IoctlFormat  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlformatenums import V4l2PixFormats  # noqa E402
+
+
+class FakeFormatRequest(object):
+    """Answers S_FMT/TRY_FMT by limiting the size to 1920x1080."""
+    def __init__(self, name, calls):
+        self._name = name
+        self._calls = calls
+
+    def into(self, buff):
+        self._calls[self._name] += 1
+        pix = buff.fmt.pix
+        pix.width = min(pix.width, 1920)
+        pix.height = min(pix.height, 1080)
+        pix.bytesperline = pix.width * 2
+        pix.sizeimage = pix.bytesperline * pix.height
+        return buff
+
+
+def make_device():
+    # A V4l2Device without a device file behind it.
+    device = V4l2Device.__new__(V4l2Device)
+    device._buffer_type = V4l2BufferType.VIDEO_CAPTURE
+    device._tried_formats = {}
+    device.calls = Counter()
+    ioc_ops = type("FakeIocOps", (object,), {})()
+    ioc_ops.set_format = FakeFormatRequest("set_format", device.calls)
+    ioc_ops.try_format = FakeFormatRequest("try_format", device.calls)
+    device._ioc_ops = ioc_ops
+    return device
+
+
+class DataFormatTest(TestCase):
+    def test_struct_size(self):
+        # The request codes encode the size, which must match the kernel's.
+        self.assertEqual(sizeof(V4l2IoctlFormat), 208)
+        self.assertEqual(V4l2IocOps.get_format.code, 0xC0D05604)
+        self.assertEqual(V4l2IocOps.set_format.code, 0xC0D05605)
+        self.assertEqual(V4l2IocOps.try_format.code, 0xC0D05640)
+
+    def test_single_planar(self):
+        data_format = V4l2DataFormat(V4l2PixFormats.YUYV, 640, 480,
+                                     bytesperline=1280, sizeimage=614400)
+        v4l2_format = data_format._to_v4l2(V4l2BufferType.VIDEO_CAPTURE)
+        self.assertEqual(v4l2_format.fmt.pix.width, 640)
+        self.assertEqual(V4l2DataFormat._from_v4l2(v4l2_format), data_format)
+        self.assertFalse(data_format.multiplanar)
+
+    def test_multi_planar(self):
+        planes = (V4l2PlaneFormat(640 * 480, 640),
+                  V4l2PlaneFormat(640 * 240, 640))
+        data_format = V4l2DataFormat(V4l2PixFormats.NV12M, 640, 480,
+                                     bytesperline=640,
+                                     sizeimage=640 * 720,
+                                     planes=planes)
+        v4l2_format = data_format._to_v4l2(
+            V4l2BufferType.VIDEO_CAPTURE_MPLANE)
+        self.assertEqual(v4l2_format.fmt.pix_mp.num_planes, 2)
+        decoded = V4l2DataFormat._from_v4l2(v4l2_format)
+        self.assertEqual(decoded, data_format)
+        self.assertTrue(decoded.multiplanar)
+
+
+class TryFormatTest(TestCase):
+    def setUp(self):
+        self.device = make_device()
+        self.requested = V4l2DataFormat(V4l2PixFormats.YUYV, 4096, 2160)
+
+    def test_memoized(self):
+        tried = self.device.try_format(self.requested)
+        self.assertEqual((tried.width, tried.height), (1920, 1080))
+        self.assertEqual(tried.sizeimage, 1920 * 1080 * 2)
+        self.assertIs(self.device.try_format(self.requested), tried)
+        self.assertEqual(self.device.calls["try_format"], 1)
+
+        # A different buffer type is tried separately.
+        self.device.try_format(self.requested, V4l2BufferType.VIDEO_OUTPUT)
+        self.assertEqual(self.device.calls["try_format"], 2)
+
+        self.device.clear_tried_formats()
+        self.device.try_format(self.requested)
+        self.assertEqual(self.device.calls["try_format"], 3)
+
+    def test_set_format_seeds_memo(self):
+        self.device.active_format = self.requested
+        tried = self.device.try_format(self.requested)
+        self.assertEqual((tried.width, tried.height), (1920, 1080))
+        self.assertEqual(self.device.calls["try_format"], 0)
+
+    def test_unsupported_buffer_type(self):
+        with self.assertRaises(FeatureNotSupported):
+            self.device.try_format(self.requested,
+                                   V4l2BufferType.VBI_CAPTURE)
+
+
+if __name__ == "__main__":
+    run_tests()
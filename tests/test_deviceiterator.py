@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from unittest.mock import patch
+from tempfile import TemporaryDirectory
+from threading import Event
+from pathlib import Path
+import time
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from v4l2ctl import IoctlError  # noqa E402
+from v4l2ctl.v4l2device import V4l2DeviceIterator  # noqa E402
+
+
+class FakeDevice(object):
+    """Stands in for V4l2Device, probing is controlled by the file name."""
+    # Set to release the hung devices.
+    release_hung = Event()
+
+    def __init__(self, device):
+        self.device = device
+        if device.name == "vbi0":
+            raise IoctlError(device, "VIDIOC_QUERYCAP", 0, -1)
+        elif device.name == "video1":
+            time.sleep(0.2)
+        elif device.name == "video2":
+            self.release_hung.wait()
+
+
+class DeviceIteratorTest(TestCase):
+    def setUp(self):
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dev_root = Path(temp_dir.name)
+        for name in ("video0", "video1", "radio0", "vbi0", "other0"):
+            (self.dev_root / name).touch()
+        (self.dev_root / "video10").symlink_to(self.dev_root / "video0")
+
+        FakeDevice.release_hung.clear()
+        self.addCleanup(FakeDevice.release_hung.set)
+
+        patchers = [patch.object(V4l2DeviceIterator, "_dev_root",
+                                 self.dev_root),
+                    patch("v4l2ctl.v4l2device.V4l2Device", FakeDevice),
+                    ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def names(self, iterator):
+        return [dev.device.name for dev in iterator]
+
+    def test_skip_links(self):
+        self.assertEqual(sorted(self.names(V4l2DeviceIterator(True))),
+                         ["radio0", "video0", "video1"])
+
+    def test_keep_links(self):
+        self.assertEqual(sorted(self.names(V4l2DeviceIterator(False))),
+                         ["radio0", "video0", "video1", "video10"])
+
+    def test_concurrent(self):
+        names = self.names(V4l2DeviceIterator(True, workers=4))
+        self.assertEqual(sorted(names), ["radio0", "video0", "video1"])
+        # The slow device finishes last.
+        self.assertEqual(names[-1], "video1")
+
+    def test_single_worker(self):
+        names = self.names(V4l2DeviceIterator(True, workers=1))
+        self.assertEqual(sorted(names), ["radio0", "video0", "video1"])
+
+    def test_timeout(self):
+        (self.dev_root / "video2").touch()
+        start = time.monotonic()
+        names = self.names(V4l2DeviceIterator(True, workers=2, timeout=0.5))
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(sorted(names), ["radio0", "video0", "video1"])
+
+    def test_hung_worker_replaced(self):
+        # With a single worker, the remaining devices are only probed if the
+        # hung worker is replaced.
+        (self.dev_root / "video2").touch()
+        names = self.names(V4l2DeviceIterator(True, workers=1, timeout=0.5))
+        self.assertEqual(sorted(names), ["radio0", "video0", "video1"])
+
+    def test_invalid_workers(self):
+        with self.assertRaises(ValueError):
+            V4l2DeviceIterator(True, workers=0)
+
+
+if __name__ == "__main__":
+    run_tests()
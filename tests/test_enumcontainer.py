@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from enum import Enum, IntEnum
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from v4l2ctl.utils.enumcontainer import BaseEnumContainer  # noqa E402
+
+
+class First(IntEnum):
+    A = 1
+    B = 2
+    ALIAS = 2
+
+
+class Second(IntEnum):
+    C = 3
+    B = 4
+    D = 2
+
+
+class Third(Enum):
+    E = "e"
+
+
+class Container(BaseEnumContainer, enums=[First, Second, Third]):
+    pass
+
+
+class EnumContainerTest(TestCase):
+    def test_construct(self):
+        self.assertIs(Container(1), First.A)
+        self.assertIs(Container(3), Second.C)
+        self.assertIs(Container("e"), Third.E)
+        self.assertIs(Container(Third.E), Third.E)
+
+    def test_first_enum_wins(self):
+        self.assertIs(Container(2), First.B)
+        self.assertIs(Container.B, First.B)
+        self.assertIs(Container["B"], First.B)
+        self.assertIs(Container(4), Second.B)
+
+    def test_invalid_value(self):
+        for value in (5, "x", [1]):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    Container(value)
+
+    def test_contains(self):
+        self.assertIn(3, Container)
+        self.assertIn(Second.D, Container)
+        self.assertIn(Third.E, Container)
+        self.assertNotIn(5, Container)
+        self.assertNotIn([1], Container)
+
+    def test_names(self):
+        self.assertIs(Container.ALIAS, First.B)
+        self.assertIs(Container.E, Third.E)
+        with self.assertRaises(AttributeError):
+            Container.F
+        with self.assertRaises(KeyError):
+            Container["F"]
+
+    def test_iter(self):
+        self.assertEqual(list(Container),
+                         [First.A, First.B, Second.C, Second.B, Second.D,
+                          Third.E])
+
+    def test_single_enum(self):
+        class Single(BaseEnumContainer, enums=Third):
+            pass
+        self.assertIs(Single("e"), Third.E)
+
+    def test_not_an_enum(self):
+        with self.assertRaises(TypeError):
+            class Invalid(BaseEnumContainer, enums=[First, int]):
+                pass
+
+
+if __name__ == "__main__":
+    run_tests()
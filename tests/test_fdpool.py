@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from threading import Event, Thread
+from time import monotonic, sleep
+import os
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from test_filehandle import count_open_files, TEST_FILE  # noqa E402
+from v4l2ctl.utils.fdpool import FdPool, PooledFileHandle  # noqa E402
+from v4l2ctl.utils.filehandle import FileHandleStatus  # noqa E402
+
+
+class SlowFdPool(FdPool):
+    """A pool opening slow_path only once proceed is set, like a hanging
+    device."""
+    def __init__(self, slow_path):
+        super().__init__(idle_timeout=60)
+        self.slow_path = slow_path
+        self.opening = Event()
+        self.proceed = Event()
+
+    def _open(self, path):
+        if path == self.slow_path:
+            self.opening.set()
+            self.proceed.wait(5)
+        return super()._open(path)
+
+
+class FdPoolTest(TestCase):
+    def test_shared_descriptor(self):
+        pool = FdPool()
+        fd1 = pool.acquire(TEST_FILE)
+        fd2 = pool.acquire(TEST_FILE)
+        self.assertEqual(fd1, fd2)
+        self.assertEqual(count_open_files(), 1)
+        self.assertEqual(len(pool), 1)
+
+        pool.release(TEST_FILE)
+        pool.release(TEST_FILE)
+        self.assertEqual(pool.evict_idle(0), 1)
+        self.assertNotIn(TEST_FILE, pool)
+
+    def test_idle_descriptor_is_reused(self):
+        pool = FdPool(idle_timeout=60)
+        fd1 = pool.acquire(TEST_FILE)
+        pool.release(TEST_FILE)
+        # Still open, because it was not idle long enough.
+        self.assertEqual(pool.evict_idle(), 0)
+        self.assertEqual(count_open_files(), 1)
+
+        fd2 = pool.acquire(TEST_FILE)
+        self.assertEqual(fd1, fd2)
+        pool.release(TEST_FILE)
+        pool.evict_idle(0)
+
+    def test_in_use_not_evicted(self):
+        pool = FdPool()
+        pool.acquire(TEST_FILE)
+        self.assertEqual(pool.evict_idle(0), 0)
+        self.assertEqual(count_open_files(), 1)
+        pool.release(TEST_FILE)
+        pool.evict_idle(0)
+
+    def test_no_idle_timeout(self):
+        pool = FdPool(idle_timeout=0)
+        pool.acquire(TEST_FILE)
+        self.assertEqual(count_open_files(), 1)
+        pool.release(TEST_FILE)
+        self.assertEqual(len(pool), 0)
+
+    def test_closed_after_idle_timeout(self):
+        pool = FdPool(idle_timeout=0.05)
+        pool.acquire(TEST_FILE)
+        pool.release(TEST_FILE)
+        self.assertEqual(count_open_files(), 1)
+        deadline = monotonic() + 5
+        while TEST_FILE in pool and monotonic() < deadline:
+            sleep(0.01)
+        self.assertNotIn(TEST_FILE, pool)
+
+    def test_reacquired_before_timeout(self):
+        pool = FdPool(idle_timeout=0.05)
+        pool.acquire(TEST_FILE)
+        pool.release(TEST_FILE)
+        pool.acquire(TEST_FILE)
+        sleep(0.15)
+        self.assertIn(TEST_FILE, pool)
+        pool.release(TEST_FILE)
+        pool.evict_idle(0)
+
+    def test_slow_open_does_not_block_other_paths(self):
+        pool = SlowFdPool(TEST_FILE)
+        slow = Thread(target=pool.acquire, args=(TEST_FILE,))
+        slow.start()
+        self.addCleanup(slow.join)
+        self.addCleanup(pool.proceed.set)
+        self.assertTrue(pool.opening.wait(5))
+        # The slow open is still running, the other path doesn't wait for it.
+        start = monotonic()
+        pool.acquire(os.devnull)
+        self.assertLess(monotonic() - start, 1)
+        self.assertNotIn(TEST_FILE, pool)
+        pool.release(os.devnull)
+
+        pool.proceed.set()
+        slow.join()
+        self.assertIn(TEST_FILE, pool)
+        pool.release(TEST_FILE)
+        pool.evict_idle(0)
+
+    def test_concurrent_open_of_same_path(self):
+        pool = SlowFdPool(TEST_FILE)
+        slow = Thread(target=pool.acquire, args=(TEST_FILE,))
+        slow.start()
+        self.addCleanup(slow.join)
+        self.addCleanup(pool.proceed.set)
+        self.assertTrue(pool.opening.wait(5))
+        # Opened by this thread while the other one is still opening it.
+        pool.slow_path = None
+        fd = pool.acquire(TEST_FILE)
+        pool.proceed.set()
+        slow.join()
+        # The other thread dropped its own descriptor and shares this one.
+        self.assertEqual(count_open_files(), 1)
+        self.assertEqual(pool.acquire(TEST_FILE), fd)
+        for _ in range(2):
+            pool.release(TEST_FILE)
+            self.assertEqual(pool.evict_idle(0), 0)
+        pool.release(TEST_FILE)
+        self.assertEqual(pool.evict_idle(0), 1)
+
+    def tearDown(self):
+        self.assertEqual(count_open_files(), 0)
+
+
+class PooledFileHandleTest(TestCase):
+    def test_with_and_open(self):
+        pool = FdPool(idle_timeout=0)
+        dev_han = PooledFileHandle(TEST_FILE, pool)
+        self.assertEqual(dev_han.status, FileHandleStatus.Closed)
+
+        with dev_han as fd:
+            self.assertIsInstance(fd, int)
+            self.assertEqual(dev_han.status, FileHandleStatus.ToBeClosed)
+            self.assertEqual(dev_han.open(), fd)
+            self.assertEqual(dev_han.fileno(), fd)
+        self.assertEqual(dev_han.status, FileHandleStatus.Opened)
+        self.assertEqual(count_open_files(), 1)
+
+        dev_han.close()
+        self.assertEqual(dev_han.status, FileHandleStatus.Closed)
+
+    def test_handles_share_descriptor(self):
+        pool = FdPool(idle_timeout=0)
+        dev_han1 = PooledFileHandle(TEST_FILE, pool)
+        dev_han2 = PooledFileHandle(TEST_FILE, pool)
+        with dev_han1 as fd1, dev_han2 as fd2:
+            self.assertEqual(fd1, fd2)
+            self.assertEqual(count_open_files(), 1)
+
+    def test_private(self):
+        pool = FdPool(idle_timeout=0)
+        dev_han1 = PooledFileHandle(TEST_FILE, pool)
+        dev_han2 = PooledFileHandle(TEST_FILE, pool)
+        shared = dev_han1.open()
+        self.assertEqual(dev_han2.open(), shared)
+        # The shared descriptor is swapped for a private one.
+        private = dev_han1.open_private()
+        self.assertTrue(dev_han1.private)
+        self.assertNotEqual(private, shared)
+        self.assertEqual(dev_han1.fileno(), private)
+        self.assertEqual(count_open_files(), 2)
+        with dev_han1 as fd:
+            self.assertEqual(fd, private)
+
+        dev_han1.close()
+        self.assertEqual(dev_han1.status, FileHandleStatus.Opened)
+        dev_han1.close()
+        self.assertFalse(dev_han1.private)
+        self.assertEqual(count_open_files(), 1)
+        dev_han2.close()
+
+        # Opened privately from the start.
+        fd = PooledFileHandle(TEST_FILE, pool).open_private()
+        self.assertNotIn(TEST_FILE, pool)
+        os.close(fd)
+
+    def tearDown(self):
+        self.assertEqual(count_open_files(), 0)
+
+
+if __name__ == "__main__":
+    run_tests()
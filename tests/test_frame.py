@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from fractions import Fraction
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from fakedevice import FakeDevice, Stepwise  # noqa E402
+from v4l2ctl.v4l2frame import V4l2FrameSizeGrid, V4l2FrameSize, \
+                             V4l2FrameInterval  # noqa E402
+from v4l2ctl.v4l2format import V4l2Format  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlstructs import V4l2IoctlFmtDesc, \
+                                            V4l2IoctlFrameSizeEnum, \
+                                            V4l2IoctlFrameIvalEnum  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlformatenums import V4l2PixFormats  # noqa E402
+
+
+class FrameSizeGridTest(TestCase):
+    def setUp(self):
+        self.grid = V4l2FrameSizeGrid((16, 64, 16), (10, 30, 10))
+
+    def test_len(self):
+        self.assertEqual(len(self.grid), 4 * 3)
+
+    def test_getitem(self):
+        self.assertEqual(self.grid[0], (16, 10))
+        self.assertEqual(self.grid[1], (16, 20))
+        self.assertEqual(self.grid[3], (32, 10))
+        self.assertEqual(self.grid[-1], (64, 30))
+        self.assertEqual(self.grid[1:4], [(16, 20), (16, 30), (32, 10)])
+        with self.assertRaises(IndexError):
+            self.grid[12]
+
+    def test_iter(self):
+        self.assertEqual(list(self.grid),
+                         [(w, h) for w in range(16, 65, 16)
+                          for h in range(10, 31, 10)])
+
+    def test_contains_and_index(self):
+        self.assertIn((48, 20), self.grid)
+        self.assertNotIn((50, 20), self.grid)
+        self.assertNotIn(48, self.grid)
+        self.assertEqual(self.grid.index((48, 20)), 7)
+        with self.assertRaises(ValueError):
+            self.grid.index((50, 20))
+
+    def test_closest(self):
+        self.assertEqual(self.grid.closest(40, 14), (48, 10))
+        self.assertEqual(self.grid.closest(39, 16), (32, 20))
+        self.assertEqual(self.grid.closest(1, 1), (16, 10))
+        self.assertEqual(self.grid.closest(1000, 1000), (64, 30))
+
+    def test_max_off_grid(self):
+        grid = V4l2FrameSizeGrid((1, 10, 4), (1, 1, 1))
+        self.assertEqual(list(grid.widths), [1, 5, 9])
+        self.assertEqual(grid.closest(10, 1), (9, 1))
+
+    def test_huge_continuous(self):
+        grid = V4l2FrameSizeGrid((1, 8192, 1), (1, 8192, 0))
+        self.assertEqual(len(grid), 8192 * 8192)
+        self.assertEqual(grid[8192 * 8192 - 1], (8192, 8192))
+        self.assertEqual(grid.closest(1919, 1081), (1919, 1081))
+
+
+class StepwiseFrameSizeTest(TestCase):
+    def setUp(self):
+        self.device = FakeDevice({V4l2PixFormats.YUYV: [
+            Stepwise(16, 4096, 1, 16, 2160, 1, (1, 60))]})
+        self.size = next(next(self.device.formats).sizes())
+
+    def test_grid(self):
+        self.assertEqual(len(self.size.grid), 4081 * 2145)
+        self.assertEqual(self.size.closest(1920, 1080), (1920, 1080))
+
+    def test_closest_intervals(self):
+        calls = self.device.calls["enum_frame_intervals"]
+        intervals = list(self.size.closest_intervals(1920, 1080))
+        self.assertEqual([ival.interval for ival in intervals],
+                         [Fraction(1, 60)])
+        # One successful call and one ending the enumeration.
+        self.assertEqual(self.device.calls["enum_frame_intervals"], calls + 2)
+
+
+class SnapshotTest(TestCase):
+    def test_format(self):
+        fmt_desc = V4l2IoctlFmtDesc(description=b"YUYV 4:2:2",
+                                    pixelformat=V4l2PixFormats.YUYV)
+        fmt = V4l2Format(None, fmt_desc)
+        fmt_desc.description = b"changed"
+        fmt_desc.pixelformat = V4l2PixFormats.GREY
+        self.assertEqual(fmt.description, "YUYV 4:2:2")
+        self.assertIs(fmt.format, V4l2PixFormats.YUYV)
+        self.assertFalse(hasattr(fmt, "__dict__"))
+
+    def test_frame_size(self):
+        frame_size = V4l2IoctlFrameSizeEnum(pixel_format=V4l2PixFormats.YUYV,
+                                            type=1)
+        frame_size.discrete.width = 640
+        frame_size.discrete.height = 480
+        size = V4l2FrameSize(None, frame_size)
+        frame_size.discrete.width = 1
+        self.assertEqual((size.width, size.height), (640, 480))
+        self.assertFalse(hasattr(size, "__dict__"))
+        self.assertEqual(bytes(size._to_v4l2()), bytes(
+            V4l2IoctlFrameSizeEnum(pixel_format=V4l2PixFormats.YUYV,
+                                   type=1,
+                                   discrete=(640, 480))))
+
+    def test_frame_interval(self):
+        frame_ival = V4l2IoctlFrameIvalEnum(type=1)
+        frame_ival.discrete.numerator = 1
+        frame_ival.discrete.denominator = 30
+        interval = V4l2FrameInterval(frame_ival)
+        frame_ival.discrete.denominator = 60
+        self.assertEqual(interval.interval, Fraction(1, 30))
+        self.assertIs(interval.interval, interval.interval)
+        self.assertFalse(hasattr(interval, "__dict__"))
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from time import sleep
+import os
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from fakestream import MplanePipeStream, PipeStream  # noqa E402
+from v4l2ctl import V4l2FrameGrabber, V4l2FrameQueue  # noqa E402
+
+
+class FrameGrabberTest(TestCase):
+    def setUp(self):
+        self.stream = PipeStream(buffer_count=4)
+        self.addCleanup(self.stream.close)
+        self.grabber = V4l2FrameGrabber(self.stream)
+        self.grabber.start()
+        self.addCleanup(self.grabber.stop)
+
+    def test_newest_frame_only(self):
+        self.stream.make_ready(0, 1, 2)
+        frame = self.grabber.grab(timeout=1)
+        # The capturing thread may see the buffers one by one or at once.
+        while frame.index != 2:
+            frame = self.grabber.grab(timeout=1)
+        self.assertEqual(bytes(frame.data), b"frame2")
+        # The stale frames went back to the driver right away.
+        self.assertEqual(sorted(self.stream.requeued), [0, 1])
+        statistics = self.grabber.statistics
+        self.assertEqual(statistics.grabbed + statistics.skipped, 3)
+        self.assertGreaterEqual(statistics.max_latency,
+                                statistics.last_latency)
+        self.assertGreaterEqual(statistics.last_latency, 0)
+
+    def test_grab_releases_previous(self):
+        self.stream.make_ready(3)
+        frame = self.grabber.grab(timeout=1)
+        self.assertEqual(frame.index, 3)
+        self.assertIsNone(self.grabber.grab(timeout=0.01))
+        self.assertTrue(frame.released)
+        self.assertEqual(self.stream.requeued, [3])
+
+    def test_stop(self):
+        self.stream.make_ready(1)
+        frame = self.grabber.grab(timeout=1)
+        self.grabber.stop()
+        self.assertFalse(self.grabber.running)
+        self.assertFalse(self.stream.streaming)
+        self.assertTrue(frame.released)
+        self.assertTrue(os.get_blocking(self.stream.read_fd))
+        with self.assertRaises(ValueError):
+            self.grabber.grab()
+
+
+class FrameQueueTest(TestCase):
+    def setUp(self):
+        self.stream = PipeStream(buffer_count=5)
+        self.addCleanup(self.stream.close)
+
+    def start(self, policy, maxsize=2):
+        queue = V4l2FrameQueue(self.stream, maxsize, policy)
+        queue.start()
+        self.addCleanup(queue.stop)
+        return queue
+
+    def wait_for(self, predicate):
+        for _ in range(100):
+            if predicate():
+                return
+            sleep(0.01)
+        self.fail("Timed out")
+
+    def test_drop_oldest(self):
+        queue = self.start("drop-oldest")
+        self.stream.make_ready(0, 1, 2)
+        self.wait_for(lambda: queue.statistics.dropped_oldest == 1)
+        self.assertEqual(self.stream.requeued, [0])
+        self.assertEqual([queue.get(timeout=1).index,
+                          queue.get(timeout=1).index], [1, 2])
+        self.assertEqual(queue.statistics.high_water, 2)
+        self.assertEqual(queue.statistics.queued, 3)
+
+    def test_drop_newest(self):
+        queue = self.start("drop-newest")
+        self.stream.make_ready(0, 1, 2)
+        self.wait_for(lambda: queue.statistics.dropped_newest == 1)
+        self.assertEqual(self.stream.requeued, [2])
+        self.assertEqual(queue.get(timeout=1).index, 0)
+        self.assertEqual(len(queue), 1)
+
+    def test_block(self):
+        queue = self.start("block")
+        self.stream.make_ready(0, 1, 2)
+        self.wait_for(lambda: queue.statistics.blocked == 1)
+        # The third buffer is left with the driver.
+        self.assertEqual(len(queue), 2)
+        self.assertEqual(self.stream.requeued, [])
+        self.assertEqual(queue.get(timeout=1).index, 0)
+        self.wait_for(lambda: len(queue) == 2)
+        self.assertEqual([queue.get(timeout=1).index,
+                          queue.get(timeout=1).index], [1, 2])
+        self.assertEqual(queue.statistics.dropped_oldest +
+                         queue.statistics.dropped_newest, 0)
+        self.assertEqual(self.stream.requeued, [0, 1])
+
+    def test_stop_while_blocked(self):
+        queue = self.start("block", maxsize=1)
+        self.stream.make_ready(0, 1)
+        self.wait_for(lambda: queue.statistics.blocked == 1)
+        queue.stop()
+        self.assertFalse(queue.running)
+        self.assertIsNone(queue._thread)
+
+    def test_too_few_buffers(self):
+        with self.assertRaises(ValueError):
+            self.start("block", maxsize=4)
+        self.assertFalse(self.stream.streaming)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            V4l2FrameQueue(self.stream, 2, "drop-all")
+        with self.assertRaises(ValueError):
+            V4l2FrameQueue(self.stream, 0)
+
+
+class MplaneFrameQueueTest(TestCase):
+    def setUp(self):
+        self.stream = MplanePipeStream(buffer_count=4)
+        self.addCleanup(self.stream.close)
+        self.queue = V4l2FrameQueue(self.stream, 2, "block")
+        self.queue.start()
+        self.addCleanup(self.queue.stop)
+
+    def test_planes(self):
+        self.stream.make_ready(2)
+        frame = self.queue.get(timeout=1)
+        self.assertEqual([bytes(plane.data) for plane in frame.planes],
+                         [b"frame2Y", b"UV2"])
+        self.assertEqual(bytes(frame.data), b"frame2Y")
+
+    def test_release_while_dequeuing(self):
+        self.stream.make_ready(0)
+        first = self.queue.get(timeout=1)
+        # The consumer gives back a frame right between the capturing
+        # thread's DQBUF and it reading the planes of the next frame.
+        self.stream.after_dequeue = first.release
+        self.stream.make_ready(1)
+        for _ in range(100):
+            if len(self.queue):
+                break
+            sleep(0.01)
+        self.assertTrue(first.released)
+        second = self.queue.get(timeout=1)
+        self.assertEqual(self.stream.requeued, [0])
+        self.assertEqual([(bytes(plane.data), plane.bytesused)
+                          for plane in second.planes],
+                         [(b"frame1Y", 7), (b"UV1", 3)])
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests, skipUnless
+from pathlib import Path
+import os
+import subprocess
+import sys
+
+
+PACKAGE_ROOT = str(Path(__file__).resolve().parent.parent)
+
+# The budget in microseconds for "import v4l2ctl", as reported by
+# python -X importtime. Wall-clock time depends on the machine and its load,
+# so the check only runs if a budget is given in the environment.
+IMPORT_TIME_BUDGET = os.environ.get("V4L2CTL_IMPORT_TIME_BUDGET")
+
+LAZY_MODULE = "v4l2ctl.ioctls.v4l2ioctlformatenums"
+
+# The modules only loaded when their names are first accessed.
+LAZY_MODULES = ["v4l2ctl.ioctls.v4l2ioctlformatenums",
+                "v4l2ctl.v4l2stream",
+                "v4l2ctl.v4l2reactor",
+                "v4l2ctl.v4l2grab",
+                "v4l2ctl.v4l2inventory",
+                "v4l2ctl.v4l2cache",
+                "v4l2ctl.v4l2negotiate",
+                "v4l2ctl.v4l2modetable",
+                ]
+
+
+def run_python(*args):
+    return subprocess.run([sys.executable, *args],
+                          cwd=PACKAGE_ROOT,
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE,
+                          universal_newlines=True,
+                          check=True,
+                          )
+
+
+class LazyImportTest(TestCase):
+    def test_formats_not_loaded(self):
+        result = run_python("-c",
+                            "import sys, v4l2ctl; "
+                            "print({!r} in sys.modules)".format(LAZY_MODULE))
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_modules_not_loaded(self):
+        result = run_python("-c",
+                            "import sys, v4l2ctl; "
+                            "print([name for name in {!r} "
+                            "if name in sys.modules])".format(LAZY_MODULES))
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_modules_loaded_on_access(self):
+        result = run_python("-c",
+                            "import sys, v4l2ctl; "
+                            "print(v4l2ctl.V4l2MmapStream.__module__, "
+                            "'v4l2ctl.v4l2grab' in sys.modules)")
+        self.assertEqual(result.stdout.split(),
+                         ["v4l2ctl.v4l2stream", "False"])
+
+    def test_formats_loaded_on_access(self):
+        result = run_python("-c",
+                            "import sys, v4l2ctl; "
+                            "print(v4l2ctl.V4l2Formats.YUYV.name, "
+                            "v4l2ctl.ioctls.V4l2Field.NONE.name, "
+                            "{!r} in sys.modules)".format(LAZY_MODULE))
+        self.assertEqual(result.stdout.split(), ["YUYV", "NONE", "True"])
+
+    def test_star_import(self):
+        result = run_python("-c",
+                            "from v4l2ctl import *; "
+                            "print(V4l2Formats.__name__)")
+        self.assertEqual(result.stdout.strip(), "V4l2Formats")
+
+    def test_unknown_attribute(self):
+        import v4l2ctl
+        with self.assertRaises(AttributeError):
+            v4l2ctl.NoSuchThing
+        with self.assertRaises(AttributeError):
+            v4l2ctl.ioctls.NoSuchThing
+
+    @skipUnless(IMPORT_TIME_BUDGET, "V4L2CTL_IMPORT_TIME_BUDGET is not set")
+    def test_import_time(self):
+        # Best of a few runs, as the first one may be slowed down by compiling
+        # the byte code.
+        best = min(self._import_time() for _ in range(3))
+        self.assertLess(best, int(IMPORT_TIME_BUDGET))
+
+    @staticmethod
+    def _import_time():
+        result = run_python("-X", "importtime", "-c", "import v4l2ctl")
+        # Format: "import time: <self [us]> | <cumulative [us]> | <module>"
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if (len(fields) == 3 and fields[0].startswith("import time:") and
+                    fields[2].strip() == "v4l2ctl"):
+                return int(fields[1])
+        raise AssertionError("v4l2ctl was not imported")
+
+
+if __name__ == "__main__":
+    run_tests()
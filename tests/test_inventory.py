@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from v4l2ctl import V4l2SysfsInventory, IoctlError  # noqa E402
+
+
+def make_node(root, node, name, index, dev, parent, dev_name=None):
+    path = root / "class" / "video4linux" / node
+    path.mkdir(parents=True)
+    (path / "name").write_text(name + "\n")
+    (path / "index").write_text("{}\n".format(index))
+    (path / "dev").write_text(dev + "\n")
+    (path / "uevent").write_text("MAJOR={}\nMINOR={}\nDEVNAME={}\n".format(
+        *dev.split(":"), dev_name or node))
+    (path / "device").symlink_to(parent)
+
+
+class SysfsInventoryTest(TestCase):
+    def setUp(self):
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        root = Path(temp_dir.name)
+        self.sysfs_root = root / "class" / "video4linux"
+        self.dev_root = root / "dev"
+        self.dev_root.mkdir()
+
+        driver = root / "bus" / "usb" / "drivers" / "uvcvideo"
+        driver.mkdir(parents=True)
+        self.camera = root / "devices" / "usb1" / "1-1" / "1-1:1.0"
+        self.camera.mkdir(parents=True)
+        (self.camera / "driver").symlink_to(driver)
+        self.radio = root / "devices" / "platform" / "radio"
+        self.radio.mkdir(parents=True)
+
+        make_node(root, "video0", "Camera", 0, "81:0", self.camera)
+        make_node(root, "video1", "Camera", 1, "81:1", self.camera)
+        make_node(root, "video10", "Other", 0, "81:10", self.radio)
+        make_node(root, "radio0", "Radio", 0, "81:2", self.radio,
+                  dev_name="v4l/radio0")
+
+        self.inventory = V4l2SysfsInventory(self.sysfs_root, self.dev_root)
+
+    def test_nodes(self):
+        self.assertEqual([info.node for info in self.inventory],
+                         ["radio0", "video0", "video1", "video10"])
+
+    def test_attributes(self):
+        info = next(info for info in self.inventory if info.node == "video1")
+        self.assertEqual(info.name, "Camera")
+        self.assertEqual(info.index, 1)
+        self.assertEqual(info.dev_number, (81, 1))
+        self.assertEqual(info.device, self.dev_root / "video1")
+        self.assertEqual(info.parent, self.camera.resolve())
+        self.assertEqual(info.driver, "uvcvideo")
+
+    def test_dev_name(self):
+        info = next(iter(self.inventory))
+        self.assertEqual(info.device, self.dev_root / "v4l" / "radio0")
+        self.assertIsNone(info.driver)
+
+    def test_by_parent(self):
+        groups = self.inventory.by_parent()
+        self.assertEqual([info.node for info in groups[self.camera.resolve()]],
+                         ["video0", "video1"])
+        self.assertEqual([info.node for info in groups[self.radio.resolve()]],
+                         ["radio0", "video10"])
+
+    def test_device_on_demand(self):
+        # The device files don't exist, which doesn't matter until the full
+        # device is requested.
+        info = next(iter(self.inventory))
+        with self.assertRaises(FileNotFoundError):
+            info.v4l2_device
+
+    def test_device_not_v4l2(self):
+        info = next(info for info in self.inventory if info.node == "video0")
+        (self.dev_root / "video0").touch()
+        with self.assertRaises(IoctlError):
+            info.v4l2_device
+
+    def test_no_sysfs(self):
+        inventory = V4l2SysfsInventory(self.sysfs_root / "missing",
+                                       self.dev_root)
+        self.assertEqual(list(inventory), [])
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from unittest.mock import patch
+from errno import ENOTTY
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from v4l2ctl import V4l2Device, IoctlError, IoctlNotSupported, \
+                    EndOfEnumeration  # noqa E402
+from v4l2ctl.ioctls import V4l2IocOps, V4l2BufferType  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctl import V4l2IoctlRequest, \
+                                     IoctlAbstraction  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlstructs import V4l2IoctlFmtDesc  # noqa E402
+from v4l2ctl.utils.filehandle import FileHandleCM  # noqa E402
+
+
+# Every ioctl request on /dev/null fails with ENOTTY.
+TEST_FILE = "/dev/null"
+
+
+class IoctlErrorTest(TestCase):
+    def setUp(self):
+        self.ioc_ops = V4l2IocOps(FileHandleCM(TEST_FILE, {"mode": "rb"}))
+
+    def test_not_supported(self):
+        with self.assertRaises(IoctlNotSupported) as ctx:
+            self.ioc_ops.query_cap()
+        self.assertEqual(ctx.exception.errno, ENOTTY)
+        self.assertIsNone(ctx.exception.__context__)
+
+    def test_enumeration_not_supported(self):
+        with self.assertRaises(IoctlError) as ctx:
+            self.ioc_ops.enum_fmt(index=0, type=V4l2BufferType.VIDEO_CAPTURE)
+        self.assertNotIsInstance(ctx.exception, EndOfEnumeration)
+        self.assertIsInstance(ctx.exception, IoctlNotSupported)
+
+    def test_message(self):
+        try:
+            self.ioc_ops.query_cap()
+        except IoctlError as e:
+            msg = str(e)
+        self.assertIn("QueryCap", msg)
+        self.assertIn(TEST_FILE, msg)
+        self.assertIn("[Errno {}]".format(ENOTTY), msg)
+
+    def test_precompiled_unknown_field(self):
+        with self.assertRaises(AttributeError):
+            self.ioc_ops.enum_fmt.precompile(no_such_field=1)
+
+    def test_non_video_device(self):
+        with self.assertRaises(IoctlError):
+            V4l2Device(TEST_FILE)
+
+
+class RequestDescriptorTest(TestCase):
+    def setUp(self):
+        self.handle = FileHandleCM(TEST_FILE, {"mode": "rb"})
+        self.ioc_ops = V4l2IocOps(self.handle)
+
+    def test_bound_lazily(self):
+        self.assertNotIn("query_cap", vars(self.ioc_ops))
+        request = self.ioc_ops.query_cap
+        self.assertIsInstance(request, IoctlAbstraction)
+        self.assertIs(request._device, self.handle)
+        # Cached in the instance, which bypasses the descriptor from now on.
+        self.assertIs(vars(self.ioc_ops)["query_cap"], request)
+        self.assertIs(self.ioc_ops.query_cap, request)
+        self.assertEqual(len(vars(self.ioc_ops)), len(vars(V4l2IocOps(
+            self.handle))) + 1)
+
+    def test_per_instance(self):
+        other = V4l2IocOps(FileHandleCM(TEST_FILE, {"mode": "rb"}))
+        self.assertIsNot(self.ioc_ops.enum_fmt, other.enum_fmt)
+
+    def test_class_access(self):
+        definition = V4l2IocOps.query_cap
+        self.assertIsInstance(definition, V4l2IoctlRequest)
+        self.assertIs(V4l2IocOps.query_cap, definition)
+        self.ioc_ops.query_cap
+        self.assertIs(V4l2IocOps.query_cap, definition)
+        self.assertEqual(definition.name, "QueryCap")
+        self.assertEqual(definition.code, self.ioc_ops.query_cap.code)
+        self.assertTrue(definition.__doc__)
+
+
+class DispatchTest(TestCase):
+    """The ioctl system call is replaced by one recording the buffers and
+    writing a description into them, like the driver would."""
+    def setUp(self):
+        self.ioc_ops = V4l2IocOps(FileHandleCM(TEST_FILE, {"mode": "rb"}))
+        self.seen = []
+        patcher = patch("v4l2ctl.ioctls.v4l2ioctl.ioctl", self._ioctl)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _ioctl(self, fd, code, buff):
+        self.seen.append(V4l2IoctlFmtDesc.from_buffer_copy(buff))
+        buff.description = b"written"
+        return 0
+
+    def test_call(self):
+        first = self.ioc_ops.enum_fmt(index=1, type=2)
+        second = self.ioc_ops.enum_fmt(index=2)
+        self.assertIsNot(first, second)
+        self.assertEqual((self.seen[1].index, self.seen[1].type), (2, 0))
+        self.assertEqual(first.description, b"written")
+
+    def test_precompile(self):
+        enum_fmt = self.ioc_ops.enum_fmt.precompile(
+            type=V4l2BufferType.VIDEO_CAPTURE)
+        first = enum_fmt(index=3)
+        second = enum_fmt(index=4)
+        # One buffer, restored to the preset fields before every call.
+        self.assertIs(first, second)
+        self.assertEqual([(fmt.index, fmt.type, fmt.description)
+                          for fmt in self.seen],
+                         [(3, V4l2BufferType.VIDEO_CAPTURE, b""),
+                          (4, V4l2BufferType.VIDEO_CAPTURE, b"")])
+        enum_fmt()
+        self.assertEqual(self.seen[-1].index, 0)
+
+    def test_reuse(self):
+        first = self.ioc_ops.enum_fmt.reuse(index=1, type=2)
+        second = self.ioc_ops.enum_fmt.reuse(index=5)
+        self.assertIs(first, second)
+        # Cleared before every call.
+        self.assertEqual([(fmt.index, fmt.type, fmt.description)
+                          for fmt in self.seen],
+                         [(1, 2, b""), (5, 0, b"")])
+
+    def test_into(self):
+        buff = V4l2IoctlFmtDesc(type=2, description=b"kept")
+        self.assertIs(self.ioc_ops.enum_fmt.into(buff, index=7), buff)
+        # Only the given fields are set.
+        self.assertEqual((self.seen[0].index, self.seen[0].type,
+                          self.seen[0].description), (7, 2, b"kept"))
+        self.assertEqual(buff.description, b"written")
+        with self.assertRaises(AttributeError):
+            self.ioc_ops.enum_fmt.into(buff, no_such_field=1)
+
+
+if __name__ == "__main__":
+    run_tests()
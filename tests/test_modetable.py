@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, SkipTest, main as run_tests
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from fakedevice import FakeDevice, Stepwise  # noqa E402
+from v4l2ctl import V4l2ModeTable, V4l2ModeRow  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlformatenums import V4l2PixFormats  # noqa E402
+
+
+YUYV = V4l2PixFormats.YUYV
+GREY = V4l2PixFormats.GREY
+
+FORMATS = {YUYV: [(640, 480, [(1, 30), (1, 15)]),
+                  (1280, 720, [(1, 10)]),
+                  ],
+           GREY: [Stepwise(16, 64, 16, 8, 32, 8, (1, 90))],
+           }
+
+
+class ModeTableTest(TestCase):
+    def setUp(self):
+        self.table = V4l2ModeTable.from_device(FakeDevice(FORMATS))
+
+    def test_rows(self):
+        self.assertEqual(list(self.table),
+                         [V4l2ModeRow(0, YUYV, 640, 480, 1, 30),
+                          V4l2ModeRow(0, YUYV, 640, 480, 1, 15),
+                          V4l2ModeRow(0, YUYV, 1280, 720, 1, 10),
+                          V4l2ModeRow(0, GREY, 16, 8, 1, 90),
+                          V4l2ModeRow(0, GREY, 64, 32, 1, 90),
+                          ])
+        self.assertEqual(self.table[2], V4l2ModeRow(0, YUYV, 1280, 720, 1, 10))
+        self.assertEqual(len(self.table), 5)
+
+    def test_many_devices(self):
+        other = FakeDevice({YUYV: [(320, 240, [(1, 5)])]})
+        other.device = "/dev/other"
+        self.assertEqual(self.table.add_device(other), 1)
+        self.assertEqual(self.table.devices, ("/dev/fake", "/dev/other"))
+        self.assertEqual(self.table[-1], V4l2ModeRow(1, YUYV, 320, 240, 1, 5))
+
+    def test_columns(self):
+        self.assertEqual(list(self.table.column("width")),
+                         [640, 640, 1280, 16, 64])
+        self.assertEqual(self.table.nbytes,
+                         len(self.table) * sum(self.table.column(name).itemsize
+                                               for name, _ in
+                                               self.table.columns))
+
+    def test_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            raise SkipTest("NumPy is not installed.") from None
+        modes = self.table.to_numpy()
+        self.assertEqual(modes.dtype.names, V4l2ModeRow._fields)
+        fast = modes[modes["denominator"] >= 30 * modes["numerator"]]
+        self.assertEqual(list(fast["width"]), [640, 16, 64])
+        self.assertEqual(len(V4l2ModeTable().to_numpy()), 0)
+        self.assertIsInstance(modes, numpy.ndarray)
+
+
+if __name__ == "__main__":
+    run_tests()
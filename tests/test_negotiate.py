@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from fractions import Fraction
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from fakedevice import FakeDevice, Stepwise  # noqa E402
+from v4l2ctl import V4l2ModeNegotiator  # noqa E402
+from v4l2ctl.v4l2types import V4l2Area  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlformatenums import V4l2PixFormats  # noqa E402
+
+
+YUYV = V4l2PixFormats.YUYV
+MJPEG = V4l2PixFormats.MJPEG
+GREY = V4l2PixFormats.GREY
+
+FORMATS = {YUYV: [(640, 480, [(1, 30), (1, 15)]),
+                  (1280, 720, [(1, 10), (1, 5)]),
+                  (1920, 1080, [(1, 5)]),
+                  ],
+           MJPEG: [(640, 480, [(1, 60), (1, 30)]),
+                   (1280, 720, [(1, 30)]),
+                   (1920, 1080, [(1, 30), (1, 15)]),
+                   ],
+           GREY: [Stepwise(16, 4096, 16, 16, 2160, 16, (1, 90))],
+           }
+
+
+class ModeNegotiatorTest(TestCase):
+    def setUp(self):
+        self.device = FakeDevice(FORMATS)
+        self.negotiator = V4l2ModeNegotiator(self.device)
+
+    def assertMode(self, mode, pixel_format, width, height, interval):
+        self.assertEqual(mode.format.format, pixel_format)
+        self.assertEqual(mode.size, V4l2Area(width, height))
+        self.assertEqual(mode.interval, interval)
+
+    def test_highest_fps(self):
+        mode = self.negotiator.negotiate(formats=[YUYV, MJPEG],
+                                         min_width=1280,
+                                         min_height=720)
+        self.assertMode(mode, MJPEG, 1920, 1080, Fraction(1, 30))
+
+    def test_highest_resolution(self):
+        mode = self.negotiator.negotiate(formats=[YUYV, MJPEG],
+                                         prefer="resolution")
+        self.assertMode(mode, MJPEG, 1920, 1080, Fraction(1, 30))
+
+    def test_format_preference_breaks_ties(self):
+        mode = self.negotiator.negotiate(formats=[YUYV, MJPEG],
+                                         max_fps=5,
+                                         prefer="resolution")
+        self.assertMode(mode, YUYV, 1920, 1080, Fraction(1, 5))
+
+    def test_fps_limits(self):
+        mode = self.negotiator.negotiate(formats=[YUYV, MJPEG], max_fps=40)
+        self.assertMode(mode, MJPEG, 1920, 1080, Fraction(1, 30))
+        mode = self.negotiator.negotiate(formats=[YUYV], min_fps=20)
+        self.assertMode(mode, YUYV, 640, 480, Fraction(1, 30))
+
+    def test_no_match(self):
+        self.assertIsNone(self.negotiator.negotiate(formats=[YUYV],
+                                                    min_fps=100))
+
+    def test_stepwise(self):
+        mode = self.negotiator.negotiate(formats=[GREY],
+                                         max_width=1000,
+                                         max_height=700,
+                                         prefer="resolution")
+        self.assertMode(mode, GREY, 992, 688, Fraction(1, 90))
+
+    def test_all_formats(self):
+        mode = self.negotiator.negotiate()
+        self.assertMode(mode, GREY, 4096, 2160, Fraction(1, 90))
+
+    def test_pruning(self):
+        # Once MJPEG wins at the maximum, YUYV sizes can't win any more.
+        self.negotiator.negotiate(formats=[MJPEG, YUYV],
+                                  max_width=1920,
+                                  max_height=1080,
+                                  max_fps=30,
+                                  prefer="resolution")
+        self.assertEqual(self.device.calls["enum_frame_sizes"],
+                         len(FORMATS[MJPEG]) + 1)
+        self.assertEqual(self.device.calls["enum_frame_intervals"],
+                         len(FORMATS[MJPEG][2][2]) + 1)
+
+    def test_memoized(self):
+        self.negotiator.negotiate()
+        calls = dict(self.device.calls)
+        mode = self.negotiator.negotiate(formats=[YUYV, MJPEG],
+                                         min_width=1280,
+                                         min_height=720)
+        self.assertEqual(dict(self.device.calls), calls)
+        self.assertMode(mode, MJPEG, 1920, 1080, Fraction(1, 30))
+
+        self.negotiator.clear()
+        self.negotiator.negotiate()
+        self.assertGreater(self.device.calls["enum_fmt"], calls["enum_fmt"])
+
+    def test_unknown_interval(self):
+        device = FakeDevice({YUYV: [(640, 480, [(0, 0), (1, 15)])]})
+        mode = V4l2ModeNegotiator(device).negotiate()
+        self.assertMode(mode, YUYV, 640, 480, Fraction(1, 15))
+
+    def test_invalid_preference(self):
+        with self.assertRaises(ValueError):
+            self.negotiator.negotiate(prefer="size")
+
+
+if __name__ == "__main__":
+    run_tests()
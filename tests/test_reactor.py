@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+import os
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from fakestream import PipeStream  # noqa E402
+from v4l2ctl import V4l2CaptureReactor  # noqa E402
+
+
+class CaptureReactorTest(TestCase):
+    def setUp(self):
+        self.streams = [PipeStream(device="/dev/fake{}".format(idx))
+                        for idx in range(3)]
+        self.reactor = V4l2CaptureReactor()
+        self.addCleanup(self.reactor.close)
+        for stream in self.streams:
+            self.addCleanup(stream.close)
+
+    def test_poll(self):
+        for stream in self.streams:
+            self.reactor.register(stream)
+        self.streams[0].make_ready(1)
+        self.streams[2].make_ready(0, 2)
+        frames = self.reactor.poll(timeout=1)
+        self.assertEqual(sorted((frame.device.device, bytes(frame.data))
+                                for frame in frames),
+                         [("/dev/fake0", b"frame1"),
+                          ("/dev/fake2", b"frame0")])
+        for frame in frames:
+            frame.release()
+        # One frame per stream and wakeup.
+        frames = self.reactor.poll(timeout=1)
+        self.assertEqual([bytes(frame.data) for frame in frames],
+                         [b"frame2"])
+        self.assertEqual(self.reactor.poll(timeout=0), [])
+
+    def test_batches(self):
+        self.reactor.register(self.streams[0], batch_size=2)
+        self.streams[0].make_ready(0, 1, 2)
+        frames = self.reactor.poll(timeout=1)
+        self.assertEqual([frame.index for frame in frames], [0, 1])
+        self.assertEqual(self.streams[0].batch_statistics.multi_frame_batches,
+                         1)
+        with self.assertRaises(ValueError):
+            self.reactor.register(self.streams[1], batch_size=0)
+
+    def test_callback(self):
+        received = []
+        self.reactor.register(self.streams[0],
+                              lambda frame: received.append(
+                                  bytes(frame.data)))
+        self.reactor.register(self.streams[1])
+        self.streams[0].make_ready(2)
+        self.assertEqual(self.reactor.poll(timeout=1), [])
+        self.assertEqual(received, [b"frame2"])
+        # Released after the callback.
+        self.assertEqual(self.streams[0].requeued, [2])
+
+    def test_drain_error(self):
+        self.reactor.register(self.streams[0])
+        self.reactor.register(self.streams[1])
+
+        def fail(max_frames):
+            raise OSError("unplugged")
+        self.streams[1].drain = fail
+        # Ready in this order, so that one frame is dequeued before the error.
+        self.streams[0].make_ready(2)
+        self.streams[1].make_ready(0)
+        with self.assertRaises(OSError):
+            self.reactor.poll(timeout=1)
+        self.assertEqual(self.streams[0].requeued, [2])
+
+    def test_callback_error(self):
+        def fail(frame):
+            raise RuntimeError("callback")
+        self.reactor.register(self.streams[0])
+        self.reactor.register(self.streams[1], fail)
+        self.streams[0].make_ready(1)
+        self.streams[1].make_ready(0)
+        with self.assertRaises(RuntimeError):
+            self.reactor.poll(timeout=1)
+        self.assertEqual(self.streams[0].requeued, [1])
+        self.assertEqual(self.streams[1].requeued, [0])
+
+    def test_stopped_stream_unregistered(self):
+        stream = self.streams[0]
+        self.reactor.register(stream)
+        stream._streaming = False
+        # The device file keeps being reported.
+        stream.make_ready(0)
+        self.assertEqual(self.reactor.poll(timeout=1), [])
+        self.assertEqual(len(self.reactor), 0)
+        self.assertEqual(self.reactor.poll(timeout=0), [])
+        with self.assertRaises(KeyError):
+            self.reactor.unregister(stream)
+
+    def test_hang_up_unregistered(self):
+        stream = self.streams[0]
+        self.reactor.register(stream)
+        self.reactor.register(self.streams[1])
+        # The read end of a pipe reports EPOLLHUP once the write end is gone.
+        os.close(stream.write_fd)
+        stream.write_fd = os.open(os.devnull, os.O_WRONLY)
+        self.assertEqual(self.reactor.poll(timeout=1), [])
+        self.assertEqual(self.reactor.streams, (self.streams[1],))
+        self.assertTrue(os.get_blocking(stream.read_fd))
+
+    def test_dropped_callback(self):
+        dropped = []
+        reactor = V4l2CaptureReactor(dropped_callback=dropped.append)
+        self.addCleanup(reactor.close)
+        for stream in self.streams:
+            reactor.register(stream)
+        self.streams[0]._streaming = False
+        self.streams[0].make_ready(0)
+        os.close(self.streams[1].write_fd)
+        self.streams[1].write_fd = os.open(os.devnull, os.O_WRONLY)
+        self.streams[2].make_ready(1)
+        frames = reactor.poll(timeout=1)
+        self.assertEqual([frame.index for frame in frames], [1])
+        frames[0].release()
+        self.assertCountEqual(dropped, self.streams[:2])
+        self.assertEqual(reactor.streams, (self.streams[2],))
+        # Only reported once.
+        self.assertEqual(reactor.poll(timeout=0), [])
+        self.assertEqual(len(dropped), 2)
+
+    def test_register(self):
+        stream = self.streams[0]
+        self.reactor.register(stream)
+        self.assertFalse(os.get_blocking(stream.read_fd))
+        with self.assertRaises(ValueError):
+            self.reactor.register(stream)
+        self.assertEqual(self.reactor.streams, (stream,))
+        self.reactor.unregister(stream)
+        self.assertTrue(os.get_blocking(stream.read_fd))
+        self.assertEqual(len(self.reactor), 0)
+        with self.assertRaises(KeyError):
+            self.reactor.unregister(stream)
+
+        stream._streaming = False
+        with self.assertRaises(ValueError):
+            self.reactor.register(stream)
+
+    def test_close(self):
+        self.reactor.register(self.streams[0])
+        self.reactor.close()
+        self.assertTrue(self.reactor.closed)
+        self.assertTrue(os.get_blocking(self.streams[0].read_fd))
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+import asyncio
+import ctypes
+import mmap
+import os
+import site
+import tempfile
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from fakestream import FakeStreamDevice, PipeStream, \
+                       fake_buffer  # noqa E402
+from v4l2ctl import V4l2CapturedFrame, V4l2MmapStream, \
+                    V4l2UserPtrStream, V4l2BufferType, IoctlError, \
+                    FeatureNotSupported, IoctlWouldBlock, \
+                    V4l2BatchStatistics, V4l2BufferFlags, \
+                    V4l2StreamStatistics  # noqa E402
+from v4l2ctl.v4l2stream import _plane_views  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlstructs import V4l2IoctlPlane  # noqa E402
+
+
+PAGE_SIZE = mmap.PAGESIZE
+
+
+class FakeStream(object):
+    """Records the buffers handed back to the driver."""
+    def __init__(self):
+        self.requeued = []
+
+    def _requeue(self, index):
+        self.requeued.append(index)
+
+
+class CapturedFrameTest(TestCase):
+    def setUp(self):
+        self.stream = FakeStream()
+
+    def test_single_planar(self):
+        frame = V4l2CapturedFrame(self.stream, 1, memoryview(b"abcd"), 4)
+        self.assertEqual(len(frame.planes), 1)
+        self.assertEqual(bytes(frame.planes[0].data), b"abcd")
+        frame.release()
+        frame.release()
+        self.assertEqual(self.stream.requeued, [1])
+        with self.assertRaises(ValueError):
+            frame.planes
+
+    def test_multi_planar(self):
+        planes = (V4l2IoctlPlane * 3)()
+        planes[0].bytesused, planes[0].data_offset = 6, 2
+        planes[1].bytesused = 3
+        views = (memoryview(b"..YYYY.."), memoryview(b"UVUV"))
+        frame_planes = _plane_views(views, planes, 2)
+        frame = V4l2CapturedFrame(self.stream, 0, frame_planes[0].data,
+                                  frame_planes[0].bytesused, frame_planes)
+        self.assertEqual([bytes(plane.data) for plane in frame.planes],
+                         [b"YYYY", b"UVU"])
+        self.assertEqual(frame.planes[0].data_offset, 2)
+        self.assertEqual(bytes(frame.data), b"YYYY")
+        with frame:
+            pass
+        self.assertEqual(self.stream.requeued, [0])
+        with self.assertRaises(ValueError):
+            frame_planes[1].data.tobytes()
+
+
+class MmapStreamTest(TestCase):
+    def setUp(self):
+        # The device file holds b"frame<index>" at the start of every buffer.
+        self.file = tempfile.TemporaryFile()
+        for index in range(4):
+            self.file.seek(index * PAGE_SIZE)
+            self.file.write("frame{}".format(index).encode())
+        self.file.truncate(4 * PAGE_SIZE)
+        self.file.flush()
+        self.device = FakeStreamDevice(V4l2BufferType.VIDEO_CAPTURE)
+        self.device.fileno = self.file.fileno
+        self.ioc_ops = self.device._ioc_ops
+        self.stream = V4l2MmapStream(self.device, buffer_count=3)
+
+    def tearDown(self):
+        self.stream.stop()
+        self.file.close()
+
+    def test_start_and_stop(self):
+        self.stream.start()
+        self.assertTrue(self.stream.streaming)
+        self.assertEqual(self.stream.buffer_count, 3)
+        self.assertEqual(self.ioc_ops.requested_counts, [3])
+        self.assertEqual(self.ioc_ops.calls["query_buffer"], 3)
+        self.assertEqual(self.ioc_ops.calls["stream_on"], 1)
+        self.assertEqual([fields["index"] for fields in self.ioc_ops.queued],
+                         [0, 1, 2])
+        self.assertEqual(self.device.opened, 1)
+        self.assertTrue(self.device.private)
+
+        self.stream.stop()
+        self.assertFalse(self.stream.streaming)
+        self.assertEqual(self.stream.buffer_count, 0)
+        self.assertEqual(self.ioc_ops.calls["stream_off"], 1)
+        self.assertEqual(self.ioc_ops.requested_counts, [3, 0])
+        self.assertEqual(self.device.opened, 0)
+
+    def test_dequeue_and_release(self):
+        self.stream.start()
+        self.assertIsNone(self.stream.try_dequeue())
+        self.ioc_ops.ready.append(fake_buffer(1, 6))
+        frame = self.stream.dequeue(timeout=0)
+        self.assertEqual(frame.index, 1)
+        self.assertEqual(bytes(frame.data), b"frame1")
+        del self.ioc_ops.queued[:]
+        frame.release()
+        self.assertEqual(self.ioc_ops.queued[0]["index"], 1)
+        with self.assertRaises(ValueError):
+            frame.data.tobytes()
+
+    def test_released_after_stop(self):
+        self.stream.start()
+        self.ioc_ops.ready.append(fake_buffer(2, 6))
+        frame = self.stream.dequeue(timeout=0)
+        self.stream.stop()
+        del self.ioc_ops.queued[:]
+        frame.release()
+        self.assertEqual(self.ioc_ops.queued, [])
+
+    def test_not_streaming(self):
+        with self.assertRaises(ValueError):
+            self.stream.dequeue()
+
+    def test_partial_failure(self):
+        self.ioc_ops.failing.add("stream_on")
+        with self.assertRaises(IoctlError):
+            self.stream.start()
+        self.assertFalse(self.stream.streaming)
+        self.assertEqual(self.stream.buffer_count, 0)
+        self.assertEqual(self.stream._maps, [])
+        self.assertEqual(self.ioc_ops.requested_counts, [3, 0])
+        self.assertEqual(self.device.opened, 0)
+
+        self.ioc_ops.failing = {"query_buffer"}
+        with self.assertRaises(IoctlError):
+            self.stream.start()
+        self.assertEqual(self.ioc_ops.requested_counts, [3, 0, 3, 0])
+        self.assertEqual(self.device.opened, 0)
+
+
+class ExportBuffersTest(TestCase):
+    def setUp(self):
+        self.device = FakeStreamDevice(V4l2BufferType.VIDEO_CAPTURE_MPLANE)
+        self.stream = V4l2MmapStream(self.device)
+        # Two buffers with two planes each, without mapping anything.
+        self.stream._maps = [(None, None), (None, None)]
+        self.stream._streaming = True
+
+    def test_exported_once(self):
+        fds = self.stream.export_buffers()
+        self.assertEqual(len(fds), 2)
+        self.assertEqual([len(plane_fds) for plane_fds in fds], [2, 2])
+        self.assertIs(self.stream.export_buffers(), fds)
+        frame = V4l2CapturedFrame(self.stream, 1, memoryview(b""), 0)
+        self.assertEqual(frame.dmabuf_fds, fds[1])
+        self.assertEqual(self.device._ioc_ops.calls["export_buffer"], 4)
+
+    def test_closed_with_stream(self):
+        self.stream.export_buffers()
+        self.stream._close_dmabuf_fds()
+        for fd in self.device._ioc_ops.exported:
+            with self.assertRaises(OSError):
+                os.fstat(fd)
+
+    def test_not_streaming(self):
+        self.stream._streaming = False
+        with self.assertRaises(ValueError):
+            self.stream.export_buffers()
+
+
+class UserPtrStreamTest(TestCase):
+    def setUp(self):
+        self.device = FakeStreamDevice(V4l2BufferType.VIDEO_CAPTURE,
+                                       sizeimage=5000)
+        self.buffers = V4l2UserPtrStream.allocate_buffers(3, 5000)
+
+    def test_allocate_buffers(self):
+        self.assertEqual([len(buffer) for buffer in self.buffers],
+                         [-(-5000 // PAGE_SIZE) * PAGE_SIZE] * 3)
+
+    def test_start(self):
+        stream = V4l2UserPtrStream(self.device, self.buffers)
+        with stream:
+            self.assertEqual(stream.buffer_count, 3)
+            queued = self.device._ioc_ops.queued
+            self.assertEqual([fields["index"] for fields in queued],
+                             [0, 1, 2])
+            for fields, buffer in zip(queued, self.buffers):
+                address = ctypes.addressof(ctypes.c_char.from_buffer(buffer))
+                self.assertEqual(fields["userptr"], address)
+                self.assertEqual(fields["length"], len(buffer))
+        self.assertEqual(stream.buffer_count, 0)
+
+    def test_pinned_while_streaming(self):
+        buffer = bytearray(PAGE_SIZE * 3)
+        offset = -ctypes.addressof(ctypes.c_char.from_buffer(buffer)) % \
+            PAGE_SIZE
+        view = memoryview(buffer)[offset:offset + PAGE_SIZE * 2]
+        with V4l2UserPtrStream(self.device, [view]):
+            with self.assertRaises(BufferError):
+                buffer.extend(b"more")
+        view.release()
+        buffer.extend(b"more")
+
+    def test_invalid_buffers(self):
+        with self.assertRaises(ValueError):
+            V4l2UserPtrStream(self.device, [])
+        with self.assertRaises(ValueError):
+            V4l2UserPtrStream(self.device, [bytes(PAGE_SIZE)])
+        with self.assertRaises(ValueError):
+            V4l2UserPtrStream(self.device, [memoryview(self.buffers[0])[1:]])
+
+    def test_rejected_by_driver(self):
+        buffer = bytearray(PAGE_SIZE * 3)
+        offset = -ctypes.addressof(ctypes.c_char.from_buffer(buffer)) % \
+            PAGE_SIZE
+        view = memoryview(buffer)[offset:offset + PAGE_SIZE * 2]
+        stream = V4l2UserPtrStream(self.device, [view])
+        self.device._ioc_ops.failing.add("request_buffers")
+        # Keep the traceback alive (assertRaises would clear its frames).
+        try:
+            stream.start()
+        except IoctlError as e:
+            error = e
+        self.assertIsNotNone(error.__traceback__)
+        self.assertFalse(stream.streaming)
+        self.assertEqual(self.device.opened, 0)
+        view.release()
+        buffer.extend(b"more")
+
+    def test_not_exportable(self):
+        stream = V4l2UserPtrStream(self.device, self.buffers)
+        with stream:
+            frame = V4l2CapturedFrame(stream, 0, memoryview(b""), 0)
+            with self.assertRaises(FeatureNotSupported):
+                frame.dmabuf_fds
+            with self.assertRaises(FeatureNotSupported):
+                stream.export_buffers()
+            frame.release()
+
+    def test_too_small(self):
+        buffers = self.buffers + V4l2UserPtrStream.allocate_buffers(1, 100)
+        stream = V4l2UserPtrStream(self.device, buffers)
+        if PAGE_SIZE >= 5000:
+            self.skipTest("One page holds the whole image.")
+        with self.assertRaises(ValueError):
+            stream.start()
+        self.assertFalse(stream.streaming)
+        self.assertEqual(self.device._ioc_ops.queued, [])
+
+
+class PipeStreamTest(TestCase):
+    def setUp(self):
+        self.stream = PipeStream()
+
+    def tearDown(self):
+        self.stream.close()
+
+    def test_aiter_frames(self):
+        async def capture():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.01, self.stream.make_ready, 1)
+            loop.call_later(0.02, self.stream.make_ready, 2, 0)
+            frames = []
+            async for frame in self.stream.aiter_frames():
+                frames.append(bytes(frame.data))
+                if len(frames) == 3:
+                    break
+            return frames
+
+        self.assertEqual(asyncio.run(capture()),
+                         [b"frame1", b"frame2", b"frame0"])
+        # Every frame was released and handed back to the driver.
+        self.assertEqual(self.stream.requeued, [1, 2, 0])
+        self.assertTrue(os.get_blocking(self.stream.read_fd))
+
+    def test_aiter_frames_not_watched_while_held(self):
+        wakeups = []
+
+        async def capture():
+            loop = asyncio.get_running_loop()
+            add_reader = loop.add_reader
+
+            def counting_add_reader(fd, callback, *args):
+                def counted(*args):
+                    wakeups.append(fd)
+                    callback(*args)
+                add_reader(fd, counted, *args)
+            loop.add_reader = counting_add_reader
+
+            self.stream.make_ready(0, 1)
+            frames = self.stream.aiter_frames()
+            frame = await frames.__anext__()
+            # Buffer 1 is ready while frame 0 is held.
+            await asyncio.sleep(0.1)
+            held_wakeups = len(wakeups)
+            self.assertEqual((await frames.__anext__()).index, 1)
+            loop.call_later(0.01, self.stream.make_ready, 2)
+            self.assertEqual((await frames.__anext__()).index, 2)
+            await frames.aclose()
+            return frame.index, held_wakeups
+
+        self.assertEqual(asyncio.run(capture()), (0, 0))
+        # Woken up once for buffer 2.
+        self.assertEqual(len(wakeups), 1)
+
+    def test_iter_batches(self):
+        batches = self.stream.iter_batches(batch_size=2, timeout=0)
+        self.assertEqual(next(batches), [])
+        self.stream.make_ready(0, 1, 2)
+        self.assertEqual([frame.index for frame in next(batches)], [0, 1])
+        self.assertEqual([frame.index for frame in next(batches)], [2])
+        self.assertEqual(self.stream.requeued, [0, 1])
+        batches.close()
+        self.assertEqual(self.stream.requeued, [0, 1, 2])
+        self.assertTrue(os.get_blocking(self.stream.read_fd))
+        self.assertEqual(self.stream.batch_statistics,
+                         V4l2BatchStatistics(batches=2,
+                                             frames=3,
+                                             multi_frame_batches=1,
+                                             largest=2))
+
+    def test_drain(self):
+        os.set_blocking(self.stream.read_fd, False)
+        self.assertEqual(self.stream.drain(3), [])
+        self.stream.make_ready(2)
+        self.assertEqual([frame.index for frame in self.stream.drain(3)],
+                         [2])
+        self.assertEqual(self.stream.batch_statistics,
+                         V4l2BatchStatistics(1, 1, 0, 1))
+
+    def test_try_dequeue(self):
+        os.set_blocking(self.stream.read_fd, False)
+        self.assertIsNone(self.stream.try_dequeue())
+        self.stream.make_ready(2)
+        self.assertEqual(self.stream.try_dequeue().index, 2)
+
+    def test_dequeue_buffer_taken_meanwhile(self):
+        dequeue_buffer = self.stream._dequeue_buffer
+
+        def taken_by_another_reader():
+            # The device file was readable, but the buffer is gone by now.
+            os.read(self.stream.read_fd, 1)
+            self.stream._dequeue_buffer = dequeue_buffer
+            raise IoctlWouldBlock("/dev/fake", "DequeueBuffer", 0, -1)
+        self.stream._dequeue_buffer = taken_by_another_reader
+
+        self.stream.make_ready(0)
+        self.assertIsNone(self.stream.dequeue(timeout=0.01))
+        self.stream._dequeue_buffer = taken_by_another_reader
+        self.stream.make_ready(1, 2)
+        self.assertEqual(self.stream.dequeue(timeout=1).index, 2)
+
+    def test_metadata(self):
+        self.stream.make_ready(1, 2)
+        self.stream.dequeue().release()
+        frame = self.stream.dequeue()
+        self.assertEqual(frame.sequence, 1)
+        self.assertAlmostEqual(frame.timestamp, 100.033333)
+        self.assertEqual(frame.flags, V4l2BufferFlags(0))
+        self.assertEqual(frame.field, 1)
+        frame.release()
+
+    def test_statistics(self):
+        self.assertEqual(self.stream.statistics,
+                         V4l2StreamStatistics(0, 0, 0, 0, 0.0, 0.0, 0.0, 0.0))
+        self.stream.make_ready(0, 1, 2)
+        for _ in range(3):
+            self.stream.dequeue().release()
+        self.stream.drop(2)
+        self.stream.make_ready(0)
+        self.stream.dequeue().release()
+
+        statistics = self.stream.statistics
+        self.assertEqual(statistics[:4], (4, 0, 1, 2))
+        # 3 intervals over 5 periods.
+        self.assertAlmostEqual(statistics.fps, 3 / (5 * 0.033333))
+        # The intervals are 1, 1 and 3 periods, 5/3 on average.
+        self.assertAlmostEqual(statistics.jitter_p50, 2 / 3 * 0.033333)
+        self.assertAlmostEqual(statistics.jitter_p99, 4 / 3 * 0.033333)
+
+
+if __name__ == "__main__":
+    run_tests()
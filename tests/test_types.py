@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from unittest import TestCase, main as run_tests
+from fractions import Fraction
+from math import inf
+import site
+
+site.addsitedir(r".")  # For running with pytest
+site.addsitedir(r"..")  # For executing this file as is.
+
+from v4l2ctl.v4l2types import V4l2Fraction  # noqa E402
+from v4l2ctl.ioctls.v4l2ioctlstructs import V4l2IoctlFract  # noqa E402
+
+
+class V4l2FractionTest(TestCase):
+    def test_raw_values(self):
+        fraction = V4l2Fraction._from_v4l2(V4l2IoctlFract(1001, 30000))
+        self.assertEqual((fraction.numerator, fraction.denominator),
+                         (1001, 30000))
+        fraction = V4l2Fraction(2, 60)
+        self.assertEqual((fraction.numerator, fraction.denominator), (2, 60))
+        self.assertEqual(bytes(fraction._to_v4l2()),
+                         bytes(V4l2IoctlFract(2, 60)))
+
+    def test_equality_and_hash(self):
+        for value, other in [(V4l2Fraction(2, 60), V4l2Fraction(1, 30)),
+                             (V4l2Fraction(2, 60), Fraction(1, 30)),
+                             (V4l2Fraction(60, 2), 30),
+                             (V4l2Fraction(1, 4), 0.25),
+                             (V4l2Fraction(-3, 6), Fraction(-1, 2)),
+                             ]:
+            with self.subTest(value=value, other=other):
+                self.assertEqual(value, other)
+                self.assertEqual(other, value)
+                self.assertEqual(hash(value), hash(other))
+        self.assertNotEqual(V4l2Fraction(1, 30), V4l2Fraction(1, 25))
+        self.assertNotEqual(V4l2Fraction(1, 30), "1/30")
+        self.assertNotEqual(V4l2Fraction(0, 0), 0)
+        self.assertEqual(len({V4l2Fraction(1, 30), V4l2Fraction(2, 60),
+                              Fraction(1, 30)}), 1)
+
+    def test_zero_denominator(self):
+        undefined = V4l2Fraction(0, 0)
+        infinite = V4l2Fraction(1, 0)
+        self.assertNotEqual(undefined, V4l2Fraction(1, 30))
+        self.assertNotEqual(V4l2Fraction(1, 30), undefined)
+        self.assertNotEqual(infinite, undefined)
+        self.assertNotEqual(infinite, V4l2Fraction(1, 30))
+        self.assertEqual(undefined, V4l2Fraction(0, 0))
+        self.assertEqual(hash(undefined), hash(V4l2Fraction(0, 0)))
+        self.assertEqual(infinite, V4l2Fraction(30, 0))
+        self.assertEqual(infinite, inf)
+        self.assertEqual(hash(infinite), hash(inf))
+        self.assertEqual(V4l2Fraction(-1, 0), -inf)
+        self.assertEqual(hash(V4l2Fraction(-1, 0)), hash(-inf))
+        self.assertNotEqual(V4l2Fraction(-1, 0), infinite)
+        self.assertEqual(len({undefined, infinite, V4l2Fraction(0, 0),
+                              V4l2Fraction(2, 0), V4l2Fraction(1, 30)}), 3)
+
+        self.assertGreater(infinite, 1)
+        self.assertGreater(infinite, V4l2Fraction(30, 1))
+        self.assertLess(V4l2Fraction(30, 1), infinite)
+        self.assertLess(V4l2Fraction(-1, 0), Fraction(-30))
+        for other in [1, V4l2Fraction(1, 30), infinite]:
+            with self.subTest(other=other):
+                self.assertFalse(undefined < other)
+                self.assertFalse(undefined >= other)
+                self.assertFalse(other < undefined)
+        self.assertEqual(float(infinite), inf)
+
+    def test_ordering(self):
+        intervals = [V4l2Fraction(1, 15), V4l2Fraction(1, 60),
+                     V4l2Fraction(1001, 30000), V4l2Fraction(1, 30)]
+        self.assertEqual(sorted(intervals),
+                         [V4l2Fraction(1, 60), V4l2Fraction(1, 30),
+                          V4l2Fraction(1001, 30000), V4l2Fraction(1, 15)])
+        self.assertLess(V4l2Fraction(1, 30), Fraction(1, 29))
+        self.assertGreater(Fraction(1, 29), V4l2Fraction(1, 30))
+        self.assertLessEqual(V4l2Fraction(1, 30), 1)
+        self.assertGreaterEqual(V4l2Fraction(30, 1), 30)
+        self.assertLess(V4l2Fraction(30, 1), inf)
+        with self.assertRaises(TypeError):
+            V4l2Fraction(1, 30) < "1"
+
+    def test_fps(self):
+        self.assertEqual(V4l2Fraction(1, 30).fps, 30.0)
+        self.assertAlmostEqual(V4l2Fraction(1001, 30000).fps, 29.97, 2)
+        self.assertEqual(V4l2Fraction(0, 1).fps, inf)
+        self.assertEqual(V4l2Fraction(1, 30).reciprocal, 30)
+        self.assertEqual(float(V4l2Fraction(1, 4)), 0.25)
+
+    def test_fraction_interop(self):
+        self.assertEqual(V4l2Fraction(2, 60).as_fraction(), Fraction(1, 30))
+        self.assertIsInstance(V4l2Fraction(2, 60).as_fraction(), Fraction)
+        self.assertEqual(1 / V4l2Fraction(1, 30), 30)
+        self.assertEqual(V4l2Fraction(1, 30) + Fraction(1, 30),
+                         Fraction(1, 15))
+        self.assertEqual(V4l2Fraction(1, 2) * 2, 1)
+        self.assertEqual(V4l2Fraction(1, 2) - V4l2Fraction(1, 4),
+                         Fraction(1, 4))
+        self.assertEqual(-V4l2Fraction(1, 2), Fraction(-1, 2))
+
+    def test_str(self):
+        self.assertEqual(str(V4l2Fraction(2, 60)), "2/60")
+        self.assertEqual(repr(V4l2Fraction(2, 60)), "V4l2Fraction(2, 60)")
+
+
+if __name__ == "__main__":
+    run_tests()
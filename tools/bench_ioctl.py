@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+"""Micro-benchmark of the ioctl dispatch overhead.
+
+The ioctl system call itself is replaced by a no-op, so that only the python
+side of the dispatch (buffer creation, field setting, file handling) is
+measured. The device file is kept open, as it is while streaming.
+
+The "baseline" column is the dispatch before requests could be reused: a new
+buffer per call, every field checked with getattr() and the file handle's
+context manager entered every time.
+"""
+import argparse
+import site
+import sys
+import timeit
+from pathlib import Path
+
+site.addsitedir(str(Path(__file__).resolve().parent.parent))
+
+from v4l2ctl.ioctls import v4l2ioctl  # noqa E402
+from v4l2ctl.ioctls import V4l2BufferType, V4l2Memory  # noqa E402
+from v4l2ctl.utils.filehandle import FileHandleCM  # noqa E402
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=200000,
+                        help="calls per measurement (default 200000)")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="measurements per case (default 5)")
+    return parser.parse_args(argv)
+
+
+def baseline_call(request, **kwargs):
+    """Run a request like the dispatch before precompiled requests did."""
+    buff = request._buffer_type()
+    for key, value in kwargs.items():
+        getattr(buff, key)
+        setattr(buff, key, value)
+    with request._device as dev_fd:
+        ret_code = v4l2ioctl.ioctl(dev_fd, request.code, buff)
+    if ret_code != 0:
+        raise v4l2ioctl.IoctlError(request._device.filename,
+                                   request.name,
+                                   request.code,
+                                   ret_code)
+    return buff
+
+
+def main(argv):
+    args = parse_args(argv)
+
+    # Only measure the python overhead.
+    v4l2ioctl.ioctl = lambda fd, code, buff: 0
+
+    handle = FileHandleCM("/dev/null", {"mode": "rb"})
+    handle.open()
+    ops = v4l2ioctl.V4l2IocOps(handle)
+
+    capture = V4l2BufferType.VIDEO_CAPTURE
+    mmap = V4l2Memory.MMAP
+    # (name, request, fixed fields, varying fields)
+    cases = [
+        ("enum_fmt", ops.enum_fmt, {"type": capture}, {"index": 3}),
+        ("dequeue_buffer", ops.dequeue_buffer,
+         {"type": capture, "memory": mmap}, {}),
+        ("queue_buffer", ops.queue_buffer,
+         {"type": capture, "memory": mmap}, {"index": 1}),
+    ]
+
+    print("{:<16}{:>12}{:>12}{:>12}{:>14}".format("op [ns/call]", "baseline",
+                                                 "call", "reuse",
+                                                 "precompiled"))
+    for name, request, fixed, varying in cases:
+        all_fields = dict(fixed, **varying)
+        precompiled = request.precompile(**fixed)
+        funcs = [lambda: baseline_call(request, **all_fields),
+                 lambda: request(**all_fields),
+                 lambda: request.reuse(**all_fields),
+                 lambda: precompiled(**varying),
+                 ]
+        results = []
+        for func in funcs:
+            best = min(timeit.repeat(func,
+                                     number=args.number,
+                                     repeat=args.repeat))
+            results.append(best / args.number * 1e9)
+        print("{:<16}{:>12.0f}{:>12.0f}{:>12.0f}{:>14.0f}".format(name,
+                                                              *results))
+
+    handle.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -15,13 +15,64 @@
 # limitations under the Licence.
 ###############################################################################
 __all__ = ["V4l2Device", "V4l2Capabilities", "V4l2BufferType", "V4l2Formats",
-           "V4l2FormatDescFlags",
-           "IoctlError", "FeatureNotSupported"
+           "V4l2FormatDescFlags", "V4l2Memory", "V4l2BufferFlags",
+           "V4l2Stream", "V4l2MmapStream", "V4l2UserPtrStream",
+           "V4l2CapturedFrame", "V4l2FramePlane", "V4l2BatchStatistics",
+           "V4l2StreamStatistics",
+           "V4l2CaptureReactor", "V4l2FrameGrabber", "V4l2GrabStatistics",
+           "V4l2FrameQueue", "V4l2QueueStatistics",
+           "V4l2SysfsInventory", "V4l2DeviceInfo", "V4l2FormatCache",
+           "V4l2ModeNegotiator", "V4l2Mode", "V4l2ModeTable", "V4l2ModeRow",
+           "V4l2DataFormat", "V4l2PlaneFormat",
+           "IoctlError", "EndOfEnumeration", "IoctlNotSupported",
+           "IoctlWouldBlock", "FeatureNotSupported"
            ]
 __author__ = "Michael Israel"
 __version__ = "0.1a5"
 
 
 from .v4l2device import V4l2Device, FeatureNotSupported
+from .v4l2types import V4l2DataFormat, V4l2PlaneFormat
 from .ioctls import V4l2Capabilities, V4l2BufferType, IoctlError, \
-                    V4l2Formats, V4l2FormatDescFlags
+                    V4l2FormatDescFlags, V4l2Memory, V4l2BufferFlags, \
+                    EndOfEnumeration, IoctlNotSupported, IoctlWouldBlock
+from importlib import import_module
+
+
+# Names which are only loaded on first access, and the modules defining them.
+# V4l2Formats is big, and the other modules are only needed by some
+# applications.
+_LAZY_NAMES = {
+    "V4l2Formats": ".ioctls",
+    "V4l2Stream": ".v4l2stream",
+    "V4l2MmapStream": ".v4l2stream",
+    "V4l2UserPtrStream": ".v4l2stream",
+    "V4l2CapturedFrame": ".v4l2stream",
+    "V4l2FramePlane": ".v4l2stream",
+    "V4l2BatchStatistics": ".v4l2stream",
+    "V4l2StreamStatistics": ".v4l2stream",
+    "V4l2CaptureReactor": ".v4l2reactor",
+    "V4l2FrameGrabber": ".v4l2grab",
+    "V4l2GrabStatistics": ".v4l2grab",
+    "V4l2FrameQueue": ".v4l2grab",
+    "V4l2QueueStatistics": ".v4l2grab",
+    "V4l2SysfsInventory": ".v4l2inventory",
+    "V4l2DeviceInfo": ".v4l2inventory",
+    "V4l2FormatCache": ".v4l2cache",
+    "V4l2ModeNegotiator": ".v4l2negotiate",
+    "V4l2Mode": ".v4l2negotiate",
+    "V4l2ModeTable": ".v4l2modetable",
+    "V4l2ModeRow": ".v4l2modetable",
+    }
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY_NAMES[name]
+    except KeyError:
+        raise AttributeError(
+            "module '{}' has no attribute '{}'".format(__name__,
+                                                       name)) from None
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
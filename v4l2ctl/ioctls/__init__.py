@@ -16,10 +16,23 @@
 ###############################################################################
 __all__ = ["V4l2IocOps", "V4l2Capabilities", "V4l2BufferType", "V4l2Formats",
            "V4l2FormatDescFlags", "V4l2FrameSizeTypes", "V4l2FrameIvalTypes",
-           "IoctlError"
+           "V4l2Memory", "V4l2BufferFlags", "IoctlError", "EndOfEnumeration",
+           "IoctlNotSupported", "IoctlWouldBlock"
            ]
 
-from .v4l2ioctl import V4l2IocOps, IoctlError
-from .v4l2ioctlenums import V4l2Formats, V4l2FormatDescFlags, \
-                            V4l2FrameSizeTypes, V4l2FrameIvalTypes, \
-                            V4l2Capabilities, V4l2BufferType
+from .v4l2ioctl import V4l2IocOps, IoctlError, EndOfEnumeration, \
+                       IoctlNotSupported, IoctlWouldBlock
+from .v4l2ioctlenums import V4l2FormatDescFlags, V4l2FrameSizeTypes, \
+                            V4l2FrameIvalTypes, V4l2Capabilities, \
+                            V4l2BufferType, V4l2Memory, V4l2BufferFlags
+from . import v4l2ioctlenums as _enums
+
+
+def __getattr__(name):
+    # The format enums are loaded on first access (see v4l2ioctlenums).
+    if name in _enums._lazy_format_enums:
+        value = getattr(_enums, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(
+        "module '{}' has no attribute '{}'".format(__name__, name))
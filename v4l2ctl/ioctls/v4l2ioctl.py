@@ -20,33 +20,78 @@ from .v4l2ioctlstructs import V4l2IoctlFmtDesc, \
                               V4l2IoctlFrameIvalEnum, \
                               V4l2IoctlCropCap, \
                               V4l2IoctlCrop, \
-                              V4l2IoctlCapability
+                              V4l2IoctlCapability, \
+                              V4l2IoctlRequestBuffers, \
+                              V4l2IoctlBuffer, \
+                              V4l2IoctlFormat, \
+                              V4l2IoctlExportBuffer
+from ..utils.filehandle import FileHandleStatus
 from enum import IntEnum
 from fcntl import ioctl
+from errno import EINTR, EINVAL, ENOTTY, EAGAIN
+from os import strerror
+import ctypes
 
 
 ###############################################################################
 # Exception classes
 ###############################################################################
 class IoctlError(Exception):
-    """Raised when ioctl() returns a non-zero value."""
-    def __init__(self, device, name, request, return_code, extra_msg=None):
+    """Raised when ioctl() returns a non-zero value.
+
+    The error message is only formatted when it is actually requested, which
+    keeps expected errors (like the end of an enumeration) cheap.
+
+    Attributes:
+        errno (int): the error number reported by the ioctl call, or None.
+    """
+    def __init__(self, device, name, request, return_code, extra_msg=None,
+                 errno=None):
         super().__init__()
-        self._info = {"device": device,
-                      "name": name,
-                      "request": request,
-                      "return_code": return_code,
-                      }
+        self._device = device
+        self._name = name
+        self._request = request
+        self._return_code = return_code
         self._extra_msg = extra_msg
+        self.errno = errno
 
     def __str__(self):
         msg = ("The ioctl request '{name}' ({request:#X}) on '{device}' "
-               "returned '{return_code}'.").format(**self._info)
+               "returned '{return_code}'.").format(
+                   name=self._name,
+                   request=self._request,
+                   device=self._device,
+                   return_code=self._return_code,
+                   )
+        if self.errno is not None:
+            msg += " [Errno {}] {}".format(self.errno, strerror(self.errno))
         if self._extra_msg:
             msg += ": " + self._extra_msg
         return msg
 
 
+class EndOfEnumeration(IoctlError):
+    """Raised when an enumeration request is called with an index beyond the
+    last entry (EINVAL)."""
+
+
+class IoctlNotSupported(IoctlError):
+    """Raised when a request is not supported by the device (ENOTTY)."""
+
+
+class IoctlWouldBlock(IoctlError):
+    """Raised when a request on a non-blocking device would block (EAGAIN)."""
+
+
+# The error classes raised for specific error numbers.
+_ERROR_CLASSES = {ENOTTY: IoctlNotSupported,
+                  EAGAIN: IoctlWouldBlock,
+                  }
+
+# Enumeration requests signal their end with EINVAL.
+_ENUMERATION_ERROR_CLASSES = {**_ERROR_CLASSES, EINVAL: EndOfEnumeration}
+
+
 ###############################################################################
 # An abstraction for all ioctl operations.
 ###############################################################################
@@ -60,73 +105,144 @@ class IoctlDirection(IntEnum):
     RW = R | W
 
 
+def _field_names(buffer_type):
+    """Return the names of all settable fields of a ctypes buffer type,
+    including the fields of anonymous members.
+
+    :meta private:
+    """
+    if not hasattr(buffer_type, "_fields_"):
+        # A simple ctypes type, e.g. ctypes.c_int.
+        return ["value"]
+
+    anonymous = getattr(buffer_type, "_anonymous_", ())
+    names = []
+    for field in buffer_type._fields_:
+        if field[0] in anonymous:
+            names.extend(_field_names(field[1]))
+        else:
+            names.append(field[0])
+    return names
+
+
+#: The field-setter plans, built once per buffer type.
+_setter_plans = {}
+
+_OPENED = FileHandleStatus.Opened
+
+# Used to address a whole buffer without creating a new slice every time.
+_WHOLE = slice(None)
+
+
+def _setter_plan(buffer_type):
+    """Return the set of field names which may be set on a ctypes buffer type.
+
+    :meta private:
+    """
+    try:
+        return _setter_plans[buffer_type]
+    except KeyError:
+        plan = frozenset(_field_names(buffer_type))
+        _setter_plans[buffer_type] = plan
+        return plan
+
+
 class IoctlAbstraction(object):
     """An abstraction for perfroming ioctl operations
 
+    Besides a normal call, which returns a new buffer every time, a request
+    can be precompiled (see :meth:`precompile` and :meth:`reuse`) to run on a
+    reusable buffer. This avoids any allocations in hot paths like streaming.
+
     Keyword arguments:
         device: the device file subject to the ioctl-request.
         name: A name describing this request.
-        direction: A member of IoctlDirection
-        device_type: device type as used by the _IO macros.
-        number: request code number as used by the _IO macros.
+        code: the ioctl request code (see :class:`V4l2IoctlRequest`).
         buffer_type: the class used to instanciate the C-struct buffer
                      used by the ioctl-request.
+        enumeration: if this is an enumeration request, whose end is signaled
+                     by EINVAL (default False).
 
     :meta private:
     """
-    def __init__(self, device, name, direction, device_type, number,
-                 buffer_type):
+    __slots__ = ("_device", "_name", "_code", "_buffer_type", "_setters",
+                 "_error_classes", "_reusable")
+
+    def __init__(self, device, name, code, buffer_type, enumeration=False):
         self._device = device
         self._name = name
+        self._code = code
         self._buffer_type = buffer_type
-        # Create ioctl request-code.
-        self._code = _IOC(direction,
-                          device_type,
-                          number,
-                          _IOC_TYPECHECK(buffer_type),
-                          )
+        self._error_classes = (_ENUMERATION_ERROR_CLASSES if enumeration
+                               else _ERROR_CLASSES)
+        self._setters = _setter_plan(buffer_type)
+        # The reusable request is only created on demand.
+        self._reusable = None
+
+    @property
+    def name(self):
+        """The name describing this request."""
+        return self._name
+
+    @property
+    def code(self):
+        """The ioctl request code."""
+        return self._code
 
     def __call__(self, **kwargs):
         """Runs the ioctl request and returns the buffers."""
-        # Create the buffer.
         buff = self._buffer_type()
+        self._set_fields(buff, kwargs)
+        return self._run(buff)
+
+    def into(self, buff, **kwargs):
+        """Runs the ioctl request on the given buffer and returns it.
 
+        The buffer is not cleared, only the given fields are set.
+        """
+        self._set_fields(buff, kwargs)
+        return self._run(buff)
+
+    def precompile(self, **kwargs):
+        """Returns a :class:`PrecompiledIoctl` for this request.
+
+        The given fields are preset once, so that only the remaining fields
+        have to be set on every call.
+        """
+        return PrecompiledIoctl(self, kwargs)
+
+    def reuse(self, **kwargs):
+        """Runs the ioctl request on the request's own buffer.
+
+        The buffer is cleared before every call and returned. It is only valid
+        until the next call of :meth:`reuse` on this request.
+        """
+        if self._reusable is None:
+            self._reusable = PrecompiledIoctl(self, {})
+        return self._reusable._call(kwargs)
+
+    def _set_fields(self, buff, fields):
         # Store user data (for writable ioctls).
-        for key, value in kwargs.items():
-            # Just to make sure this is a defined field ;)
-            # Otherwise, a new attribute which is not part of the c structure
-            # will be created, and may cause weird difficult to detect
-            # behaviors.
-            getattr(buff, key)
-            # Now set it.
+        setters = self._setters
+        for key, value in fields.items():
+            # Only set defined fields. Otherwise, a new attribute which is not
+            # part of the c structure will be created, and may cause weird
+            # difficult to detect behaviors.
+            if key not in setters:
+                raise AttributeError(
+                    "'{}' object has no attribute '{}'".format(
+                        self._buffer_type.__name__, key))
             setattr(buff, key, value)
 
-        # Run the ioctl request.
-        with self._device as dev_fd:
-            Timeout = 20
-            while Timeout > 0:
-                try:
-                    ret_code = ioctl(dev_fd, self._code, buff)
-                except OSError as e:
-                    if "Errno 4" in str(e):
-                        pass
-                    else:
-                        raise IoctlError(self._device.filename,
-                                         self._name,
-                                         self._code,
-                                         -1,
-                                         str(e),
-                                         ) from None
-                else:
-                    break
-                Timeout -= 1
-            else:
-                raise IoctlError(self._device.filename,
-                                 self._name,
-                                 self._code,
-                                 -1,
-                                 "Call was interrupted 20 times.",
-                                 )
+    def _run(self, buff):
+        # Run the ioctl request. If the device is kept open anyway, there is
+        # no need to go through its context manager.
+        device = self._device
+        if device.status is _OPENED:
+            ret_code = self._ioctl(device.fileno(), buff)
+        else:
+            with device as dev_fd:
+                ret_code = self._ioctl(dev_fd, buff)
 
         # I couldn't figure out a scenario where ret_code is none zero, because
         # so far an exception is always raised when there is an error with the
@@ -140,6 +256,120 @@ class IoctlAbstraction(object):
 
         return buff
 
+    def _ioctl(self, dev_fd, buff):
+        Timeout = 20
+        while Timeout > 0:
+            try:
+                return ioctl(dev_fd, self._code, buff)
+            except OSError as e:
+                err = e.errno
+            # Raise outside of the except clause, so that no exception context
+            # is attached.
+            if err != EINTR:
+                raise self._error_classes.get(err, IoctlError)(
+                    self._device.filename,
+                    self._name,
+                    self._code,
+                    -1,
+                    errno=err,
+                    )
+            Timeout -= 1
+        else:
+            raise IoctlError(self._device.filename,
+                             self._name,
+                             self._code,
+                             -1,
+                             "Call was interrupted 20 times.",
+                             errno=EINTR,
+                             )
+
+
+class PrecompiledIoctl(object):
+    """An ioctl request bound to its own reusable buffer with preset fields.
+
+    Every call restores the preset buffer in place, sets the given fields and
+    runs the request. The returned buffer is only valid until the next call.
+
+    Keyword arguments:
+        request (IoctlAbstraction): the ioctl request.
+        fields (dict): the fields to preset.
+
+    :meta private:
+    """
+    def __init__(self, request, fields):
+        self._request = request
+        self._buffer = request._buffer_type()
+        request._set_fields(self._buffer, fields)
+        self._template = bytes(self._buffer)
+        self._view = memoryview(self._buffer).cast("B")
+
+    def __call__(self, **kwargs):
+        return self._call(kwargs)
+
+    def _call(self, fields):
+        buff = self._buffer
+        self._view[_WHOLE] = self._template
+        if fields:
+            self._request._set_fields(buff, fields)
+        return self._request._run(buff)
+
+
+class V4l2IoctlRequest(object):
+    """The definition of an ioctl request in :class:`V4l2IocOps`.
+
+    The request code is computed once, when the definition is created. The
+    request is bound to a device (see :class:`IoctlAbstraction`) only when it
+    is first accessed on a V4l2IocOps object.
+
+    Used as a decorator, it takes over the name and documentation of the
+    decorated (dummy) function.
+
+    Keyword arguments:
+        name: A name describing this request.
+        direction: A member of IoctlDirection
+        device_type: device type as used by the _IO macros.
+        number: request code number as used by the _IO macros.
+        buffer_type: the class used to instanciate the C-struct buffer
+                     used by the ioctl-request.
+        enumeration: if this is an enumeration request, whose end is signaled
+                     by EINVAL (default False).
+
+    :meta private:
+    """
+    def __init__(self, name, direction, device_type, number, buffer_type,
+                 enumeration=False):
+        self.name = name
+        self.buffer_type = buffer_type
+        self.enumeration = enumeration
+        # Create ioctl request-code.
+        self.code = _IOC(direction,
+                         device_type,
+                         number,
+                         _IOC_TYPECHECK(buffer_type),
+                         )
+        self._attr_name = None
+
+    def __call__(self, func):
+        self.__doc__ = func.__doc__
+        return self
+
+    def __set_name__(self, owner, name):
+        self._attr_name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        request = IoctlAbstraction(obj._device,
+                                   self.name,
+                                   self.code,
+                                   self.buffer_type,
+                                   self.enumeration,
+                                   )
+        # Store the bound request in the instance, so that this descriptor is
+        # bypassed from now on.
+        obj.__dict__[self._attr_name] = request
+        return request
+
 
 ###############################################################################
 # An abstraction for supported ioctl operations on V4L2 devices.
@@ -154,91 +384,17 @@ class V4l2IocOps(object):
 
     :meta private:
     """
-    def __init__(self, device, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-    def __new__(cls, device):
-        # Create base object.
-        obj = super().__new__(cls)
-
-        #######################
-        # Add real callables. #
-        #######################
-        # define VIDIOC_QUERYCAP _IOR('V',  0, struct v4l2_capability)
-        obj.query_cap = IoctlAbstraction(device,
-                                         "QueryCap",
-                                         IoctlDirection.R,
-                                         'V',
-                                         0,
-                                         V4l2IoctlCapability)
-
-        # define VIDIOC_ENUM_FMT _IOWR('V',  2, struct v4l2_fmtdesc)
-        obj.enum_fmt = IoctlAbstraction(device,
-                                        "EnumFmt",
-                                        IoctlDirection.RW,
-                                        'V',
-                                        2,
-                                        V4l2IoctlFmtDesc)
-
-        # define VIDIOC_G_FMT		_IOWR('V',  4, struct v4l2_format)
-        obj.get_format = None
-
-        # define VIDIOC_S_FMT		_IOWR('V',  5, struct v4l2_format)
-        obj.set_format = None
-
-        # define VIDIOC_TRY_FMT		_IOWR('V', 64, struct v4l2_format)
-        obj.try_format = None
-
-        # define VIDIOC_CROPCAP		_IOWR('V', 58, struct v4l2_cropcap)
-        obj.crop_cap = IoctlAbstraction(device,
-                                        "CropCapabilities",
-                                        IoctlDirection.RW,
-                                        'V',
-                                        58,
-                                        V4l2IoctlCropCap)
-
-        # define VIDIOC_G_CROP		_IOWR('V', 59, struct v4l2_crop)
-        obj.get_crop = IoctlAbstraction(device,
-                                        "GetCropping",
-                                        IoctlDirection.RW,
-                                        'V',
-                                        59,
-                                        V4l2IoctlCrop)
-
-        # define VIDIOC_S_CROP		 _IOW('V', 60, struct v4l2_crop)
-        obj.set_crop = IoctlAbstraction(device,
-                                        "SetCropping",
-                                        IoctlDirection.W,
-                                        'V',
-                                        60,
-                                        V4l2IoctlCrop)
-
-        # define VIDIOC_ENUM_FRAMESIZES _IOWR('V', 74, struct v4l2_frmsizeenum)
-        obj.enum_frame_sizes = IoctlAbstraction(device,
-                                                "EnumFrameSizes",
-                                                IoctlDirection.RW,
-                                                'V',
-                                                74,
-                                                V4l2IoctlFrameSizeEnum)
-
-        # define VIDIOC_ENUM_FRAMEINTERVALS \
-        #           _IOWR('V', 75, struct v4l2_frmivalenum)
-        obj.enum_frame_intervals = IoctlAbstraction(device,
-                                                    "EnumFrameIntervals",
-                                                    IoctlDirection.RW,
-                                                    'V',
-                                                    75,
-                                                    V4l2IoctlFrameIvalEnum)
-
-        ###############################
-        # End of supported callables. #
-        ###############################
-        return obj
-
-    ###########################################################################
-    # The following are dummy functions for documentation purpose only. The
-    # real callables are assigned in __new__.
-    ###########################################################################
+    def __init__(self, device):
+        # The requests (see V4l2IoctlRequest) are bound to the device lazily,
+        # on first use.
+        self._device = device
+
+    # define VIDIOC_QUERYCAP _IOR('V',  0, struct v4l2_capability)
+    @V4l2IoctlRequest("QueryCap",
+                      IoctlDirection.R,
+                      'V',
+                      0,
+                      V4l2IoctlCapability)
     def query_cap(self):
         """Interface to the ioctl code VIDIOC_QUERYCAP.
 
@@ -248,6 +404,13 @@ class V4l2IocOps(object):
         uapi/include/videodev2.h.
         """
 
+    # define VIDIOC_ENUM_FMT _IOWR('V',  2, struct v4l2_fmtdesc)
+    @V4l2IoctlRequest("EnumFmt",
+                      IoctlDirection.RW,
+                      'V',
+                      2,
+                      V4l2IoctlFmtDesc,
+                      enumeration=True)
     def enum_fmt(self, index, type):
         """Interface to the ioctl code VIDIOC_ENUM_FMT.
 
@@ -261,6 +424,69 @@ class V4l2IocOps(object):
         uapi/include/videodev2.h.
         """
 
+    # define VIDIOC_G_FMT		_IOWR('V',  4, struct v4l2_format)
+    @V4l2IoctlRequest("GetFormat",
+                      IoctlDirection.RW,
+                      'V',
+                      4,
+                      V4l2IoctlFormat)
+    def get_format(self, type):
+        """Interface to the ioctl code VIDIOC_G_FMT.
+
+        Gets the current data format.
+
+        Keyword arguments:
+            type (V4l2BufferType): the buffer type under inspection.
+
+        For more information see struct v4l2_format in
+        uapi/include/videodev2.h.
+        """
+
+    # define VIDIOC_S_FMT		_IOWR('V',  5, struct v4l2_format)
+    @V4l2IoctlRequest("SetFormat",
+                      IoctlDirection.RW,
+                      'V',
+                      5,
+                      V4l2IoctlFormat)
+    def set_format(self, type, fmt):
+        """Interface to the ioctl code VIDIOC_S_FMT.
+
+        Sets the data format. The driver adjusts the requested format to the
+        closest one supported and returns it.
+
+        Keyword arguments:
+            type (V4l2BufferType): the buffer type.
+            fmt: the requested format (e.g., a V4l2IoctlPixFormat).
+
+        For more information see struct v4l2_format in
+        uapi/include/videodev2.h.
+        """
+
+    # define VIDIOC_TRY_FMT		_IOWR('V', 64, struct v4l2_format)
+    @V4l2IoctlRequest("TryFormat",
+                      IoctlDirection.RW,
+                      'V',
+                      64,
+                      V4l2IoctlFormat)
+    def try_format(self, type, fmt):
+        """Interface to the ioctl code VIDIOC_TRY_FMT.
+
+        Like VIDIOC_S_FMT, but without changing the driver state.
+
+        Keyword arguments:
+            type (V4l2BufferType): the buffer type.
+            fmt: the requested format (e.g., a V4l2IoctlPixFormat).
+
+        For more information see struct v4l2_format in
+        uapi/include/videodev2.h.
+        """
+
+    # define VIDIOC_CROPCAP		_IOWR('V', 58, struct v4l2_cropcap)
+    @V4l2IoctlRequest("CropCapabilities",
+                      IoctlDirection.RW,
+                      'V',
+                      58,
+                      V4l2IoctlCropCap)
     def crop_cap(self, type):
         """Interface to the ioctl code VIDIOC_CROPCAP.
 
@@ -273,6 +499,12 @@ class V4l2IocOps(object):
         uapi/include/videodev2.h.
         """
 
+    # define VIDIOC_G_CROP		_IOWR('V', 59, struct v4l2_crop)
+    @V4l2IoctlRequest("GetCropping",
+                      IoctlDirection.RW,
+                      'V',
+                      59,
+                      V4l2IoctlCrop)
     def get_crop(self, type):
         """Interface to the ioctl code VIDIOC_G_CROP.
 
@@ -285,6 +517,12 @@ class V4l2IocOps(object):
         uapi/include/videodev2.h.
         """
 
+    # define VIDIOC_S_CROP		 _IOW('V', 60, struct v4l2_crop)
+    @V4l2IoctlRequest("SetCropping",
+                      IoctlDirection.W,
+                      'V',
+                      60,
+                      V4l2IoctlCrop)
     def set_crop(self, type, c):
         """Interface to the ioctl code VIDIOC_S_CROP.
 
@@ -298,6 +536,13 @@ class V4l2IocOps(object):
         uapi/include/videodev2.h.
         """
 
+    # define VIDIOC_ENUM_FRAMESIZES _IOWR('V', 74, struct v4l2_frmsizeenum)
+    @V4l2IoctlRequest("EnumFrameSizes",
+                      IoctlDirection.RW,
+                      'V',
+                      74,
+                      V4l2IoctlFrameSizeEnum,
+                      enumeration=True)
     def enum_frame_sizes(self, index, pixel_format):
         """Interface to the ioctl code VIDIOC_ENUM_FRAMESIZES.
 
@@ -312,6 +557,14 @@ class V4l2IocOps(object):
         uapi/include/videodev2.h.
         """
 
+    # define VIDIOC_ENUM_FRAMEINTERVALS \
+    #           _IOWR('V', 75, struct v4l2_frmivalenum)
+    @V4l2IoctlRequest("EnumFrameIntervals",
+                      IoctlDirection.RW,
+                      'V',
+                      75,
+                      V4l2IoctlFrameIvalEnum,
+                      enumeration=True)
     def enum_frame_intervals(self, index, pixel_format, width, height):
         """Interface to the ioctl code VIDIOC_ENUM_FRAMEINTERVALS.
 
@@ -328,20 +581,145 @@ class V4l2IocOps(object):
         uapi/include/videodev2.h.
         """
 
+    # define VIDIOC_REQBUFS _IOWR('V',  8, struct v4l2_requestbuffers)
+    @V4l2IoctlRequest("RequestBuffers",
+                      IoctlDirection.RW,
+                      'V',
+                      8,
+                      V4l2IoctlRequestBuffers)
+    def request_buffers(self, count, type, memory):
+        """Interface to the ioctl code VIDIOC_REQBUFS.
+
+        Initiates memory mapped, user pointer or DMABUF I/O. A count of 0
+        frees all buffers.
+
+        Keyword arguments:
+            count (int): the number of buffers requested.
+            type (V4l2BufferType): the buffer type.
+            memory (V4l2Memory): the memory type.
+
+        For more information see struct v4l2_requestbuffers in
+        uapi/include/videodev2.h.
+        """
+
+    # define VIDIOC_QUERYBUF _IOWR('V',  9, struct v4l2_buffer)
+    @V4l2IoctlRequest("QueryBuffer",
+                      IoctlDirection.RW,
+                      'V',
+                      9,
+                      V4l2IoctlBuffer)
+    def query_buffer(self, index, type, memory):
+        """Interface to the ioctl code VIDIOC_QUERYBUF.
+
+        Queries the status (and the memory offset) of a buffer.
+
+        Keyword arguments:
+            index (int): the buffer index.
+            type (V4l2BufferType): the buffer type.
+            memory (V4l2Memory): the memory type.
+
+        For more information see struct v4l2_buffer in
+        uapi/include/videodev2.h.
+        """
+
+    # define VIDIOC_QBUF _IOWR('V', 15, struct v4l2_buffer)
+    @V4l2IoctlRequest("QueueBuffer",
+                      IoctlDirection.RW,
+                      'V',
+                      15,
+                      V4l2IoctlBuffer)
+    def queue_buffer(self, index, type, memory):
+        """Interface to the ioctl code VIDIOC_QBUF.
+
+        Enqueues an empty (capturing) or filled (output) buffer in the
+        driver's incoming queue.
+
+        Keyword arguments:
+            index (int): the buffer index.
+            type (V4l2BufferType): the buffer type.
+            memory (V4l2Memory): the memory type.
+
+        For more information see struct v4l2_buffer in
+        uapi/include/videodev2.h.
+        """
+
+    # define VIDIOC_DQBUF _IOWR('V', 17, struct v4l2_buffer)
+    @V4l2IoctlRequest("DequeueBuffer",
+                      IoctlDirection.RW,
+                      'V',
+                      17,
+                      V4l2IoctlBuffer)
+    def dequeue_buffer(self, type, memory):
+        """Interface to the ioctl code VIDIOC_DQBUF.
+
+        Dequeues a filled (capturing) or displayed (output) buffer from the
+        driver's outgoing queue.
+
+        Keyword arguments:
+            type (V4l2BufferType): the buffer type.
+            memory (V4l2Memory): the memory type.
+
+        For more information see struct v4l2_buffer in
+        uapi/include/videodev2.h.
+        """
+
+    # define VIDIOC_EXPBUF _IOWR('V', 16, struct v4l2_exportbuffer)
+    @V4l2IoctlRequest("ExportBuffer",
+                      IoctlDirection.RW,
+                      'V',
+                      16,
+                      V4l2IoctlExportBuffer)
+    def export_buffer(self, type, index, plane, flags):
+        """Interface to the ioctl code VIDIOC_EXPBUF.
+
+        Exports a buffer (plane) as a DMABUF file descriptor.
+
+        Keyword arguments:
+            type (V4l2BufferType): the buffer type.
+            index (int): the buffer index.
+            plane (int): the plane index, 0 for single-planar buffers.
+            flags (int): the flags of the new file descriptor (O_CLOEXEC and
+                the access mode).
+
+        For more information see struct v4l2_exportbuffer in
+        uapi/include/videodev2.h.
+        """
+
+    # define VIDIOC_STREAMON _IOW('V', 18, int)
+    @V4l2IoctlRequest("StreamOn",
+                      IoctlDirection.W,
+                      'V',
+                      18,
+                      ctypes.c_int)
+    def stream_on(self, value):
+        """Interface to the ioctl code VIDIOC_STREAMON.
+
+        Starts streaming I/O.
+
+        Keyword arguments:
+            value (V4l2BufferType): the buffer type.
+        """
+
+    # define VIDIOC_STREAMOFF _IOW('V', 19, int)
+    @V4l2IoctlRequest("StreamOff",
+                      IoctlDirection.W,
+                      'V',
+                      19,
+                      ctypes.c_int)
+    def stream_off(self, value):
+        """Interface to the ioctl code VIDIOC_STREAMOFF.
+
+        Stops streaming I/O and removes all buffers from the driver's queues.
+
+        Keyword arguments:
+            value (V4l2BufferType): the buffer type.
+        """
+
     # TODO: To be implemented.
     """
-    G_FMT = _IOWR('V',  4, V4l2IoctlFormat)
-    S_FMT = _IOWR('V',  5, V4l2IoctlFormat)
-    REQBUFS = _IOWR('V',  8, V4l2IoctlRequestbuffers)
-    QUERYBUF = _IOWR('V',  9, V4l2IoctlBuffer)
     G_FBUF = _IOR('V', 10, V4l2IoctlFramebuffer)
     S_FBUF = _IOW('V', 11, V4l2IoctlFramebuffer)
     OVERLAY = _IOW('V', 14, int)
-    QBUF = _IOWR('V', 15, V4l2IoctlBuffer)
-    EXPBUF = _IOWR('V', 16, V4l2IoctlExportbuffer)
-    DQBUF = _IOWR('V', 17, V4l2IoctlBuffer)
-    STREAMON = _IOW('V', 18, int)
-    STREAMOFF = _IOW('V', 19, int)
     G_PARM = _IOWR('V', 21, V4l2IoctlStreamparm)
     S_PARM = _IOWR('V', 22, V4l2IoctlStreamparm)
     G_STD = _IOR('V', 23, v4l2_std_id)
@@ -372,7 +750,6 @@ class V4l2IocOps(object):
     G_JPEGCOMP = _IOR('V', 61, V4l2IoctlJpegcompression)
     S_JPEGCOMP = _IOW('V', 62, V4l2IoctlJpegcompression)
     QUERYSTD = _IOR('V', 63, v4l2_std_id)
-    TRY_FMT = _IOWR('V', 64, V4l2IoctlFormat)
     ENUMAUDIO = _IOWR('V', 65, V4l2IoctlAudio)
     ENUMAUDOUT = _IOWR('V', 66, V4l2IoctlAudioout)
     G_PRIORITY = _IOR('V', 67, __u32)
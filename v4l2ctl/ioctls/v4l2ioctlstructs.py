@@ -337,3 +337,512 @@ class V4l2IoctlCrop(ctypes.Structure):
     type = None
     #: struct v4l2_rect TODO
     c = None
+
+
+###############################################################################
+#       D A T A   F O R M A T S
+###############################################################################
+# Implementation of struct v4l2_pix_format from uapi/linux/videodev2.h
+class V4l2IoctlPixFormat(ctypes.Structure):
+    _fields_ = [
+        ('width', ctypes.c_uint32),
+        ('height', ctypes.c_uint32),
+        ('pixelformat', ctypes.c_uint32),
+        ('field', ctypes.c_uint32),
+        ('bytesperline', ctypes.c_uint32),
+        ('sizeimage', ctypes.c_uint32),
+        ('colorspace', ctypes.c_uint32),
+        ('priv', ctypes.c_uint32),
+        ('flags', ctypes.c_uint32),
+        ('ycbcr_enc', ctypes.c_uint32),
+        ('quantization', ctypes.c_uint32),
+        ('xfer_func', ctypes.c_uint32),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: Image width in pixels.
+    width = None
+    #: Image height in pixels.
+    height = None
+    #: The pixel format or type of compression (see :class:`V4l2Formats`).
+    pixelformat = None
+    #: Field order, from enum v4l2_field (see :class:`V4l2Field`).
+    field = None
+    #: Distance in bytes between the leftmost pixels in two adjacent lines.
+    bytesperline = None
+    #: Size in bytes of the buffer to hold a complete image.
+    sizeimage = None
+    #: Image colorspace, from enum v4l2_colorspace.
+    colorspace = None
+    #: Private data, depends on pixelformat.
+    priv = None
+    #: Format flags (see :class:`V4l2PixFormatFlags`).
+    flags = None
+    #: Y'CbCr encoding, from enum v4l2_ycbcr_encoding (or the HSV encoding,
+    #: from enum v4l2_hsv_encoding, for HSV formats).
+    ycbcr_enc = None
+    #: Quantization range, from enum v4l2_quantization.
+    quantization = None
+    #: Transfer function, from enum v4l2_xfer_func.
+    xfer_func = None
+
+
+# Implementation of struct v4l2_plane_pix_format from uapi/linux/videodev2.h
+class V4l2IoctlPlanePixFormat(ctypes.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ('sizeimage', ctypes.c_uint32),
+        ('bytesperline', ctypes.c_uint32),
+        ('reserved', ctypes.c_uint16 * 6),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: Maximum size in bytes required for image data in this plane.
+    sizeimage = None
+    #: Distance in bytes between the leftmost pixels in two adjacent lines.
+    bytesperline = None
+    #: Reserved for future extensions.
+    reserved = None
+
+
+#: The maximum number of planes of a multi-planar format.
+VIDEO_MAX_PLANES = 8
+
+
+# Implementation of struct v4l2_pix_format_mplane from uapi/linux/videodev2.h
+class V4l2IoctlPixFormatMplane(ctypes.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ('width', ctypes.c_uint32),
+        ('height', ctypes.c_uint32),
+        ('pixelformat', ctypes.c_uint32),
+        ('field', ctypes.c_uint32),
+        ('colorspace', ctypes.c_uint32),
+        ('plane_fmt', V4l2IoctlPlanePixFormat * VIDEO_MAX_PLANES),
+        ('num_planes', ctypes.c_uint8),
+        ('flags', ctypes.c_uint8),
+        ('ycbcr_enc', ctypes.c_uint8),
+        ('quantization', ctypes.c_uint8),
+        ('xfer_func', ctypes.c_uint8),
+        ('reserved', ctypes.c_uint8 * 7),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: Image width in pixels.
+    width = None
+    #: Image height in pixels.
+    height = None
+    #: The pixel format (see :class:`V4l2Formats`).
+    pixelformat = None
+    #: Field order, from enum v4l2_field (see :class:`V4l2Field`).
+    field = None
+    #: Image colorspace, from enum v4l2_colorspace.
+    colorspace = None
+    #: Per-plane information (see :class:`V4l2IoctlPlanePixFormat`).
+    plane_fmt = None
+    #: Number of planes in this format.
+    num_planes = None
+    #: Format flags (see :class:`V4l2PixFormatFlags`).
+    flags = None
+    #: Y'CbCr (or HSV) encoding.
+    ycbcr_enc = None
+    #: Quantization range, from enum v4l2_quantization.
+    quantization = None
+    #: Transfer function, from enum v4l2_xfer_func.
+    xfer_func = None
+    #: Reserved for future extensions.
+    reserved = None
+
+
+# Implementation of struct v4l2_clip from uapi/linux/videodev2.h
+class V4l2IoctlClip(ctypes.Structure):
+    pass
+
+
+V4l2IoctlClip._fields_ = [
+    ('c', V4l2IoctlRect),
+    ('next', ctypes.POINTER(V4l2IoctlClip)),
+    ]
+
+
+# Implementation of struct v4l2_window from uapi/linux/videodev2.h
+class V4l2IoctlWindow(ctypes.Structure):
+    _fields_ = [
+        ('w', V4l2IoctlRect),
+        ('field', ctypes.c_uint32),
+        ('chromakey', ctypes.c_uint32),
+        ('clips', ctypes.POINTER(V4l2IoctlClip)),
+        ('clipcount', ctypes.c_uint32),
+        ('bitmap', ctypes.c_void_p),
+        ('global_alpha', ctypes.c_uint8),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: Size and position of the window relative to the frame buffer.
+    w = None
+    #: Field order, from enum v4l2_field (see :class:`V4l2Field`).
+    field = None
+    #: Chroma-key value.
+    chromakey = None
+    #: Clipping rectangles.
+    clips = None
+    #: Number of clipping rectangles.
+    clipcount = None
+    #: Clipping bitmap.
+    bitmap = None
+    #: Global alpha value.
+    global_alpha = None
+
+
+# Implementation of struct v4l2_vbi_format from uapi/linux/videodev2.h
+class V4l2IoctlVbiFormat(ctypes.Structure):
+    _fields_ = [
+        ('sampling_rate', ctypes.c_uint32),
+        ('offset', ctypes.c_uint32),
+        ('samples_per_line', ctypes.c_uint32),
+        ('sample_format', ctypes.c_uint32),
+        ('start', ctypes.c_int32 * 2),
+        ('count', ctypes.c_uint32 * 2),
+        ('flags', ctypes.c_uint32),
+        ('reserved', ctypes.c_uint32 * 2),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: Sampling rate in Hz.
+    sampling_rate = None
+    #: Horizontal offset of the VBI image in samples.
+    offset = None
+    #: Number of samples per line.
+    samples_per_line = None
+    #: The format of the samples (see :class:`V4l2Formats`).
+    sample_format = None
+    #: The first line number of the VBI image, per field.
+    start = None
+    #: The number of lines of the VBI image, per field.
+    count = None
+    #: VBI flags.
+    flags = None
+    #: Reserved for future extensions.
+    reserved = None
+
+
+# Implementation of struct v4l2_sliced_vbi_format from uapi/linux/videodev2.h
+class V4l2IoctlSlicedVbiFormat(ctypes.Structure):
+    _fields_ = [
+        ('service_set', ctypes.c_uint16),
+        ('service_lines', (ctypes.c_uint16 * 24) * 2),
+        ('io_size', ctypes.c_uint32),
+        ('reserved', ctypes.c_uint32 * 2),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: The union of all services in service_lines.
+    service_set = None
+    #: The services requested per field and line.
+    service_lines = None
+    #: Maximum number of bytes passed by one read or write call.
+    io_size = None
+    #: Reserved for future extensions.
+    reserved = None
+
+
+# Implementation of struct v4l2_sdr_format from uapi/linux/videodev2.h
+class V4l2IoctlSdrFormat(ctypes.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ('pixelformat', ctypes.c_uint32),
+        ('buffersize', ctypes.c_uint32),
+        ('reserved', ctypes.c_uint8 * 24),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: The data format (see :class:`V4l2Formats`).
+    pixelformat = None
+    #: Maximum size in bytes required for data.
+    buffersize = None
+    #: Reserved for future extensions.
+    reserved = None
+
+
+# Implementation of struct v4l2_meta_format from uapi/linux/videodev2.h
+class V4l2IoctlMetaFormat(ctypes.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ('dataformat', ctypes.c_uint32),
+        ('buffersize', ctypes.c_uint32),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: The data format (see :class:`V4l2Formats`).
+    dataformat = None
+    #: Maximum size in bytes required for data.
+    buffersize = None
+
+
+# The format, depending on the buffer type.
+class _FormatUnion(ctypes.Union):
+    _fields_ = [
+        ('pix', V4l2IoctlPixFormat),
+        ('pix_mp', V4l2IoctlPixFormatMplane),
+        ('win', V4l2IoctlWindow),
+        ('vbi', V4l2IoctlVbiFormat),
+        ('sliced', V4l2IoctlSlicedVbiFormat),
+        ('sdr', V4l2IoctlSdrFormat),
+        ('meta', V4l2IoctlMetaFormat),
+        ('raw_data', ctypes.c_uint8 * 200),
+        ]
+
+
+# Implementation of struct v4l2_format from uapi/linux/videodev2.h
+class V4l2IoctlFormat(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_uint32),
+        ('fmt', _FormatUnion),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: Type of the data stream, from enum v4l2_buf_type (see
+    #: :class:`V4l2BufferType`).
+    type = None
+    #: The format: pix, pix_mp, win, vbi, sliced, sdr, meta or raw_data,
+    #: depending on the type.
+    fmt = None
+
+
+###############################################################################
+#       S T R E A M I N G   I / O   B U F F E R S
+###############################################################################
+# Implementation of struct timeval from linux/time.h
+class V4l2IoctlTimeval(ctypes.Structure):
+    _fields_ = [
+        ('tv_sec', ctypes.c_long),
+        ('tv_usec', ctypes.c_long),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: Seconds.
+    tv_sec = None
+    #: Microseconds.
+    tv_usec = None
+
+
+# Implementation of struct v4l2_timecode from uapi/linux/videodev2.h
+class V4l2IoctlTimecode(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_uint32),
+        ('flags', ctypes.c_uint32),
+        ('frames', ctypes.c_uint8),
+        ('seconds', ctypes.c_uint8),
+        ('minutes', ctypes.c_uint8),
+        ('hours', ctypes.c_uint8),
+        ('userbits', ctypes.c_uint8 * 4),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: Frame rate the timecodes are based on.
+    type = None
+    #: Timecode flags.
+    flags = None
+    #: Frame count, 0 ... 23/24/29/49/59, depending on the type.
+    frames = None
+    #: Seconds count, 0 ... 59.
+    seconds = None
+    #: Minutes count, 0 ... 59.
+    minutes = None
+    #: Hours count, 0 ... 29.
+    hours = None
+    #: The "user group" bits from the timecode.
+    userbits = None
+
+
+# Implementation of struct v4l2_requestbuffers from uapi/linux/videodev2.h
+class V4l2IoctlRequestBuffers(ctypes.Structure):
+    _fields_ = [
+        ('count', ctypes.c_uint32),
+        ('type', ctypes.c_uint32),
+        ('memory', ctypes.c_uint32),
+        ('capabilities', ctypes.c_uint32),
+        ('reserved', ctypes.c_uint32 * 1),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: The number of buffers requested or granted.
+    count = None
+    #: The buffer type (see :class:`V4l2BufferType`).
+    type = None
+    #: The memory type (see :class:`V4l2Memory`).
+    memory = None
+    #: Set by the driver.
+    capabilities = None
+    #: Reserved for future extensions.
+    reserved = None
+
+
+# Location of a plane's memory.
+class _PlaneMemoryUnion(ctypes.Union):
+    _fields_ = [
+        ('mem_offset', ctypes.c_uint32),
+        ('userptr', ctypes.c_ulong),
+        ('fd', ctypes.c_int32),
+        ]
+
+
+# Implementation of struct v4l2_plane from uapi/linux/videodev2.h
+class V4l2IoctlPlane(ctypes.Structure):
+    _fields_ = [
+        ('bytesused', ctypes.c_uint32),
+        ('length', ctypes.c_uint32),
+        ('m', _PlaneMemoryUnion),
+        ('data_offset', ctypes.c_uint32),
+        ('reserved', ctypes.c_uint32 * 11),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: Number of bytes occupied by data in the plane (payload).
+    bytesused = None
+    #: Size of this plane (NOT the payload) in bytes.
+    length = None
+    #: The plane's memory location (mem_offset, userptr or fd).
+    m = None
+    #: Offset in the plane to the start of data.
+    data_offset = None
+    #: Reserved for future extensions.
+    reserved = None
+
+
+# Location of a buffer's memory.
+class _BufferMemoryUnion(ctypes.Union):
+    _fields_ = [
+        ('offset', ctypes.c_uint32),
+        ('userptr', ctypes.c_ulong),
+        ('planes', ctypes.POINTER(V4l2IoctlPlane)),
+        ('fd', ctypes.c_int32),
+        ]
+
+
+class _BufferRequestUnion(ctypes.Union):
+    _fields_ = [
+        ('request_fd', ctypes.c_int32),
+        ('reserved', ctypes.c_uint32),
+        ]
+
+
+# Implementation of struct v4l2_buffer from uapi/linux/videodev2.h
+class V4l2IoctlBuffer(ctypes.Structure):
+    _anonymous_ = ("_",)
+    _fields_ = [
+        ('index', ctypes.c_uint32),
+        ('type', ctypes.c_uint32),
+        ('bytesused', ctypes.c_uint32),
+        ('flags', ctypes.c_uint32),
+        ('field', ctypes.c_uint32),
+        ('timestamp', V4l2IoctlTimeval),
+        ('timecode', V4l2IoctlTimecode),
+        ('sequence', ctypes.c_uint32),
+        ('memory', ctypes.c_uint32),
+        ('m', _BufferMemoryUnion),
+        ('length', ctypes.c_uint32),
+        ('reserved2', ctypes.c_uint32),
+        ('_', _BufferRequestUnion),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: ID number of the buffer.
+    index = None
+    #: The buffer type (see :class:`V4l2BufferType`).
+    type = None
+    #: Number of bytes occupied by data in the buffer (payload).
+    bytesused = None
+    #: Buffer flags (see :class:`V4l2BufferFlags`).
+    flags = None
+    #: The field order of the image in the buffer (see :class:`V4l2Field`).
+    field = None
+    #: Frame timestamp.
+    timestamp = None
+    #: Frame timecode.
+    timecode = None
+    #: Sequence count of this frame.
+    sequence = None
+    #: The memory type (see :class:`V4l2Memory`).
+    memory = None
+    #: The buffer's memory location (offset, userptr, planes or fd).
+    m = None
+    #: Size of the buffer (not the payload) in bytes, or the number of
+    #: elements in the planes array for multi-planar buffers.
+    length = None
+    #: Reserved for future extensions.
+    reserved2 = None
+    #: The file descriptor of the request to queue the buffer to.
+    request_fd = None
+
+
+# Implementation of struct v4l2_exportbuffer from uapi/linux/videodev2.h
+class V4l2IoctlExportBuffer(ctypes.Structure):
+    _fields_ = [
+        ('type', ctypes.c_uint32),
+        ('index', ctypes.c_uint32),
+        ('plane', ctypes.c_uint32),
+        ('flags', ctypes.c_uint32),
+        ('fd', ctypes.c_int32),
+        ('reserved', ctypes.c_uint32 * 11),
+        ]
+    ###########################################################################
+    # These are the fields/attributes that will be automatically
+    # created/overwritten in this class. Provided here for documentation
+    # purposes only.
+    ###########################################################################
+    #: The buffer type (see :class:`V4l2BufferType`).
+    type = None
+    #: ID number of the buffer.
+    index = None
+    #: Index of the plane to export, 0 for single-planar buffers.
+    plane = None
+    #: Flags for the new file descriptor (O_CLOEXEC, O_RDONLY, O_WRONLY or
+    #: O_RDWR).
+    flags = None
+    #: The DMABUF file descriptor, set by the driver.
+    fd = None
+    #: Reserved for future extensions.
+    reserved = None
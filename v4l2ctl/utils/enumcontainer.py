@@ -23,13 +23,18 @@ class MetaEnumContainer(type):
         return chain.from_iterable(cls._enums)
 
     def __contains__(cls, item):
-        for sub in cls._enums:
-            if item in sub:
-                return True
-        else:
+        try:
+            return item in cls._by_value
+        except TypeError:
+            # Unhashable items can't be contained.
             return False
 
     def __getattr__(cls, attr):
+        try:
+            return super().__getattribute__("_by_name")[attr]
+        except KeyError:
+            pass
+        # Not a member, but maybe another attribute of a sub enum.
         for sub_enum in super().__getattribute__("_enums"):
             if hasattr(sub_enum, attr):
                 return getattr(sub_enum, attr)
@@ -38,8 +43,8 @@ class MetaEnumContainer(type):
 
     def __getitem__(cls, item):
         try:
-            return getattr(cls, item)
-        except AttributeError:
+            return cls._by_name[item]
+        except KeyError:
             raise KeyError(item) from None
 
 
@@ -52,13 +57,22 @@ class BaseEnumContainer(metaclass=MetaEnumContainer):
                 if type(enum) is not EnumMeta:
                     raise TypeError(enum.__name__ + " is not an enum.")
             cls._enums = enums
+
+        # Merge the members of all enums into lookup tables, so that lookups
+        # don't need to try every enum. As with trying the enums in order, the
+        # first enum defining a value or a name wins.
+        cls._by_value = {}
+        cls._by_name = {}
+        for sub_enum in cls._enums:
+            for name, member in sub_enum.__members__.items():
+                cls._by_value.setdefault(member.value, member)
+                cls._by_value.setdefault(member, member)
+                cls._by_name.setdefault(name, member)
         super().__init_subclass__(**kwargs)
 
     def __new__(cls, value):
-        for sub_enum in cls._enums:
-            try:
-                return sub_enum(value)
-            except ValueError:
-                pass
-        else:
-            raise ValueError(str(value) + " is not a valid " + cls.__name__)
+        try:
+            return cls._by_value[value]
+        except (KeyError, TypeError):
+            raise ValueError(str(value) + " is not a valid " +
+                             cls.__name__) from None
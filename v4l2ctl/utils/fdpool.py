@@ -0,0 +1,235 @@
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from .filehandle import FileHandleCM
+from threading import Lock, Timer
+from time import monotonic
+import os
+
+
+class _PoolEntry(object):
+    def __init__(self, fd):
+        self.fd = fd
+        self.ref_count = 0
+        self.idle_since = None
+
+
+class FdPool(object):
+    """A pool of raw file descriptors, shared by all users of the same path.
+
+    Descriptors are reference counted. A descriptor which is no longer used is
+    kept open for idle_timeout seconds, so that repeated accesses to the same
+    file reuse it instead of opening the file again. Afterwards, it is closed
+    by a timer thread.
+
+    Keyword arguments:
+        flags (int): the flags to open the files with
+            (default O_RDWR | O_NONBLOCK | O_CLOEXEC). If a file can't be
+            opened for writing, it is opened read-only instead.
+        idle_timeout (float): the time in seconds an unused descriptor is kept
+            open (default 5.0).
+    """
+    def __init__(self, flags=os.O_RDWR | os.O_NONBLOCK | os.O_CLOEXEC,
+                 idle_timeout=5.0):
+        self._flags = flags
+        self._idle_timeout = idle_timeout
+        self._entries = {}
+        self._lock = Lock()
+        # The timer closing idle descriptors, only running while there are
+        # any.
+        self._timer = None
+
+    @property
+    def idle_timeout(self):
+        """The time in seconds an unused descriptor is kept open."""
+        return self._idle_timeout
+
+    def open_unshared(self, path):
+        """Open a descriptor for the given path with the pool's flags, which
+        is not part of the pool.
+
+        The caller is responsible for closing it.
+        """
+        return self._open(os.fspath(path))
+
+    def _open(self, path):
+        try:
+            return os.open(path, self._flags)
+        except PermissionError:
+            if self._flags & os.O_ACCMODE == os.O_RDONLY:
+                raise
+            return os.open(path,
+                           (self._flags & ~os.O_ACCMODE) | os.O_RDONLY)
+
+    def acquire(self, path):
+        """Return a descriptor for the given path, opening it if needed.
+
+        Every call must be paired with a call to :meth:`release`.
+        """
+        key = os.fspath(path)
+        with self._lock:
+            fd = self._take(key)
+        if fd is not None:
+            return fd
+        # Opening a device may take long, so don't keep the other paths
+        # waiting for it.
+        new_fd = self._open(key)
+        with self._lock:
+            fd = self._take(key)
+            if fd is None:
+                self._entries[key] = _PoolEntry(new_fd)
+                fd = self._take(key)
+                new_fd = None
+        if new_fd is not None:
+            # Another thread opened the path meanwhile.
+            os.close(new_fd)
+        return fd
+
+    def _take(self, key):
+        # Called with the lock held. Returns None if the path is not open.
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry.ref_count += 1
+        entry.idle_since = None
+        return entry.fd
+
+    def release(self, path):
+        """Release a descriptor acquired by :meth:`acquire`."""
+        key = os.fspath(path)
+        with self._lock:
+            entry = self._entries[key]
+            entry.ref_count -= 1
+            if entry.ref_count == 0:
+                entry.idle_since = monotonic()
+                if self._idle_timeout <= 0:
+                    self._close(key)
+                elif self._timer is None:
+                    self._schedule(self._idle_timeout)
+
+    def evict_idle(self, max_idle=None):
+        """Close all descriptors which were unused for at least max_idle
+        seconds (default idle_timeout).
+
+        Returns:
+            the number of closed descriptors.
+        """
+        if max_idle is None:
+            max_idle = self._idle_timeout
+        with self._lock:
+            return self._evict(monotonic() - max_idle)
+
+    def _schedule(self, delay):
+        # Called with the lock held.
+        self._timer = Timer(delay, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self):
+        with self._lock:
+            self._timer = None
+            now = monotonic()
+            self._evict(now - self._idle_timeout)
+            idle_since = [entry.idle_since
+                          for entry in self._entries.values()
+                          if entry.ref_count == 0]
+            if idle_since:
+                # Wake up again when the next descriptor expires.
+                self._schedule(max(min(idle_since) + self._idle_timeout - now,
+                                   0))
+
+    def _evict(self, idle_before):
+        to_close = [key for key, entry in self._entries.items()
+                    if entry.ref_count == 0 and
+                    entry.idle_since <= idle_before]
+        for key in to_close:
+            self._close(key)
+        return len(to_close)
+
+    def _close(self, key):
+        os.close(self._entries.pop(key).fd)
+
+    def __len__(self):
+        """The number of open descriptors."""
+        return len(self._entries)
+
+    def __contains__(self, path):
+        """If a descriptor is open for the given path."""
+        return os.fspath(path) in self._entries
+
+
+#: The process-wide pool of device descriptors.
+device_fd_pool = FdPool()
+
+
+class PooledFileHandle(FileHandleCM):
+    """A FileHandleCM which takes its descriptor from a :class:`FdPool`.
+
+    The handle behaves like a FileHandleCM, but the handle is the raw file
+    descriptor, and closing it only returns the descriptor to the pool.
+
+    Streaming needs a descriptor of its own (see :meth:`open_private`): the
+    buffers belong to the open file, and so do flags like O_NONBLOCK.
+
+    Keyword arguments:
+        filename (str, path-like): the file to open.
+        pool (FdPool): the pool to use (default device_fd_pool).
+    """
+    def __init__(self, filename, pool=None):
+        super().__init__(filename)
+        self._pool = device_fd_pool if pool is None else pool
+        self._private = False
+
+    @property
+    def private(self):
+        """If the handle's descriptor is not shared (see
+        :meth:`open_private`)."""
+        return self._private
+
+    def open_private(self):
+        """Like :meth:`open`, but the descriptor is not shared with any other
+        handle until this handle is closed.
+
+        If the handle holds a shared descriptor already, it is replaced by a
+        new one.
+        """
+        if not self._private:
+            self._private = True
+            if self._handle is not None:
+                fd = self._pool.open_unshared(self._filename)
+                self._pool.release(self._filename)
+                self._handle = fd
+        return self.open()
+
+    def _open_file(self):
+        if self._handle is None:
+            if self._private:
+                self._handle = self._pool.open_unshared(self._filename)
+            else:
+                self._handle = self._pool.acquire(self._filename)
+        return self._handle
+
+    def _close_file(self):
+        if self._handle is not None:
+            if self._private:
+                os.close(self._handle)
+                self._private = False
+            else:
+                self._pool.release(self._filename)
+            self._handle = None
+
+    def fileno(self):
+        return self._handle
@@ -0,0 +1,263 @@
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from .ioctls import V4l2FrameSizeTypes
+from .ioctls.v4l2ioctlstructs import V4l2IoctlFmtDesc, \
+                                     V4l2IoctlFrameSizeEnum, \
+                                     V4l2IoctlFrameIvalEnum
+from .v4l2format import V4l2Format
+from .v4l2frame import V4l2FrameSize, V4l2FrameInterval
+from base64 import b64encode, b64decode
+from pathlib import Path
+from threading import Lock
+from ctypes import sizeof
+import fcntl
+import json
+import os
+import warnings
+
+
+def _default_cache_file():
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    if not cache_home:
+        cache_home = Path.home() / ".cache"
+    return Path(cache_home) / "v4l2ctl" / "formats.json"
+
+
+def _encode(struct):
+    return b64encode(bytes(struct)).decode("ascii")
+
+
+def _decode(struct_type, data):
+    data = b64decode(data)
+    if len(data) != sizeof(struct_type):
+        # Written on a machine with a different structure layout.
+        raise ValueError("Invalid {} entry.".format(struct_type.__name__))
+    return struct_type.from_buffer_copy(data)
+
+
+class V4l2FormatCache(object):
+    """A persistent cache of the formats, sizes and intervals of devices.
+
+    Enumerating the formats of a device with all their sizes and intervals
+    takes hundreds of ioctl calls. This cache stores the whole enumeration tree
+    on disk, identified by the driver, the bus, the card name and the kernel
+    version of the device. All devices share one file, which is read once.
+
+    The identity is checked with a single VIDIOC_QUERYCAP on every lookup. If
+    another device is plugged into the same bus, or the driver or the kernel
+    changes, the tree is enumerated anew.
+
+    Several processes may share the file: changes are merged into its current
+    content. If the file can't be written, a warning is issued and the
+    entries are only kept in memory.
+
+    Note:
+        The intervals of stepwise and continuous frame sizes are not cached,
+        because they are queried for every single width and height.
+
+    Keyword arguments:
+        path (str, path-like): the cache file (default
+            "$XDG_CACHE_HOME/v4l2ctl/formats.json").
+
+    Example:
+        Walk the formats without querying the device after the first run::
+
+            cache = V4l2FormatCache()
+            for fmt in cache.formats(device):
+                for size in fmt.sizes():
+                    print(fmt, size, list(size.intervals()))
+    """
+    _file_version = 1
+
+    def __init__(self, path=None):
+        self._path = _default_cache_file() if path is None else Path(path)
+        self._entries = None
+        self._lock = Lock()
+
+    @property
+    def path(self):
+        """The cache file (read-only)."""
+        return self._path
+
+    @staticmethod
+    def _key(device):
+        # Query the capabilities again rather than using the ones stored in
+        # the device, which may be outdated by now.
+        caps = device._ioc_ops.query_cap()
+        return json.dumps([caps.driver.decode(),
+                           caps.bus_info.decode(),
+                           caps.card.decode(),
+                           caps.version,
+                           ])
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self._path, "r") as cache_file:
+                content = json.load(cache_file)
+        except (OSError, ValueError):
+            content = None
+        if (not isinstance(content, dict) or
+                content.get("version") != self._file_version or
+                not isinstance(content.get("devices"), dict)):
+            # Missing, corrupt or outdated, start over.
+            return {}
+        return content["devices"]
+
+    def _update(self, change):
+        # Apply a change to the loaded entries and to the file. Other
+        # processes may have written the file since it was loaded, so the
+        # change is applied to its current content, under an exclusive lock.
+        change(self._entries)
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            lock_path = self._path.with_name(self._path.name + ".lock")
+            with open(lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                entries = self._read()
+                change(entries)
+                self._write(entries)
+        except OSError as e:
+            warnings.warn("The format cache '{}' could not be written: {}"
+                          .format(self._path, e), RuntimeWarning)
+            return
+        self._entries = entries
+
+    def _write(self, entries):
+        temp_path = self._path.with_name(
+            "{}.{}.tmp".format(self._path.name, os.getpid()))
+        try:
+            with open(temp_path, "w") as cache_file:
+                json.dump({"version": self._file_version,
+                           "devices": entries,
+                           }, cache_file)
+            # Readers never see a partially written file.
+            os.replace(temp_path, self._path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def formats(self, device, buffer_type=None):
+        """Return the formats of a device, enumerating them only if they are
+        not cached yet.
+
+        Keyword arguments:
+            device (V4l2Device): the device.
+            buffer_type (V4l2BufferType): the buffer type (default the
+                device's buffer_type).
+
+        Returns:
+            a list of :class:`V4l2Format` whose sizes and intervals are
+            already known.
+        """
+        if buffer_type is None:
+            buffer_type = device.buffer_type
+        key = self._key(device)
+        type_key = str(int(buffer_type))
+
+        with self._lock:
+            self._load()
+            tree = self._entries.get(key, {}).get(type_key)
+            if tree is not None:
+                try:
+                    return self._from_tree(device._ioc_ops, tree)
+                except (KeyError, TypeError, ValueError):
+                    # Corrupt entry, enumerate again.
+                    pass
+
+            formats = self._enumerate(device, buffer_type)
+            tree = self._to_tree(formats)
+
+            def add_tree(entries):
+                entries.setdefault(key, {})[type_key] = tree
+            self._update(add_tree)
+            return formats
+
+    def invalidate(self, device=None):
+        """Remove the entries of a device or all entries from the cache.
+
+        Keyword arguments:
+            device (V4l2Device): the device. If None, the whole cache is
+                cleared (default None).
+        """
+        with self._lock:
+            self._load()
+            if device is None:
+                self._update(dict.clear)
+            else:
+                key = self._key(device)
+                self._update(lambda entries: entries.pop(key, None))
+
+    @staticmethod
+    def _enumerate(device, buffer_type):
+        ioc_ops = device._ioc_ops
+        formats = []
+        for fmt in device.iter_buffer_formats(buffer_type):
+            sizes = []
+            for size in fmt.sizes():
+                if size.type == V4l2FrameSizeTypes.DISCRETE:
+                    intervals = list(size.intervals())
+                else:
+                    intervals = None
+                sizes.append(V4l2FrameSize(ioc_ops,
+                                           size._to_v4l2(),
+                                           intervals))
+            formats.append(V4l2Format(ioc_ops, fmt._to_v4l2(), sizes))
+        return formats
+
+    @staticmethod
+    def _to_tree(formats):
+        tree = []
+        for fmt in formats:
+            sizes = []
+            for size in fmt.sizes():
+                if size._intervals is None:
+                    intervals = None
+                else:
+                    intervals = [_encode(ival._to_v4l2())
+                                 for ival in size._intervals]
+                sizes.append([_encode(size._to_v4l2()), intervals])
+            tree.append([_encode(fmt._to_v4l2()), sizes])
+        return tree
+
+    @staticmethod
+    def _from_tree(ioc_ops, tree):
+        formats = []
+        for fmt_desc, sizes in tree:
+            frame_sizes = []
+            for frame_size, intervals in sizes:
+                if intervals is not None:
+                    intervals = [V4l2FrameInterval(
+                                     _decode(V4l2IoctlFrameIvalEnum, ival))
+                                 for ival in intervals]
+                frame_sizes.append(V4l2FrameSize(
+                    ioc_ops,
+                    _decode(V4l2IoctlFrameSizeEnum, frame_size),
+                    intervals))
+            formats.append(V4l2Format(ioc_ops,
+                                      _decode(V4l2IoctlFmtDesc, fmt_desc),
+                                      frame_sizes))
+        return formats
+
+    def __repr__(self):
+        return "<V4l2FormatCache object for '{}'>".format(self._path)
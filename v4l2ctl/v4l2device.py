@@ -14,11 +14,19 @@
 # See the Licence for the specific language governing permissions and
 # limitations under the Licence.
 ###############################################################################
-from .ioctls import V4l2IocOps, V4l2Capabilities, V4l2BufferType, IoctlError
-from .v4l2types import V4l2Rectangle, V4l2CroppingCapabilities
+from .ioctls import V4l2IocOps, V4l2Capabilities, V4l2BufferType, \
+                   IoctlError, EndOfEnumeration, IoctlNotSupported
+from .v4l2types import V4l2Rectangle, V4l2CroppingCapabilities, \
+                       V4l2DataFormat
 from .v4l2format import V4l2Format
 from pathlib import Path
-from .utils.filehandle import FileHandleCM, FileHandleStatus
+from errno import EINVAL
+from collections import deque
+from queue import Queue, Empty
+from threading import Thread, Lock
+from time import monotonic
+from .utils.filehandle import FileHandleStatus
+from .utils.fdpool import PooledFileHandle
 import io
 
 
@@ -45,6 +53,14 @@ class V4l2Device(io.IOBase):
                              V4l2BufferType.VIDEO_OVERLAY,
                              ]
 
+    #: The buffer types whose data format can be read and set (see
+    #: :attr:`active_format`).
+    format_buffer_types = [V4l2BufferType.VIDEO_CAPTURE,
+                           V4l2BufferType.VIDEO_CAPTURE_MPLANE,
+                           V4l2BufferType.VIDEO_OUTPUT,
+                           V4l2BufferType.VIDEO_OUTPUT_MPLANE,
+                           ]
+
     ###########################################################################
     # Constructor.
     ###########################################################################
@@ -52,7 +68,9 @@ class V4l2Device(io.IOBase):
         if isinstance(device, int):
             device = Path(r"/dev/video{}".format(device))
 
-        self._dev_handle = FileHandleCM(device, {"mode": "rb"})
+        # The descriptor is shared with all other V4l2Device objects of the
+        # same device file and kept open between ioctl calls.
+        self._dev_handle = PooledFileHandle(device)
 
         # Create V4l2IocOps object for the ioctl operations.
         self._ioc_ops = V4l2IocOps(self._dev_handle)
@@ -85,6 +103,12 @@ class V4l2Device(io.IOBase):
         # Use the first supported buffer type as default.
         self._buffer_type = self._supported_buffer_types[0]
 
+        # Created on the first negotiation (see negotiate).
+        self._negotiator = None
+
+        # The results of TRY_FMT by (buffer type, requested format).
+        self._tried_formats = {}
+
     ###########################################################################
     # I/O Interface
     ###########################################################################
@@ -95,8 +119,13 @@ class V4l2Device(io.IOBase):
     def __exit__(self, exc_type, exc, tb):
         self.close()
 
-    def _open(self):
-        self._dev_handle.open()
+    def _open(self, private=False):
+        # A private descriptor is not shared with other V4l2Device objects
+        # of the same device (see PooledFileHandle.open_private).
+        if private:
+            self._dev_handle.open_private()
+        else:
+            self._dev_handle.open()
 
     def close(self):
         self._dev_handle.close()
@@ -222,17 +251,22 @@ class V4l2Device(io.IOBase):
     # V4L2 setters, getters and iterators/generators.
     ###########################################################################
     @staticmethod
-    def iter_devices(skip_links=True):
+    def iter_devices(skip_links=True, workers=None, timeout=None):
         """Return an iterator over the available v4l2 devices.
 
         Keyword arguments:
             skip_links (bool): skip links and return every device only once
                                (default True)
+            workers (int): probe this many devices concurrently and yield them
+                           as they finish. None probes the devices one after
+                           another (default None).
+            timeout (float): when probing concurrently, skip devices which
+                             take longer than this many seconds (default None)
 
         Returns:
             an iterator
         """
-        return V4l2DeviceIterator(skip_links)
+        return V4l2DeviceIterator(skip_links, workers, timeout)
 
     def __repr__(self):
         return "<V4l2Device object for '{}({})'>".format(self.name,
@@ -248,12 +282,14 @@ class V4l2Device(io.IOBase):
         Returns:
             a generator
         """
+        # The formats are decoded right away, so the buffer can be reused.
+        enum_fmt = self._ioc_ops.enum_fmt.reuse
         idx = 0
         # Well, I guess the sky is the limit. index is 32 bits wide.
         while idx < 2**32:
             try:
-                fmt_desc = self._ioc_ops.enum_fmt(index=idx, type=buffer_type)
-            except IoctlError:
+                fmt_desc = enum_fmt(index=idx, type=buffer_type)
+            except (EndOfEnumeration, IoctlNotSupported):
                 break
             else:
                 yield V4l2Format(self._ioc_ops, fmt_desc)
@@ -269,6 +305,21 @@ class V4l2Device(io.IOBase):
         """
         return self.iter_buffer_formats(self.buffer_type)
 
+    def negotiate(self, **constraints):
+        """Find the best mode (format, size and interval) of this device.
+
+        The formats, sizes and intervals are only queried as far as needed and
+        are memoized, so later negotiations are cheap. For the constraints and
+        preferences, see :meth:`V4l2ModeNegotiator.negotiate`.
+
+        Returns:
+            a :class:`V4l2Mode` or None, if no mode fulfills the constraints.
+        """
+        if self._negotiator is None:
+            from .v4l2negotiate import V4l2ModeNegotiator
+            self._negotiator = V4l2ModeNegotiator(self)
+        return self._negotiator.negotiate(**constraints)
+
     @property
     def supported_buffer_types(self):
         """The supported buffer types by this video device (read-only)."""
@@ -291,6 +342,191 @@ class V4l2Device(io.IOBase):
                                                self.supported_buffer_types]))
         self._buffer_type = buffer_type
 
+    ###########################################################################
+    # Data format.
+    ###########################################################################
+    def _check_format_buffer_type(self, buffer_type):
+        if buffer_type not in self.format_buffer_types:
+            raise FeatureNotSupported(
+                "Data formats are not supported for " + str(buffer_type) +
+                ". Supported buffer types: " + str(
+                    [b.name for b in self.format_buffer_types]))
+
+    @property
+    def active_format(self):
+        """The data format (see :class:`V4l2DataFormat`) of the set buffer
+        type.
+
+        When set, the driver adjusts the requested format to the closest one
+        it supports. Read this attribute back to learn the outcome, or use
+        :meth:`try_format` beforehand.
+
+        Note:
+            The data format is specfic to the set buffer type. (See
+            :py:attr:`~buffer_type`)
+        """
+        self._check_format_buffer_type(self._buffer_type)
+        return V4l2DataFormat._from_v4l2(
+            self._ioc_ops.get_format(type=self._buffer_type))
+
+    @active_format.setter
+    def active_format(self, data_format):
+        """Setter for active_format."""
+        buffer_type = self._buffer_type
+        self._check_format_buffer_type(buffer_type)
+        result = self._ioc_ops.set_format.into(
+            data_format._to_v4l2(buffer_type))
+        # S_FMT answers like TRY_FMT would.
+        self._tried_formats[(buffer_type, data_format)] = \
+            V4l2DataFormat._from_v4l2(result)
+
+    def try_format(self, data_format, buffer_type=None):
+        """Return the data format the driver would choose for a request,
+        without changing anything.
+
+        The results are memoized per buffer type and requested format, so
+        negotiating the same format again doesn't query the driver (see
+        :meth:`clear_tried_formats`).
+
+        Keyword arguments:
+            data_format (V4l2DataFormat): the requested format.
+            buffer_type (V4l2BufferType): the buffer type (default the
+                device's buffer_type).
+
+        Returns:
+            a :class:`V4l2DataFormat`
+        """
+        if buffer_type is None:
+            buffer_type = self._buffer_type
+        key = (buffer_type, data_format)
+        try:
+            return self._tried_formats[key]
+        except KeyError:
+            pass
+        self._check_format_buffer_type(buffer_type)
+        result = V4l2DataFormat._from_v4l2(self._ioc_ops.try_format.into(
+            data_format._to_v4l2(buffer_type)))
+        self._tried_formats[key] = result
+        return result
+
+    def clear_tried_formats(self):
+        """Forget the memoized results of :meth:`try_format`, e.g., after
+        switching the input."""
+        self._tried_formats.clear()
+
+    def stream(self, buffer_count=4, buffers=None):
+        """Create a streaming capture for the set buffer type.
+
+        By default, the driver's buffers are memory-mapped. If buffers are
+        given, the frames are captured directly into them (user pointers).
+
+        The returned stream is started and stopped by using it as a context
+        manager (or by calling its start() and stop() methods).
+
+        Keyword arguments:
+            buffer_count (int): the number of buffers to request from the
+                driver (default 4). Ignored if buffers are given.
+            buffers (iterable): the caller's page-aligned buffers (see
+                :class:`V4l2UserPtrStream`) or None (default None).
+
+        Returns:
+            a :class:`V4l2MmapStream` or a :class:`V4l2UserPtrStream`
+
+        Raises:
+            FeatureNotSupported: if the device or the set buffer type does not
+                support streaming.
+        """
+        # The streaming modules are only loaded when needed.
+        from .v4l2stream import V4l2MmapStream, V4l2UserPtrStream
+
+        stream_class = V4l2MmapStream if buffers is None else \
+            V4l2UserPtrStream
+        if V4l2Capabilities.STREAMING not in self._device_caps:
+            raise FeatureNotSupported("Streaming is not supported")
+        if self.buffer_type not in stream_class.buffer_types:
+            raise FeatureNotSupported(
+                "Streaming is not supported for " + str(self.buffer_type) +
+                ". Supported buffer types: " + str(
+                    [b.name for b in stream_class.buffer_types]))
+        if buffers is None:
+            return V4l2MmapStream(self, buffer_count)
+        return V4l2UserPtrStream(self, buffers)
+
+    async def aiter_frames(self, buffer_count=4, buffers=None):
+        """Capture frames asynchronously.
+
+        A stream (see :meth:`stream`) is started for the iteration and stopped
+        when it ends. Buffers are dequeued when the running event loop reports
+        the device file readable, and handed back to the driver when the
+        frames are released (see :meth:`V4l2Stream.aiter_frames`).
+
+        Keyword arguments:
+            buffer_count (int): the number of buffers to request from the
+                driver (default 4). Ignored if buffers are given.
+            buffers (iterable): the caller's page-aligned buffers (see
+                :class:`V4l2UserPtrStream`) or None (default None).
+
+        Example:
+            Capture from two devices in one event loop::
+
+                async def capture(device):
+                    async for frame in device.aiter_frames():
+                        process(frame.data)
+
+                await asyncio.gather(capture(device0), capture(device1))
+        """
+        with self.stream(buffer_count, buffers) as stream:
+            async for frame in stream.aiter_frames():
+                yield frame
+
+    def grabber(self, buffer_count=4, buffers=None):
+        """Create a latest-frame-only capture for the set buffer type.
+
+        The returned grabber keeps only the newest frame and hands older ones
+        back to the driver at once (see :class:`V4l2FrameGrabber`). It is
+        started and stopped by using it as a context manager.
+
+        Keyword arguments:
+            buffer_count (int): the number of buffers to request from the
+                driver (default 4). Ignored if buffers are given.
+            buffers (iterable): the caller's page-aligned buffers (see
+                :class:`V4l2UserPtrStream`) or None (default None).
+
+        Returns:
+            a :class:`V4l2FrameGrabber`
+        """
+        from .v4l2grab import V4l2FrameGrabber
+
+        return V4l2FrameGrabber(self.stream(buffer_count, buffers))
+
+    def frame_queue(self, maxsize=2, policy="block", buffer_count=None,
+                    buffers=None):
+        """Create a bounded frame queue for the set buffer type.
+
+        The returned queue is filled by a background thread and applies the
+        policy when it is full (see :class:`V4l2FrameQueue`). It is started
+        and stopped by using it as a context manager.
+
+        Keyword arguments:
+            maxsize (int): the maximum number of queued frames (default 2).
+            policy (str): "block", "drop-oldest" or "drop-newest" (default
+                "block").
+            buffer_count (int): the number of buffers to request from the
+                driver. None requests enough for the queue, but at least 4
+                (default None). Ignored if buffers are given.
+            buffers (iterable): the caller's page-aligned buffers (see
+                :class:`V4l2UserPtrStream`) or None (default None).
+
+        Returns:
+            a :class:`V4l2FrameQueue`
+        """
+        from .v4l2grab import V4l2FrameQueue
+
+        if buffer_count is None:
+            buffer_count = max(4, maxsize + 2)
+        return V4l2FrameQueue(self.stream(buffer_count, buffers), maxsize,
+                              policy)
+
     @property
     def cropping_rectangle(self):
         """The cropping rectangle (see :class:`V4l2Rectangle`).
@@ -302,7 +538,7 @@ class V4l2Device(io.IOBase):
         try:
             cropping = self._ioc_ops.get_crop(type=self._buffer_type)
         except IoctlError as e:
-            if "Errno 22" in str(e):
+            if e.errno == EINVAL:
                 raise FeatureNotSupported("Cropping is not supported") \
                     from None
             else:
@@ -315,13 +551,24 @@ class V4l2Device(io.IOBase):
         try:
             self._ioc_ops.set_crop(type=self._buffer_type,
                                    c=rectangle._to_v4l2())
-        except IoctlError as e:
-            if "Errno 25" in str(e):
-                raise FeatureNotSupported("Cropping is not supported") \
-                    from None
+        except IoctlNotSupported:
+            raise FeatureNotSupported("Cropping is not supported") from None
 
 
 class V4l2DeviceIterator(object):
+    """An iterator over the available v4l2 devices.
+
+    Keyword arguments:
+        skip_links (bool): skip links and return every device only once.
+        workers (int): the number of devices to probe concurrently. If None,
+            the devices are probed one after another (default None).
+        timeout (float): the maximum time in seconds to probe a single device
+            when probing concurrently. Devices which take longer are skipped.
+            None waits forever (default None).
+
+    When probing concurrently, the devices are yielded in the order in which
+    their probing finishes.
+    """
     _v4l2_device_prefixes = ["video",
                              "radio",
                              "vbi",
@@ -329,29 +576,40 @@ class V4l2DeviceIterator(object):
                              "v4l-subdev",
                              ]
 
-    def __init__(self, skip_links):
+    _dev_root = Path(r"/dev")
+
+    def __init__(self, skip_links, workers=None, timeout=None):
+        if workers is not None and workers < 1:
+            raise ValueError("At least one worker is needed.")
         self._skip_links = skip_links
+        self._workers = workers
+        self._timeout = timeout
 
-    def __iter__(self):
+    def _find_devices(self):
         dev_list = []
         extend_dev_list = dev_list.extend
 
         # Find all devices conforming to the v4l2 devices pattern.
-        slash_dev = Path(r"/dev")
         for prefix in self._v4l2_device_prefixes:
-            extend_dev_list(slash_dev.glob(prefix+"*"))
+            extend_dev_list(self._dev_root.glob(prefix+"*"))
 
         if self._skip_links:
-            # Find redundant links.
-            to_remove = []
-            for idx, dev in enumerate(dev_list):
-                if dev.is_symlink() and dev.resolve() in dev_list:
-                    to_remove.append(idx)
+            # Remove links to devices which are found anyway.
+            dev_set = set(dev_list)
+            dev_list = [dev for dev in dev_list
+                        if not (dev.is_symlink() and dev.resolve() in dev_set)
+                        ]
+        return dev_list
 
-            # Remove links.
-            for dev_idx in reversed(to_remove):
-                del dev_list[dev_idx]
+    def __iter__(self):
+        dev_list = self._find_devices()
+        if self._workers is None:
+            return self._iter_sequential(dev_list)
+        else:
+            return self._iter_concurrent(dev_list)
 
+    @staticmethod
+    def _iter_sequential(dev_list):
         # Try to instanciate a V4l2Device object and yield it if successful.
         for dev in dev_list:
             try:
@@ -360,3 +618,83 @@ class V4l2DeviceIterator(object):
                 continue
             else:
                 yield dev_instance
+
+    def _iter_concurrent(self, dev_list):
+        timeout = self._timeout
+        tasks = deque(dev_list)
+        results = Queue()
+        # The devices being probed, mapped to their deadlines.
+        probing = {}
+        lock = Lock()
+
+        def probe():
+            while True:
+                with lock:
+                    if not tasks:
+                        return
+                    dev = tasks.popleft()
+                    probing[dev] = (None if timeout is None
+                                    else monotonic() + timeout)
+                try:
+                    result = (dev, V4l2Device(dev), None)
+                except BaseException as e:
+                    result = (dev, None, e)
+                with lock:
+                    if dev not in probing:
+                        # The device timed out and a new worker has taken
+                        # over the remaining tasks.
+                        return
+                    del probing[dev]
+                results.put(result)
+
+        def start_worker():
+            # Workers are daemons, so that a hung device does not keep the
+            # interpreter from exiting.
+            Thread(target=probe,
+                   name="V4l2DeviceIterator worker",
+                   daemon=True,
+                   ).start()
+
+        outstanding = len(tasks)
+        for _ in range(min(self._workers, outstanding)):
+            start_worker()
+
+        try:
+            while outstanding:
+                if timeout is None:
+                    wait = None
+                else:
+                    with lock:
+                        deadline = min(probing.values(), default=None)
+                    if deadline is None:
+                        # Nothing is being probed yet, check again later.
+                        wait = timeout
+                    else:
+                        wait = max(0, deadline - monotonic())
+
+                try:
+                    dev, dev_instance, error = results.get(timeout=wait)
+                except Empty:
+                    # Give up on the devices which took too long and replace
+                    # their (possibly hung) workers.
+                    now = monotonic()
+                    with lock:
+                        expired = [dev for dev, deadline in probing.items()
+                                   if deadline <= now]
+                        for dev in expired:
+                            del probing[dev]
+                        to_start = min(len(expired), len(tasks))
+                    outstanding -= len(expired)
+                    for _ in range(to_start):
+                        start_worker()
+                    continue
+
+                outstanding -= 1
+                if error is None:
+                    yield dev_instance
+                elif not isinstance(error, IoctlError):
+                    raise error
+        finally:
+            # Let the workers finish once the iteration is stopped.
+            with lock:
+                tasks.clear()
@@ -14,41 +14,80 @@
 # See the Licence for the specific language governing permissions and
 # limitations under the Licence.
 ###############################################################################
-from .ioctls import V4l2Formats, V4l2FormatDescFlags, IoctlError
+from . import ioctls
+from .ioctls import V4l2FormatDescFlags, EndOfEnumeration, \
+                   IoctlNotSupported
+from .ioctls.v4l2ioctlstructs import V4l2IoctlFmtDesc
 from .v4l2frame import V4l2FrameSize
 
 
 class V4l2Format(object):
-    """The v4l2 format information."""
-    def __init__(self, ioc_ops, fmt_desc):
+    """The v4l2 format information.
+
+    This is an immutable snapshot. The ioctl structure is decoded once and not
+    referenced afterwards.
+
+    Keyword arguments:
+        ioc_ops (V4l2IocOps): the ioctl operations of the device.
+        fmt_desc (V4l2IoctlFmtDesc): the format description.
+        sizes (list): the already known frame sizes of this format, e.g., from
+            a :class:`V4l2FormatCache`. If None, they are queried from the
+            device (default None).
+    """
+    __slots__ = ("_ioc_ops", "_pixel_format", "_format", "_description",
+                 "_flags", "_sizes")
+
+    def __init__(self, ioc_ops, fmt_desc, sizes=None):
         self._ioc_ops = ioc_ops
-        self._fmt_desc = fmt_desc
+        self._pixel_format = fmt_desc.pixelformat
+        self._format = None
+        self._description = fmt_desc.description.decode()
+        self._flags = V4l2FormatDescFlags(fmt_desc.flags)
+        self._sizes = sizes
+
+    @property
+    def pixel_format(self):
+        "The pixel format as a four character code."
+        return self._pixel_format
 
     @property
     def format(self):
         "The format type (see :class:`V4l2Formats`)."
-        return V4l2Formats(self._fmt_desc.pixelformat)
+        if self._format is None:
+            self._format = ioctls.V4l2Formats(self._pixel_format)
+        return self._format
 
     @property
     def description(self):
         "The format description."
-        return self._fmt_desc.description.decode()
+        return self._description
 
     @property
     def flags(self):
         "The format flags (see :class:`V4l2FormatDescFlags`)."
-        return V4l2FormatDescFlags(self._fmt_desc.flags)
+        return self._flags
+
+    def _to_v4l2(self):
+        return V4l2IoctlFmtDesc(flags=self._flags,
+                                description=self._description.encode(),
+                                pixelformat=self._pixel_format,
+                                )
 
     def sizes(self):
-        """A generator function that yiels the available sizes for this
-        format."""
+        """Return an iterator over the available sizes for this format."""
+        if self._sizes is not None:
+            return iter(self._sizes)
+        return self._iter_sizes()
+
+    def _iter_sizes(self):
+        # The sizes are decoded right away, so the buffer can be reused.
+        enum_frame_sizes = self._ioc_ops.enum_frame_sizes.reuse
         fr_idx = 0
         while fr_idx < 2**32:
             try:
-                frm_size = self._ioc_ops.enum_frame_sizes(
-                    index=fr_idx,
-                    pixel_format=self._fmt_desc.pixelformat)
-            except IoctlError:
+                frm_size = enum_frame_sizes(index=fr_idx,
+                                            pixel_format=self._pixel_format)
+            except (EndOfEnumeration, IoctlNotSupported):
                 break
             else:
                 yield V4l2FrameSize(self._ioc_ops, frm_size)
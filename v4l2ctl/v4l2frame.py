@@ -15,21 +15,40 @@
 # limitations under the Licence.
 ###############################################################################
 from .v4l2types import V4l2Fraction
-from .ioctls import V4l2Formats, V4l2FrameSizeTypes, V4l2FrameIvalTypes
+from . import ioctls
+from .ioctls import V4l2FrameSizeTypes, V4l2FrameIvalTypes, \
+                   IoctlError, EndOfEnumeration, IoctlNotSupported
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from .ioctls.v4l2ioctlstructs import V4l2IoctlFrameSizeEnum, \
+                                     V4l2IoctlFrameIvalEnum
 
 
 class V4l2FrameInterval(object):
-    """The v4l2 frame interval."""
+    """The v4l2 frame interval.
+
+    This is an immutable snapshot. The ioctl structure is decoded once and not
+    referenced afterwards.
+    """
+    __slots__ = ("_type", "_interval")
+
     def __init__(self, frame_ival):
-        self._frame_ival = frame_ival
+        self._type = V4l2FrameIvalTypes(frame_ival.type)
+        if self._type == V4l2FrameIvalTypes.DISCRETE:
+            self._interval = V4l2Fraction._from_v4l2(frame_ival.discrete)
+        else:
+            self._interval = (
+                V4l2Fraction._from_v4l2(frame_ival.stepwise.min),
+                V4l2Fraction._from_v4l2(frame_ival.stepwise.max),
+                V4l2Fraction._from_v4l2(frame_ival.stepwise.step),
+                )
 
     @property
     def type(self):
         """The frame interval type (see :class:`V4l2FrameIvalTypes`)
         (read-only).
         """
-        return V4l2FrameIvalTypes(self._frame_ival.type)
+        return self._type
 
     @property
     def interval(self):
@@ -40,13 +59,18 @@ class V4l2FrameInterval(object):
             In case of a stepwise or coninuous interval, this is a tuple of
             fractions of the form (min, max, step).
         """
-        if self.type == V4l2FrameIvalTypes.DISCRETE:
-            return V4l2Fraction(self._frame_ival.discrete)
+        return self._interval
+
+    def _to_v4l2(self):
+        frame_ival = V4l2IoctlFrameIvalEnum(type=self._type)
+        if self._type == V4l2FrameIvalTypes.DISCRETE:
+            frame_ival.discrete = self._interval._to_v4l2()
         else:
-            return (V4l2Fraction(self._frame_ival.stepwise.min),
-                    V4l2Fraction(self._frame_ival.stepwise.max),
-                    V4l2Fraction(self._frame_ival.stepwise.step),
-                    )
+            (frame_ival.stepwise.min,
+             frame_ival.stepwise.max,
+             frame_ival.stepwise.step) = (fraction._to_v4l2()
+                                          for fraction in self._interval)
+        return frame_ival
 
     def __repr__(self):
         return ("V4l2FrameInterval(type={typ}, interval={interval})"
@@ -56,32 +80,55 @@ class V4l2FrameInterval(object):
 class V4l2FrameSize(ABC):
     """The v4l2 frame size.
 
+    This is an immutable snapshot. The ioctl structure is decoded once and not
+    referenced afterwards.
+
     Note:
         This is an abstract base class. When instantiated, it will instead
         return an instance of the correct child class according to the size
         type.
         See :class:`V4l2DiscreteFrameSize` and :class:`V4l2StepwiseFrameSize`
         for the concrete implementation.
+
+    Keyword arguments:
+        ioc_ops (V4l2IocOps): the ioctl operations of the device.
+        frame_size (V4l2IoctlFrameSizeEnum): the frame size.
+        intervals (list): the already known frame intervals of a discrete
+            size, e.g., from a :class:`V4l2FormatCache`. If None, they are
+            queried from the device (default None).
     """
-    def __new__(cls, ioc_ops, frame_size):
+    __slots__ = ("_ioc_ops", "_pixel_format", "_format", "_type", "_width",
+                 "_height", "_intervals")
+
+    def __new__(cls, ioc_ops, frame_size, intervals=None):
         if frame_size.type == V4l2FrameSizeTypes.DISCRETE:
             return super().__new__(V4l2DiscreteFrameSize)
         else:
             return super().__new__(V4l2StepwiseFrameSize)
 
-    def __init__(self, ioc_ops, frame_size):
+    def __init__(self, ioc_ops, frame_size, intervals=None):
         self._ioc_ops = ioc_ops
-        self._frame_size = frame_size
+        self._pixel_format = frame_size.pixel_format
+        self._format = None
+        self._type = V4l2FrameSizeTypes(frame_size.type)
+        self._intervals = intervals
+
+    @property
+    def pixel_format(self):
+        "The pixel format as a four character code (read-only)."
+        return self._pixel_format
 
     @property
     def format(self):
         "The format type (see :class:`V4l2Formats`) (read-only)."
-        return V4l2Formats(self._frame_size.pixel_format)
+        if self._format is None:
+            self._format = ioctls.V4l2Formats(self._pixel_format)
+        return self._format
 
     @property
     def type(self):
         "The frame size type (see :class:`V4l2FrameSizeTypes`) (read-only)."
-        return V4l2FrameSizeTypes(self._frame_size.type)
+        return self._type
 
     def __repr__(self):
         return ("V4l2FrameSize(format={fmt}, type={typ}, size={w}x{h})"
@@ -124,72 +171,233 @@ class V4l2FrameSize(ABC):
 
 class V4l2DiscreteFrameSize(V4l2FrameSize):
     """The v4l2 discrete frame size."""
+    __slots__ = ()
+
+    def __init__(self, ioc_ops, frame_size, intervals=None):
+        super().__init__(ioc_ops, frame_size, intervals)
+        self._width = frame_size.discrete.width
+        self._height = frame_size.discrete.height
+
     @property
     def width(self):
         """The frame width (read-only)."""
-        return self._frame_size.discrete.width
+        return self._width
 
     @property
     def height(self):
         """The frame height (read-only)."""
-        return self._frame_size.discrete.height
+        return self._height
+
+    def _to_v4l2(self):
+        frame_size = V4l2IoctlFrameSizeEnum(pixel_format=self._pixel_format,
+                                            type=self._type)
+        frame_size.discrete.width = self._width
+        frame_size.discrete.height = self._height
+        return frame_size
 
     def intervals(self):
-        """A generator function that yiels the available intervals for this
-        format and size."""
+        """Return an iterator over the available intervals for this format and
+        size."""
+        if self._intervals is not None:
+            return iter(self._intervals)
+        return self._iter_intervals()
+
+    def _iter_intervals(self):
+        # The intervals are decoded right away, so the buffer can be reused.
+        enum_frame_intervals = self._ioc_ops.enum_frame_intervals.reuse
         ival_idx = 0
         while ival_idx < 2**32:
             try:
-                frm_ival = self._ioc_ops.enum_frame_intervals(
+                frm_ival = enum_frame_intervals(
                     index=ival_idx,
-                    pixel_format=self._frame_size.pixel_format,
-                    width=self.width,
-                    height=self.height,
+                    pixel_format=self._pixel_format,
+                    width=self._width,
+                    height=self._height,
                     )
-            except OSError:
+            except (EndOfEnumeration, IoctlNotSupported):
                 break
             else:
                 yield V4l2FrameInterval(frm_ival)
             ival_idx += 1
 
 
+def _axis(minimum, maximum, step):
+    # Continuous sizes have a step of 1, but don't trust every driver on that.
+    return range(minimum, maximum + 1, max(step, 1))
+
+
+def _closest_on_axis(axis, value):
+    if value <= axis[0]:
+        return axis[0]
+    if value >= axis[-1]:
+        return axis[-1]
+    # Round to the nearest step, halfway values are rounded up.
+    return axis[(value - axis.start + axis.step // 2) // axis.step]
+
+
+class V4l2FrameSizeGrid(Sequence):
+    """A lazy view over all sizes of a stepwise/continuous frame size.
+
+    The sizes are (width, height) tuples ordered by width first. They are
+    computed on access, so the view is cheap regardless of the number of sizes,
+    and lookups (indexing, ``in``, :meth:`index`) don't iterate.
+
+    Keyword arguments:
+        width (tuple): the width of the form (min, max, step).
+        height (tuple): the height of the form (min, max, step).
+    """
+    def __init__(self, width, height):
+        self._widths = _axis(*width)
+        self._heights = _axis(*height)
+
+    @property
+    def widths(self):
+        """The supported widths as a range (read-only)."""
+        return self._widths
+
+    @property
+    def heights(self):
+        """The supported heights as a range (read-only)."""
+        return self._heights
+
+    def __len__(self):
+        return len(self._widths) * len(self._heights)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("grid index out of range")
+        width_idx, height_idx = divmod(index, len(self._heights))
+        return (self._widths[width_idx], self._heights[height_idx])
+
+    def __contains__(self, size):
+        try:
+            width, height = size
+        except (TypeError, ValueError):
+            return False
+        return width in self._widths and height in self._heights
+
+    def index(self, size):
+        """Return the index of a (width, height) tuple."""
+        if size not in self:
+            raise ValueError("{} is not in the grid".format(size))
+        width, height = size
+        return (self._widths.index(width) * len(self._heights) +
+                self._heights.index(height))
+
+    def closest(self, width, height):
+        """Return the supported size closest to the given one.
+
+        Every dimension is rounded to the nearest step within its range.
+
+        Returns:
+            a (width, height) tuple.
+        """
+        return (_closest_on_axis(self._widths, width),
+                _closest_on_axis(self._heights, height))
+
+    def __repr__(self):
+        return "V4l2FrameSizeGrid(widths={w}, heights={h})".format(
+            w=self._widths, h=self._heights)
+
+
 class V4l2StepwiseFrameSize(V4l2FrameSize):
     """The v4l2 stepwise/continuous frame size."""
+    __slots__ = ()
+
+    def __init__(self, ioc_ops, frame_size, intervals=None):
+        super().__init__(ioc_ops, frame_size, intervals)
+        stepwise = frame_size.stepwise
+        self._width = (stepwise.min_width,
+                       stepwise.max_width,
+                       stepwise.step_width)
+        self._height = (stepwise.min_height,
+                        stepwise.max_height,
+                        stepwise.step_height)
+
     @property
     def width(self):
         "The frame width as a tuple of the form (min, max, step) (read-only)."
-        return (self._frame_size.stepwise.min_width,
-                self._frame_size.stepwise.max_width,
-                self._frame_size.stepwise.step_width)
+        return self._width
 
     @property
     def height(self):
         "The frame height as a tuple of the form (min, max, step) (read-only)."
-        return (self._frame_size.stepwise.min_height,
-                self._frame_size.stepwise.max_height,
-                self._frame_size.stepwise.step_height)
+        return self._height
+
+    def _to_v4l2(self):
+        frame_size = V4l2IoctlFrameSizeEnum(pixel_format=self._pixel_format,
+                                            type=self._type)
+        stepwise = frame_size.stepwise
+        (stepwise.min_width,
+         stepwise.max_width,
+         stepwise.step_width) = self._width
+        (stepwise.min_height,
+         stepwise.max_height,
+         stepwise.step_height) = self._height
+        return frame_size
+
+    @property
+    def grid(self):
+        """A lazy view over all the supported sizes (see
+        :class:`V4l2FrameSizeGrid`) (read-only)."""
+        return V4l2FrameSizeGrid(self.width, self.height)
+
+    def closest(self, width, height):
+        """Return the supported size closest to the given one as a
+        (width, height) tuple."""
+        return self.grid.closest(width, height)
+
+    def closest_intervals(self, width, height):
+        """A generator function that yields the available intervals for the
+        supported size closest to the given one (see :meth:`closest`).
+
+        Only the intervals of that one size are queried.
+        """
+        width, height = self.closest(width, height)
+        enum_frame_intervals = self._ioc_ops.enum_frame_intervals.reuse
+        ival_idx = 0
+        while ival_idx < 2**32:
+            try:
+                interval = V4l2FrameInterval(enum_frame_intervals(
+                    index=ival_idx,
+                    pixel_format=self._pixel_format,
+                    width=width,
+                    height=height,
+                    ))
+            except (EndOfEnumeration, IoctlNotSupported):
+                break
+            else:
+                yield interval
+                # Stepwise and continuous intervals are reported at once.
+                if interval.type != V4l2FrameIvalTypes.DISCRETE:
+                    break
+            ival_idx += 1
 
     def intervals(self):
         """A generator function that yiels the available intervals for this
-        format and size."""
-        frame_width = self.width
-        frame_height = self.height
-        for width in range(frame_width[0],
-                           frame_width[1]+1,
-                           frame_width[2]):
-            for height in range(frame_height[0],
-                                frame_height[1]+1,
-                                frame_height[2]):
-                try:
-                    frm_ival = self._ioc_ops.enum_frame_intervals(
-                        index=0,
-                        pixel_format=self._frame_size.pixel_format,
-                        width=width,
-                        height=height,
-                        )
-                except OSError:
-                    # Actually not supposed to happen, because one interval is
-                    # supported per size, so let's just continue.
-                    continue
-                else:
-                    yield V4l2FrameInterval(frm_ival)
+        format and size.
+
+        Note:
+            This queries the intervals of every single size in the grid. To
+            query the intervals of a certain size only, see
+            :meth:`closest_intervals`.
+        """
+        enum_frame_intervals = self._ioc_ops.enum_frame_intervals.reuse
+        for width, height in self.grid:
+            try:
+                frm_ival = enum_frame_intervals(
+                    index=0,
+                    pixel_format=self._pixel_format,
+                    width=width,
+                    height=height,
+                    )
+            except IoctlError:
+                # Actually not supposed to happen, because one interval is
+                # supported per size, so let's just continue.
+                continue
+            else:
+                yield V4l2FrameInterval(frm_ival)
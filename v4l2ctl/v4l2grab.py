@@ -0,0 +1,441 @@
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from collections import namedtuple, deque
+from threading import Thread, Condition
+from time import monotonic
+import select
+import os
+
+
+#: The statistics of a :class:`V4l2FrameGrabber`: the number of grabbed
+#: frames, the number of frames skipped because a newer one arrived before
+#: they were grabbed, and the last, mean and maximum latency in seconds
+#: between dequeuing a frame and handing it to the consumer.
+V4l2GrabStatistics = namedtuple("V4l2GrabStatistics", [
+    "grabbed", "skipped", "last_latency", "mean_latency", "max_latency"])
+
+#: The statistics of a :class:`V4l2FrameQueue`: the number of frames put into
+#: the queue, the numbers of frames dropped by the "drop-oldest" and
+#: "drop-newest" policies, the highest number of frames queued at once, and
+#: the number of times the "block" policy stopped dequeuing from the driver.
+V4l2QueueStatistics = namedtuple("V4l2QueueStatistics", [
+    "queued", "dropped_oldest", "dropped_newest", "high_water", "blocked"])
+
+
+class _V4l2CaptureThread(object):
+    """The base of captures with a background thread dequeuing the buffers.
+
+    Subclasses decide how many buffers to dequeue (see _capacity) and what to
+    do with the frames (see _deliver).
+
+    Keyword arguments:
+        stream (V4l2Stream): the stream to capture from. It is started and
+            stopped with the capture.
+    """
+    def __init__(self, stream):
+        self._stream = stream
+        # Guards the subclasses' state and signals changes of it.
+        self._condition = Condition()
+        self._error = None
+        self._thread = None
+        self._wakeup = None
+        self._running = False
+        self._reset_statistics()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def stream(self):
+        """The stream being captured from (read-only)."""
+        return self._stream
+
+    @property
+    def running(self):
+        """If the capture is running (read-only)."""
+        return self._running
+
+    def _reset_statistics(self):
+        pass
+
+    def start(self):
+        """Start the stream and the capturing thread."""
+        if self._running:
+            return
+        stream = self._stream
+        if not stream.streaming:
+            stream.start()
+        try:
+            self._check_stream()
+        except BaseException:
+            stream.stop()
+            raise
+        fd = stream.device.fileno()
+        self._blocking = os.get_blocking(fd)
+        os.set_blocking(fd, False)
+        self._wakeup = os.pipe()
+        self._reset_statistics()
+        self._error = None
+        self._running = True
+        self._thread = Thread(target=self._capture,
+                              args=(fd, self._wakeup[0]),
+                              name=type(self).__name__,
+                              daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the capturing thread and the stream.
+
+        Note:
+            Frames still held by the application become invalid.
+        """
+        if not self._running:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        os.write(self._wakeup[1], b"\0")
+        self._thread.join()
+        self._thread = None
+        for fd in self._wakeup:
+            os.close(fd)
+        self._wakeup = None
+        self._discard()
+        os.set_blocking(self._stream.device.fileno(), self._blocking)
+        self._stream.stop()
+
+    def _check_stream(self):
+        # Called once the stream is running, before capturing.
+        pass
+
+    def _capacity(self):
+        # The maximum number of buffers to dequeue now. Called on the
+        # capturing thread, it may wait. 0 stops capturing.
+        return max(self._stream.buffer_count, 1)
+
+    def _deliver(self, frames, dequeued):
+        # Hand over the frames dequeued at the given time.
+        raise NotImplementedError
+
+    def _discard(self):
+        # Release all frames held after stopping.
+        raise NotImplementedError
+
+    def _capture(self, fd, wakeup):
+        stream = self._stream
+        try:
+            while True:
+                ready, _, _ = select.select((fd, wakeup), (), ())
+                if wakeup in ready:
+                    break
+                capacity = self._capacity()
+                if not capacity:
+                    break
+                frames = stream.drain(capacity)
+                if frames:
+                    self._deliver(frames, monotonic())
+        except BaseException as error:
+            with self._condition:
+                self._error = error
+                self._condition.notify_all()
+
+    def _wait(self, predicate, timeout):
+        # Wait on the consumer's side, until the predicate holds. Returns
+        # False if timed out. Must be called with the condition held.
+        if not self._condition.wait_for(
+                lambda: (predicate() or self._error is not None or
+                         not self._running),
+                timeout):
+            return False
+        if self._error is not None:
+            # The capturing thread has ended.
+            raise self._error
+        if not predicate():
+            raise ValueError("The capture is not running.")
+        return True
+
+    def __repr__(self):
+        return "<{} object for '{}'>".format(type(self).__name__,
+                                             self._stream.device.device)
+
+
+class V4l2FrameGrabber(_V4l2CaptureThread):
+    """Capture the newest frame only, for low latency.
+
+    A background thread dequeues every filled buffer as soon as it is ready
+    and keeps only the newest frame in a single-slot mailbox. Older frames are
+    handed back to the driver at once, so the driver always has buffers to
+    fill, and :meth:`grab` never returns a stale frame.
+
+    Keyword arguments:
+        stream (V4l2Stream): the stream to capture from. It is started and
+            stopped with the grabber.
+
+    Example:
+        A control loop::
+
+            with device.grabber() as grabber:
+                while True:
+                    frame = grabber.grab()
+                    control(frame.data)
+    """
+    def __init__(self, stream):
+        super().__init__(stream)
+        # The newest frame and the time it was dequeued, or None.
+        self._slot = None
+        # The last frame returned by grab().
+        self._grabbed = None
+
+    def _reset_statistics(self):
+        self._grabbed_count = 0
+        self._skipped = 0
+        self._last_latency = 0.0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    @property
+    def statistics(self):
+        """The statistics since the grabber was started, as a
+        :class:`V4l2GrabStatistics` (read-only)."""
+        with self._condition:
+            grabbed = self._grabbed_count
+            return V4l2GrabStatistics(
+                grabbed,
+                self._skipped,
+                self._last_latency,
+                self._total_latency / grabbed if grabbed else 0.0,
+                self._max_latency)
+
+    def _deliver(self, frames, dequeued):
+        newest = frames.pop()
+        for frame in frames:
+            frame.release()
+        with self._condition:
+            if self._slot is not None:
+                self._slot[0].release()
+                frames.append(self._slot[0])
+            self._skipped += len(frames)
+            self._slot = (newest, dequeued)
+            self._condition.notify_all()
+
+    def _discard(self):
+        with self._condition:
+            slot, self._slot = self._slot, None
+        if slot is not None:
+            slot[0].release()
+        if self._grabbed is not None:
+            self._grabbed.release()
+            self._grabbed = None
+
+    def _has_frame(self):
+        return self._slot is not None
+
+    def grab(self, timeout=None):
+        """Return the newest frame.
+
+        If no frame arrived since the last call, wait for the next one. The
+        frame returned by the last call is released, unless the consumer
+        already did.
+
+        Keyword arguments:
+            timeout (float): maximum time to wait in seconds. None waits
+                forever (default None).
+
+        Returns:
+            a :class:`V4l2CapturedFrame` or None if timed out.
+
+        Raises:
+            ValueError: if the grabber is not running.
+        """
+        if self._grabbed is not None:
+            self._grabbed.release()
+            self._grabbed = None
+        with self._condition:
+            if not self._wait(self._has_frame, timeout):
+                return None
+            frame, dequeued = self._slot
+            self._slot = None
+            latency = monotonic() - dequeued
+            self._grabbed_count += 1
+            self._last_latency = latency
+            self._total_latency += latency
+            if latency > self._max_latency:
+                self._max_latency = latency
+        self._grabbed = frame
+        return frame
+
+
+class V4l2FrameQueue(_V4l2CaptureThread):
+    """A bounded queue of captured frames between the driver and a consumer.
+
+    A background thread dequeues the filled buffers and puts the frames into
+    the queue. When the queue is full, the policy decides:
+
+    * "block": stop dequeuing until the consumer takes a frame. The driver
+      keeps filling the buffers it still has, and drops frames once they are
+      all filled.
+    * "drop-oldest": hand the oldest queued frame back to the driver.
+    * "drop-newest": hand the new frame back to the driver.
+
+    The queue never holds so many buffers that the driver runs out of them:
+    at least maxsize + 2 buffers are needed (the queued ones, the one held by
+    the consumer and one for the driver to fill).
+
+    Keyword arguments:
+        stream (V4l2Stream): the stream to capture from. It is started and
+            stopped with the queue.
+        maxsize (int): the maximum number of queued frames.
+        policy (str): "block", "drop-oldest" or "drop-newest" (default
+            "block").
+
+    Example:
+        Process frames without falling behind::
+
+            with device.frame_queue(maxsize=2, policy="drop-oldest") as queue:
+                while True:
+                    process(queue.get().data)
+    """
+    #: The supported policies.
+    policies = ("block", "drop-oldest", "drop-newest")
+
+    def __init__(self, stream, maxsize, policy="block"):
+        if policy not in self.policies:
+            raise ValueError("policy must be one of " + str(self.policies))
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        super().__init__(stream)
+        self._maxsize = maxsize
+        self._policy = policy
+        # The queued frames and the times they were dequeued.
+        self._frames = deque()
+        # The last frame returned by get().
+        self._taken = None
+
+    @property
+    def maxsize(self):
+        """The maximum number of queued frames (read-only)."""
+        return self._maxsize
+
+    @property
+    def policy(self):
+        """The policy for a full queue (read-only)."""
+        return self._policy
+
+    def __len__(self):
+        return len(self._frames)
+
+    def _reset_statistics(self):
+        self._queued = 0
+        self._dropped_oldest = 0
+        self._dropped_newest = 0
+        self._high_water = 0
+        self._blocked = 0
+
+    @property
+    def statistics(self):
+        """The statistics since the queue was started, as a
+        :class:`V4l2QueueStatistics` (read-only)."""
+        with self._condition:
+            return V4l2QueueStatistics(self._queued,
+                                       self._dropped_oldest,
+                                       self._dropped_newest,
+                                       self._high_water,
+                                       self._blocked)
+
+    def _check_stream(self):
+        if self._stream.buffer_count < self._maxsize + 2:
+            raise ValueError(
+                "A queue of {} frames needs at least {} buffers, the stream "
+                "has {}.".format(self._maxsize, self._maxsize + 2,
+                                 self._stream.buffer_count))
+
+    def _has_space(self):
+        return len(self._frames) < self._maxsize
+
+    def _capacity(self):
+        if self._policy != "block":
+            return super()._capacity()
+        with self._condition:
+            if not self._has_space():
+                self._blocked += 1
+                self._condition.wait_for(
+                    lambda: self._has_space() or not self._running)
+                if not self._running:
+                    return 0
+            return self._maxsize - len(self._frames)
+
+    def _deliver(self, frames, dequeued):
+        queue = self._frames
+        with self._condition:
+            for frame in frames:
+                if len(queue) >= self._maxsize:
+                    if self._policy == "drop-newest":
+                        frame.release()
+                        self._dropped_newest += 1
+                        continue
+                    queue.popleft()[0].release()
+                    self._dropped_oldest += 1
+                queue.append((frame, dequeued))
+                self._queued += 1
+            if len(queue) > self._high_water:
+                self._high_water = len(queue)
+            self._condition.notify_all()
+
+    def _discard(self):
+        with self._condition:
+            frames = [frame for frame, _ in self._frames]
+            self._frames.clear()
+        for frame in frames:
+            frame.release()
+        if self._taken is not None:
+            self._taken.release()
+            self._taken = None
+
+    def _has_frame(self):
+        return bool(self._frames)
+
+    def get(self, timeout=None):
+        """Take the oldest queued frame.
+
+        If the queue is empty, wait for the next frame. The frame returned by
+        the last call is released, unless the consumer already did.
+
+        Keyword arguments:
+            timeout (float): maximum time to wait in seconds. None waits
+                forever (default None).
+
+        Returns:
+            a :class:`V4l2CapturedFrame` or None if timed out.
+
+        Raises:
+            ValueError: if the queue is not running.
+        """
+        if self._taken is not None:
+            self._taken.release()
+            self._taken = None
+        with self._condition:
+            if not self._wait(self._has_frame, timeout):
+                return None
+            frame, _ = self._frames.popleft()
+            # Wake up a blocked capturing thread.
+            self._condition.notify_all()
+        self._taken = frame
+        return frame
@@ -0,0 +1,190 @@
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from .v4l2device import V4l2Device
+from pathlib import Path
+import re
+
+
+def _read_attribute(path):
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _natural_key(name):
+    # Sort "video10" after "video9".
+    prefix, number = re.match(r"(.*?)(\d*)$", name).groups()
+    return prefix, int(number) if number else -1
+
+
+class V4l2DeviceInfo(object):
+    """The information about a v4l2 device node found in sysfs.
+
+    The information is read from sysfs when the object is created, without
+    opening the device node. The full :class:`V4l2Device` is only created on
+    demand (see :attr:`v4l2_device`).
+
+    Keyword arguments:
+        sysfs_path (str, path-like): the node's directory in sysfs, e.g.,
+            "/sys/class/video4linux/video0".
+        dev_root (str, path-like): the directory containing the device files
+            (default "/dev").
+    """
+    def __init__(self, sysfs_path, dev_root=r"/dev"):
+        self._sysfs_path = Path(sysfs_path)
+        self._node = self._sysfs_path.name
+        self._name = _read_attribute(self._sysfs_path / "name")
+
+        index = _read_attribute(self._sysfs_path / "index")
+        self._index = int(index) if index is not None else None
+
+        dev = _read_attribute(self._sysfs_path / "dev")
+        if dev is not None:
+            major, minor = dev.split(":")
+            self._dev_number = (int(major), int(minor))
+        else:
+            self._dev_number = None
+
+        # The device file is named after DEVNAME, which is usually, but not
+        # necessarily, the node name.
+        dev_name = self._node
+        uevent = _read_attribute(self._sysfs_path / "uevent")
+        if uevent is not None:
+            for line in uevent.splitlines():
+                key, _, value = line.partition("=")
+                if key == "DEVNAME":
+                    dev_name = value
+        self._device = Path(dev_root) / dev_name
+
+        parent = self._sysfs_path / "device"
+        if parent.exists():
+            self._parent = parent.resolve()
+            driver = parent / "driver"
+            self._driver = driver.resolve().name if driver.exists() else None
+        else:
+            self._parent = None
+            self._driver = None
+
+        self._v4l2_device = None
+
+    @property
+    def node(self):
+        """The node name, e.g., "video0" (read-only)."""
+        return self._node
+
+    @property
+    def device(self):
+        """The device file (read-only)."""
+        return self._device
+
+    @property
+    def name(self):
+        """The name of the node, usually the card name (read-only)."""
+        return self._name
+
+    @property
+    def index(self):
+        """The index of the node among the nodes of the same physical device
+        (read-only)."""
+        return self._index
+
+    @property
+    def dev_number(self):
+        """The device number as a (major, minor) tuple (read-only)."""
+        return self._dev_number
+
+    @property
+    def parent(self):
+        """The sysfs path of the physical device. Nodes sharing the same parent
+        belong to the same physical device (read-only)."""
+        return self._parent
+
+    @property
+    def driver(self):
+        """The name of the linux driver bound to the physical device
+        (read-only)."""
+        return self._driver
+
+    @property
+    def v4l2_device(self):
+        """The :class:`V4l2Device` for this node (read-only).
+
+        It is created on first access, which opens the device node and queries
+        its capabilities.
+        """
+        if self._v4l2_device is None:
+            self._v4l2_device = V4l2Device(self._device)
+        return self._v4l2_device
+
+    def __repr__(self):
+        return "<V4l2DeviceInfo object for '{}({})'>".format(self._name,
+                                                             self._device,
+                                                             )
+
+
+class V4l2SysfsInventory(object):
+    """An inventory of the v4l2 device nodes built from sysfs.
+
+    Listing the devices does not open any device node, so devices used by
+    other processes are not disturbed.
+
+    Keyword arguments:
+        sysfs_root (str, path-like): the v4l2 device class directory
+            (default "/sys/class/video4linux").
+        dev_root (str, path-like): the directory containing the device files
+            (default "/dev").
+
+    Example:
+        Open only the capture devices of a certain driver::
+
+            for info in V4l2SysfsInventory():
+                if info.driver == "uvcvideo" and info.node.startswith("video"):
+                    print(info.v4l2_device.capabilities)
+    """
+    def __init__(self, sysfs_root=r"/sys/class/video4linux", dev_root=r"/dev"):
+        self._sysfs_root = Path(sysfs_root)
+        self._dev_root = Path(dev_root)
+
+    def __iter__(self):
+        """Iterate over the nodes, sorted by name.
+
+        sysfs is read anew for every iteration.
+        """
+        try:
+            nodes = sorted(self._sysfs_root.iterdir(),
+                           key=lambda path: _natural_key(path.name))
+        except FileNotFoundError:
+            # No v4l2 driver is loaded.
+            return
+        for node in nodes:
+            yield V4l2DeviceInfo(node, self._dev_root)
+
+    def by_parent(self):
+        """Group the nodes by their physical device.
+
+        Returns:
+            a dict mapping the sysfs path of every physical device to the list
+            of its nodes.
+        """
+        groups = {}
+        for info in self:
+            groups.setdefault(info.parent, []).append(info)
+        return groups
+
+    def __repr__(self):
+        return "<V4l2SysfsInventory object for '{}'>".format(self._sysfs_root)
@@ -0,0 +1,179 @@
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from .ioctls import V4l2FrameSizeTypes, V4l2FrameIvalTypes
+from array import array
+from collections import namedtuple
+
+
+#: A row of a :class:`V4l2ModeTable`. The device is an index into
+#: :attr:`V4l2ModeTable.devices`, the interval is numerator/denominator
+#: seconds.
+V4l2ModeRow = namedtuple("V4l2ModeRow", ["device", "fourcc", "width",
+                                         "height", "numerator",
+                                         "denominator"])
+
+# An unsigned array typecode of at least 32 bits.
+_U32 = "I" if array("I").itemsize >= 4 else "L"
+
+
+class V4l2ModeTable(object):
+    """A compact table of the modes (format, size and interval) of devices.
+
+    Every mode is one row. The columns are typed arrays, so a row takes 24
+    bytes instead of several python objects holding ioctl structures. The
+    table can hold the modes of many devices.
+
+    Note:
+        Stepwise and continuous sizes are represented by their smallest and
+        biggest sizes, stepwise and continuous intervals by their shortest and
+        longest intervals.
+
+    Example:
+        Find all modes of 60 fps or more on all devices using NumPy::
+
+            table = V4l2ModeTable()
+            for device in V4l2Device.iter_devices():
+                table.add_device(device)
+            modes = table.to_numpy()
+            fast = modes[modes["denominator"] >= 60 * modes["numerator"]]
+    """
+    #: The column names and array typecodes.
+    columns = tuple(zip(V4l2ModeRow._fields, ("I", _U32, _U32, _U32, _U32,
+                                              _U32)))
+
+    def __init__(self):
+        self._devices = []
+        self._columns = {name: array(typecode)
+                         for name, typecode in self.columns}
+
+    @classmethod
+    def from_device(cls, device, buffer_type=None, formats=None):
+        """Create a table with the modes of one device (see
+        :meth:`add_device`)."""
+        table = cls()
+        table.add_device(device, buffer_type, formats)
+        return table
+
+    @property
+    def devices(self):
+        """The device files of the devices in the table (read-only)."""
+        return tuple(self._devices)
+
+    @property
+    def nbytes(self):
+        """The memory taken by the table's columns in bytes (read-only)."""
+        return sum(column.itemsize * len(column)
+                   for column in self._columns.values())
+
+    def column(self, name):
+        """Return a copy of a column as an array."""
+        column = self._columns[name]
+        return array(column.typecode, column)
+
+    def __len__(self):
+        return len(self._columns["device"])
+
+    def __getitem__(self, index):
+        return V4l2ModeRow(*(self._columns[name][index]
+                             for name in V4l2ModeRow._fields))
+
+    def __iter__(self):
+        return map(V4l2ModeRow._make,
+                   zip(*(self._columns[name]
+                         for name in V4l2ModeRow._fields)))
+
+    ###########################################################################
+    # Filling.
+    ###########################################################################
+    def add_device(self, device, buffer_type=None, formats=None):
+        """Add all modes of a device.
+
+        Keyword arguments:
+            device (V4l2Device): the device.
+            buffer_type (V4l2BufferType): the buffer type (default the
+                device's buffer_type).
+            formats (iterable): the formats of the device, if already known
+                (e.g., from a :class:`V4l2FormatCache`). If None, they are
+                queried (default None).
+
+        Returns:
+            the number of added rows.
+        """
+        if formats is None:
+            if buffer_type is None:
+                buffer_type = device.buffer_type
+            formats = device.iter_buffer_formats(buffer_type)
+
+        device_idx = len(self._devices)
+        self._devices.append(str(device.device))
+        rows = list(self._iter_rows(formats))
+        columns = self._columns
+        columns["device"].extend([device_idx] * len(rows))
+        for name, values in zip(V4l2ModeRow._fields[1:], zip(*rows)):
+            columns[name].extend(values)
+        return len(rows)
+
+    @staticmethod
+    def _iter_rows(formats):
+        for fmt in formats:
+            fourcc = fmt.pixel_format
+            for size in fmt.sizes():
+                if size.type == V4l2FrameSizeTypes.DISCRETE:
+                    corners = [(size.width, size.height, size.intervals())]
+                else:
+                    corners = [(width, height,
+                                size.closest_intervals(width, height))
+                               for width, height in {size.grid[0],
+                                                     size.grid[-1]}]
+                for width, height, intervals in sorted(corners,
+                                                       key=lambda c: c[:2]):
+                    for ival in intervals:
+                        if ival.type == V4l2FrameIvalTypes.DISCRETE:
+                            fractions = [ival.interval]
+                        else:
+                            fractions = ival.interval[:2]
+                        for fraction in fractions:
+                            yield (fourcc, width, height,
+                                   fraction.numerator,
+                                   fraction.denominator)
+
+    ###########################################################################
+    # Export.
+    ###########################################################################
+    def to_numpy(self):
+        """Return the table as a NumPy structured array.
+
+        The fields are named like the columns (see :class:`V4l2ModeRow`).
+
+        Note:
+            This requires NumPy.
+        """
+        import numpy
+
+        dtype = [(name, numpy.dtype(typecode))
+                 for name, typecode in self.columns]
+        result = numpy.empty(len(self), dtype=dtype)
+        if not len(self):
+            return result
+        for name, typecode in self.columns:
+            result[name] = numpy.frombuffer(self._columns[name],
+                                            dtype=typecode)
+        return result
+
+    def __repr__(self):
+        return "<V4l2ModeTable object with {} modes of {} devices>".format(
+            len(self), len(self._devices))
@@ -0,0 +1,276 @@
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from .ioctls import V4l2FrameSizeTypes, V4l2FrameIvalTypes
+from .v4l2types import V4l2Area, V4l2Fraction
+from collections import namedtuple
+from fractions import Fraction
+from math import ceil, floor, inf
+
+
+#: The result of a negotiation: the :class:`V4l2Format`, the size as a
+#: :class:`V4l2Area` and the frame interval as a :class:`V4l2Fraction` of
+#: seconds.
+V4l2Mode = namedtuple("V4l2Mode", ["format", "size", "interval"])
+
+
+def _limit_axis(axis, minimum, maximum):
+    # The part of the range within [minimum, maximum].
+    first = max(0, ceil((minimum - axis.start) / axis.step))
+    if maximum is None:
+        return axis[first:]
+    last = floor((maximum - axis.start) / axis.step)
+    return axis[first:last + 1]
+
+
+class V4l2ModeNegotiator(object):
+    """Find the best mode (format, size and interval) of a device.
+
+    The format/size/interval tree of the device is searched depth-first.
+    Branches which can't beat the best mode found so far are skipped before
+    their sizes or intervals are queried. Every subtree is queried only once
+    and memoized, so repeated negotiations with different constraints are
+    cheap.
+
+    Keyword arguments:
+        device (V4l2Device): the device.
+        formats (iterable): the formats of the device's buffer type, if
+            already known (e.g., from a :class:`V4l2FormatCache`). If None,
+            they are queried on demand (default None).
+
+    Example:
+        The highest frame rate at 720p or more in YUYV or MJPEG::
+
+            mode = V4l2ModeNegotiator(device).negotiate(
+                formats=[V4l2Formats.YUYV, V4l2Formats.MJPEG],
+                min_width=1280,
+                min_height=720,
+                )
+    """
+    #: The supported preferences.
+    preferences = ("fps", "resolution")
+
+    def __init__(self, device, formats=None):
+        self._device = device
+        self._formats = {}
+        if formats is not None:
+            self._formats[device.buffer_type] = list(formats)
+        self._sizes = {}
+        self._intervals = {}
+
+    @property
+    def device(self):
+        """The device (read-only)."""
+        return self._device
+
+    def clear(self):
+        """Forget all memoized formats, sizes and intervals."""
+        self._formats.clear()
+        self._sizes.clear()
+        self._intervals.clear()
+
+    ###########################################################################
+    # Memoized subtrees.
+    ###########################################################################
+    def _get_formats(self, buffer_type):
+        try:
+            return self._formats[buffer_type]
+        except KeyError:
+            formats = list(self._device.iter_buffer_formats(buffer_type))
+            self._formats[buffer_type] = formats
+            return formats
+
+    def _get_sizes(self, buffer_type, fmt):
+        key = (buffer_type, fmt.pixel_format)
+        try:
+            return self._sizes[key]
+        except KeyError:
+            sizes = list(fmt.sizes())
+            self._sizes[key] = sizes
+            return sizes
+
+    def _get_intervals(self, buffer_type, size, width, height):
+        key = (buffer_type, size.pixel_format, width, height)
+        try:
+            return self._intervals[key]
+        except KeyError:
+            if size.type == V4l2FrameSizeTypes.DISCRETE:
+                intervals = list(size.intervals())
+            else:
+                intervals = list(size.closest_intervals(width, height))
+            self._intervals[key] = intervals
+            return intervals
+
+    ###########################################################################
+    # Negotiation.
+    ###########################################################################
+    @staticmethod
+    def _candidate_sizes(size, min_width, min_height, max_width, max_height,
+                         prefer):
+        if size.type == V4l2FrameSizeTypes.DISCRETE:
+            width, height = size.width, size.height
+            if (width >= min_width and height >= min_height and
+                    (max_width is None or width <= max_width) and
+                    (max_height is None or height <= max_height)):
+                return [(width, height)]
+            return []
+
+        grid = size.grid
+        widths = _limit_axis(grid.widths, min_width, max_width)
+        heights = _limit_axis(grid.heights, min_height, max_height)
+        if not widths or not heights:
+            return []
+        largest = (widths[-1], heights[-1])
+        smallest = (widths[0], heights[0])
+        if prefer == "resolution" or largest == smallest:
+            return [largest]
+        # The frame rate usually depends on the size, but querying every size
+        # is out of the question, so try both ends.
+        return [largest, smallest]
+
+    @staticmethod
+    def _shortest_interval(intervals, min_fps, max_fps):
+        # The shortest interval (i.e., the highest frame rate) within limits.
+        shortest_allowed = 0 if max_fps is None else 1 / Fraction(max_fps)
+        longest_allowed = None if min_fps is None else 1 / Fraction(min_fps)
+
+        best = None
+        for ival in intervals:
+            if ival.type == V4l2FrameIvalTypes.DISCRETE:
+                interval = ival.interval
+            else:
+                minimum, maximum, step = ival.interval
+                interval = max(minimum, shortest_allowed)
+                if step and interval > minimum:
+                    # Round up to the next step.
+                    steps = ceil((interval - minimum) / step)
+                    interval = minimum + steps * step
+                if interval > maximum:
+                    continue
+                if type(interval) is not V4l2Fraction:
+                    interval = V4l2Fraction(interval.numerator,
+                                            interval.denominator)
+            # Drivers may report 0/0 for unknown intervals.
+            if (not interval.denominator or interval <= 0 or
+                    interval < shortest_allowed or
+                    (longest_allowed is not None and
+                     interval > longest_allowed)):
+                continue
+            if best is None or interval < best:
+                best = interval
+        return best
+
+    def negotiate(self, formats=None, min_width=0, min_height=0,
+                  max_width=None, max_height=None, min_fps=None, max_fps=None,
+                  prefer="fps", buffer_type=None):
+        """Find the best mode within the given constraints.
+
+        Keyword arguments:
+            formats (list): the acceptable pixel formats (see
+                :class:`V4l2Formats`), the first one being the most preferred.
+                If None, all formats are acceptable (default None).
+            min_width (int): the minimum width (default 0).
+            min_height (int): the minimum height (default 0).
+            max_width (int): the maximum width or None (default None).
+            max_height (int): the maximum height or None (default None).
+            min_fps (number): the minimum frame rate or None (default None).
+            max_fps (number): the maximum frame rate or None (default None).
+            prefer (str): "fps" prefers the highest frame rate, then the
+                highest resolution. "resolution" prefers the highest
+                resolution, then the highest frame rate. Ties are decided by
+                the order of formats (default "fps").
+            buffer_type (V4l2BufferType): the buffer type (default the
+                device's buffer_type).
+
+        Returns:
+            a :class:`V4l2Mode` or None, if no mode fulfills the constraints.
+        """
+        if prefer not in self.preferences:
+            raise ValueError("prefer must be one of " + str(self.preferences))
+        if buffer_type is None:
+            buffer_type = self._device.buffer_type
+
+        if prefer == "fps":
+            def make_key(fps, area, rank):
+                return (fps, area, rank)
+        else:
+            def make_key(fps, area, rank):
+                return (area, fps, rank)
+
+        if formats is None:
+            ranks = None
+        else:
+            # Earlier formats rank higher.
+            ranks = {int(fmt): -idx for idx, fmt in enumerate(formats)}
+
+        # The best possible values of branches which have not been queried yet.
+        fps_bound = inf if max_fps is None else max_fps
+        if max_width is None or max_height is None:
+            area_bound = inf
+        else:
+            area_bound = max_width * max_height
+
+        candidate_formats = []
+        for fmt in self._get_formats(buffer_type):
+            pixel_format = fmt.pixel_format
+            if ranks is None:
+                candidate_formats.append((0, fmt))
+            elif pixel_format in ranks:
+                candidate_formats.append((ranks[pixel_format], fmt))
+        # Search the preferred formats first, they win ties.
+        candidate_formats.sort(key=lambda candidate: -candidate[0])
+
+        best = None
+        best_key = None
+        for rank, fmt in candidate_formats:
+            if (best_key is not None and
+                    make_key(fps_bound, area_bound, rank) <= best_key):
+                continue
+
+            # Search the biggest sizes first, the smaller ones can often be
+            # skipped then.
+            candidate_sizes = [(width * height, width, height, size)
+                               for size in self._get_sizes(buffer_type, fmt)
+                               for width, height in self._candidate_sizes(
+                                   size,
+                                   min_width,
+                                   min_height,
+                                   max_width,
+                                   max_height,
+                                   prefer)]
+            candidate_sizes.sort(key=lambda candidate: -candidate[0])
+
+            for area, width, height, size in candidate_sizes:
+                if (best_key is not None and
+                        make_key(fps_bound, area, rank) <= best_key):
+                    continue
+
+                interval = self._shortest_interval(
+                    self._get_intervals(buffer_type, size, width, height),
+                    min_fps,
+                    max_fps)
+                if interval is None:
+                    continue
+
+                key = make_key(interval.reciprocal, area, rank)
+                if best_key is None or key > best_key:
+                    best_key = key
+                    best = V4l2Mode(fmt, V4l2Area(width, height), interval)
+        return best
+
+    def __repr__(self):
+        return "<V4l2ModeNegotiator object for '{}'>".format(
+            self._device.device)
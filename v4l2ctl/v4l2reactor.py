@@ -0,0 +1,212 @@
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+import os
+import select
+
+
+class V4l2CaptureReactor(object):
+    """Capture from many streams in one thread.
+
+    The device files of the registered streams are watched by a single epoll
+    object. Every :meth:`poll` waits once and dequeues the ready frames of
+    every ready stream (up to the stream's batch size), so one thread serves
+    all devices with one wakeup per batch of ready devices.
+
+    Frames of streams registered with a callback are passed to it, and
+    released once it returns. The other frames are returned by :meth:`poll`;
+    they are tagged with their source (see
+    :attr:`V4l2CapturedFrame.device`) and must be released by the consumer.
+
+    Streams which were stopped, or whose device file reports an error or a
+    hang-up (e.g., it was unplugged), are unregistered by :meth:`poll`.
+    Otherwise, their device files would be reported ready over and over.
+    The dropped_callback is called with every such stream, e.g., to restart
+    it or to tell the user that the device is gone.
+
+    Keyword arguments:
+        dropped_callback (callable): called with every stream unregistered by
+            :meth:`poll` (default None).
+
+    Example:
+        Capture from all devices::
+
+            streams = [device.stream() for device in devices]
+            with V4l2CaptureReactor() as reactor:
+                for stream in streams:
+                    stream.start()
+                    reactor.register(stream)
+                while True:
+                    for frame in reactor.poll():
+                        with frame:
+                            process(frame.device, frame.data)
+    """
+    def __init__(self, dropped_callback=None):
+        self._dropped_callback = dropped_callback
+        self._epoll = select.epoll()
+        # The registered streams by file descriptor: (stream, callback,
+        # batch size, the descriptor's original blocking mode).
+        self._streams = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def fileno(self):
+        """The file descriptor of the epoll object, which is readable when a
+        registered stream is ready, e.g., to nest the reactor in an event
+        loop."""
+        return self._epoll.fileno()
+
+    @property
+    def closed(self):
+        """If the reactor is closed (read-only)."""
+        return self._epoll.closed
+
+    def close(self):
+        """Unregister all streams and close the reactor.
+
+        The streams themselves keep running.
+        """
+        for stream, _, _, _ in list(self._streams.values()):
+            self.unregister(stream)
+        self._epoll.close()
+
+    ###########################################################################
+    # Registration.
+    ###########################################################################
+    @property
+    def streams(self):
+        """The registered streams (read-only)."""
+        return tuple(stream for stream, _, _, _ in self._streams.values())
+
+    def __len__(self):
+        return len(self._streams)
+
+    def register(self, stream, callback=None, batch_size=1):
+        """Watch a running stream.
+
+        The device file is made non-blocking while registered.
+
+        Keyword arguments:
+            stream (V4l2Stream): the stream.
+            callback (callable): called with every frame of this stream, which
+                is released once the callback returns. If None, the frames are
+                returned by :meth:`poll` (default None).
+            batch_size (int): the maximum number of frames dequeued from this
+                stream per :meth:`poll` (see :meth:`V4l2Stream.drain`)
+                (default 1).
+
+        Raises:
+            ValueError: if the stream is not running or its device file is
+                already registered.
+        """
+        if not stream.streaming:
+            raise ValueError("The stream is not running.")
+        if batch_size < 1:
+            raise ValueError("The batch size must be at least 1.")
+        fd = stream.device.fileno()
+        if fd in self._streams:
+            raise ValueError("The device file of {!r} is already "
+                             "registered.".format(stream))
+        self._epoll.register(fd, select.EPOLLIN)
+        self._streams[fd] = (stream, callback, batch_size,
+                             os.get_blocking(fd))
+        os.set_blocking(fd, False)
+
+    def unregister(self, stream):
+        """Stop watching a stream.
+
+        Raises:
+            KeyError: if the stream is not registered.
+        """
+        for fd, (registered, _, _, _) in self._streams.items():
+            if registered is stream:
+                break
+        else:
+            raise KeyError(stream)
+        self._remove(fd)
+
+    def _remove(self, fd):
+        stream, _, _, blocking = self._streams.pop(fd)
+        try:
+            self._epoll.unregister(fd)
+            # Once stopped, the descriptor may be closed (or even reused).
+            if stream.streaming:
+                os.set_blocking(fd, blocking)
+        except OSError:
+            # The device file was closed in the meantime, which also removed
+            # it from the epoll object.
+            pass
+
+    ###########################################################################
+    # Capturing.
+    ###########################################################################
+    def poll(self, timeout=None, max_events=-1):
+        """Wait for ready streams and dequeue their ready frames.
+
+        Keyword arguments:
+            timeout (float): maximum time to wait in seconds. None waits
+                forever (default None).
+            max_events (int): the maximum number of streams to serve in this
+                call, -1 for all ready ones (default -1).
+
+        Returns:
+            a list of the dequeued :class:`V4l2CapturedFrame` of the streams
+            without a callback, empty if timed out.
+
+        Note:
+            If dequeueing or a callback (including the dropped_callback)
+            raises an exception, the frames dequeued by this call so far are
+            released before it propagates.
+        """
+        if timeout is None:
+            timeout = -1
+        frames = []
+        try:
+            for fd, events in self._epoll.poll(timeout, max_events):
+                stream, callback, batch_size, _ = self._streams[fd]
+                if (not stream.streaming or
+                        events & (select.EPOLLERR | select.EPOLLHUP)):
+                    # E.g., vb2 reports EPOLLERR while not streaming.
+                    self._remove(fd)
+                    if self._dropped_callback is not None:
+                        self._dropped_callback(stream)
+                    continue
+                batch = stream.drain(batch_size)
+                if callback is None:
+                    frames.extend(batch)
+                    continue
+                for idx, frame in enumerate(batch):
+                    try:
+                        callback(frame)
+                    except BaseException:
+                        for unhandled in batch[idx:]:
+                            unhandled.release()
+                        raise
+                    frame.release()
+        except BaseException:
+            # The buffers would be lost for good.
+            for frame in frames:
+                frame.release()
+            raise
+        return frames
+
+    def __repr__(self):
+        return "<V4l2CaptureReactor object with {} streams>".format(
+            len(self._streams))
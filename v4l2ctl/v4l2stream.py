@@ -0,0 +1,955 @@
+###############################################################################
+# Copyright 2020, Michael Israel
+#
+# Licensed under the EUPL, Version 1.1 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl5
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+###############################################################################
+from .ioctls import V4l2BufferType, V4l2Memory, V4l2BufferFlags, \
+                   IoctlError, IoctlWouldBlock
+from .ioctls.v4l2ioctlstructs import V4l2IoctlBuffer, V4l2IoctlPlane, \
+                                    VIDEO_MAX_PLANES
+from .v4l2types import _MPLANE_BUFFER_TYPES
+from .v4l2device import FeatureNotSupported
+from collections import namedtuple, deque
+from threading import Lock
+from time import monotonic
+import ctypes
+import select
+import mmap
+import os
+
+
+#: The batch statistics of a stream (see
+#: :attr:`V4l2Stream.batch_statistics`): the number of non-empty batches, the
+#: number of frames in them, the number of batches of more than one frame
+#: and the size of the largest batch.
+V4l2BatchStatistics = namedtuple("V4l2BatchStatistics", [
+    "batches", "frames", "multi_frame_batches", "largest"])
+
+#: The statistics of a stream (see :attr:`V4l2Stream.statistics`):
+#:
+#: * frames: the number of dequeued frames.
+#: * errors: the number of frames flagged with :attr:`V4l2BufferFlags.ERROR`.
+#: * sequence_gaps: the number of gaps in the sequence numbers, i.e., how
+#:   often the driver dropped frames.
+#: * lost_frames: the number of frames missing in these gaps.
+#: * fps: the effective frame rate according to the driver's timestamps.
+#: * jitter_p50, jitter_p95, jitter_p99: percentiles of the deviation of the
+#:   intervals between recent frames from their mean, in seconds.
+V4l2StreamStatistics = namedtuple("V4l2StreamStatistics", [
+    "frames", "errors", "sequence_gaps", "lost_frames", "fps",
+    "jitter_p50", "jitter_p95", "jitter_p99"])
+
+_ERROR_FLAG = V4l2BufferFlags.ERROR
+
+# The user pointers must start at a page boundary.
+_PAGE_SIZE = mmap.PAGESIZE
+
+
+#: A plane of a :class:`V4l2CapturedFrame`. The data is a zero-copy view of
+#: the payload, which starts data_offset bytes into the plane's buffer. As
+#: reported by the driver, bytesused includes the data_offset.
+V4l2FramePlane = namedtuple("V4l2FramePlane", ["data", "bytesused",
+                                               "data_offset"])
+
+
+class V4l2CapturedFrame(object):
+    """A frame dequeued from a streaming capture.
+
+    The frame data is a zero-copy view over the driver's buffer. It is only
+    valid until the frame is released, after which the buffer is handed back
+    to the driver to be filled again.
+
+    A frame of a multi-planar buffer type has one view per plane (see
+    :attr:`planes`), e.g., separate Y and UV planes of NV12M. Its data and
+    bytesused refer to the first plane.
+
+    Example:
+        Use the frame as a context manager to release it automatically::
+
+            with stream.dequeue() as frame:
+                process(frame.data)
+    """
+    def __init__(self, stream, index, data, bytesused, planes=None,
+                 sequence=0, timestamp=0.0, flags=0, field=0):
+        self._stream = stream
+        self._index = index
+        self._data = data
+        self._bytesused = bytesused
+        self._planes = planes
+        self._sequence = sequence
+        self._timestamp = timestamp
+        self._flags = flags
+        self._field = field
+
+    @property
+    def stream(self):
+        """The stream this frame was captured by (read-only)."""
+        return self._stream
+
+    @property
+    def device(self):
+        """The device this frame was captured from (read-only)."""
+        return self._stream.device
+
+    @property
+    def index(self):
+        """The index of the driver's buffer holding this frame (read-only)."""
+        return self._index
+
+    @property
+    def data(self):
+        """The frame data as a memoryview (read-only)."""
+        if self._data is None:
+            raise ValueError("The frame has already been released.")
+        return self._data
+
+    @property
+    def bytesused(self):
+        """The number of bytes occupied by the frame data (read-only)."""
+        return self._bytesused
+
+    @property
+    def sequence(self):
+        """The sequence number of the frame, counted by the driver. Gaps mean
+        the driver dropped frames (read-only)."""
+        return self._sequence
+
+    @property
+    def timestamp(self):
+        """The driver's timestamp of the frame in seconds, usually of the
+        monotonic clock (see :attr:`flags`) (read-only)."""
+        return self._timestamp
+
+    @property
+    def flags(self):
+        """The buffer flags (see :class:`V4l2BufferFlags`) (read-only)."""
+        return V4l2BufferFlags(self._flags)
+
+    @property
+    def field(self):
+        """The field order of the frame as an int (see :class:`V4l2Field`)
+        (read-only)."""
+        return self._field
+
+    @property
+    def planes(self):
+        """The planes of the frame as a tuple of :class:`V4l2FramePlane`
+        (read-only). A single-planar frame has one plane."""
+        if self._data is None:
+            raise ValueError("The frame has already been released.")
+        if self._planes is None:
+            self._planes = (V4l2FramePlane(self._data, self._bytesused, 0),)
+        return self._planes
+
+    @property
+    def dmabuf_fds(self):
+        """The DMABUF file descriptors of this frame's buffer, one per plane
+        (see :meth:`V4l2MmapStream.export_buffers`) (read-only).
+
+        The descriptors belong to the stream and stay open until it is
+        stopped. Hand them over (e.g., to another process) instead of the
+        data, to avoid copying the frame.
+
+        Raises:
+            FeatureNotSupported: if the stream's buffers can't be exported.
+        """
+        return self._stream.export_buffers()[self._index]
+
+    @property
+    def released(self):
+        """If the frame has been released to the driver (read-only)."""
+        return self._data is None
+
+    def release(self):
+        """Release the frame and hand its buffer back to the driver.
+
+        Releasing an already released frame has no effect.
+        """
+        if self._data is not None:
+            if self._planes is None:
+                views = (self._data,)
+            else:
+                views = [plane.data for plane in self._planes]
+            for view in views:
+                try:
+                    view.release()
+                except BufferError:
+                    # The data is still exported (e.g. to a numpy array). The
+                    # view is dropped anyway and must not be used any more.
+                    pass
+            self._data = None
+            self._planes = None
+            self._stream._requeue(self._index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def __repr__(self):
+        return ("V4l2CapturedFrame(index={idx}, bytesused={used}, "
+                "sequence={seq})").format(idx=self._index,
+                                          used=self._bytesused,
+                                          seq=self._sequence)
+
+
+def _planes_field(planes):
+    # The m field of a buffer pointing to the given plane array.
+    template = V4l2IoctlBuffer()
+    template.m.planes = ctypes.cast(planes, ctypes.POINTER(V4l2IoctlPlane))
+    return template.m
+
+
+def _plane_views(views, planes, count):
+    # The payload views of the planes of a dequeued multi-planar buffer.
+    return tuple(V4l2FramePlane(view[plane.data_offset:plane.bytesused],
+                                plane.bytesused,
+                                plane.data_offset)
+                 for view, plane in zip(views, planes[:count]))
+
+
+class V4l2Stream(object):
+    """The base of the streaming captures (see :class:`V4l2MmapStream` and
+    :class:`V4l2UserPtrStream`).
+
+    Subclasses provide the buffers, this class cycles them between the driver
+    and the application.
+
+    Keyword arguments:
+        device (V4l2Device): the video device to capture from.
+    """
+
+    #: The memory type (see :class:`V4l2Memory`), set by subclasses.
+    _memory = None
+
+    #: The buffer types supported by this stream.
+    buffer_types = []
+
+    #: The number of recent frame intervals the jitter is computed from.
+    statistics_window = 1024
+
+    def __init__(self, device):
+        self._device = device
+        self._ioc_ops = device._ioc_ops
+        self._buffer_type = device.buffer_type
+        # The views of every buffer's planes, indexed like the buffers.
+        self._views = []
+        self._streaming = False
+        # Frames may be released from other threads than the one dequeuing
+        # (see V4l2FrameGrabber), but the queue request has one buffer.
+        self._queue_lock = Lock()
+        self._reset_statistics()
+        fields = {"type": self._buffer_type, "memory": self._memory}
+        queue_fields = fields
+        if self._buffer_type in _MPLANE_BUFFER_TYPES:
+            # The driver reads and writes the plane information through a
+            # pointer to this array, which is part of the precompiled
+            # requests below.
+            self._planes = (V4l2IoctlPlane * VIDEO_MAX_PLANES)()
+            fields.update(m=_planes_field(self._planes),
+                          length=VIDEO_MAX_PLANES)
+            # QBUF writes the plane information back as well, and it may run
+            # in another thread between DQBUF and reading its planes, so it
+            # has an array of its own.
+            self._queue_planes = (V4l2IoctlPlane * VIDEO_MAX_PLANES)()
+            queue_fields = dict(fields, m=_planes_field(self._queue_planes))
+        else:
+            self._planes = None
+        self._buffer_fields = fields
+        # Buffer exchange is the hot path, so precompile its requests.
+        self._queue_buffer = self._ioc_ops.queue_buffer.precompile(
+            **queue_fields)
+        self._dequeue_buffer = self._ioc_ops.dequeue_buffer.precompile(
+            **fields)
+
+    ###########################################################################
+    # Stream control.
+    ###########################################################################
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def device(self):
+        """The device being streamed from (read-only)."""
+        return self._device
+
+    @property
+    def streaming(self):
+        """If the stream is running (read-only)."""
+        return self._streaming
+
+    @property
+    def buffer_count(self):
+        """The number of buffers in use (read-only)."""
+        return len(self._views)
+
+    @property
+    def multiplanar(self):
+        """If the buffers are multi-planar (read-only)."""
+        return self._planes is not None
+
+    def start(self):
+        """Set up the buffers, queue them and start streaming."""
+        if self._streaming:
+            return
+
+        # The buffers belong to the open file, so keep it open while
+        # streaming. It must not be shared with other users of the device,
+        # who would own the buffers (and share O_NONBLOCK) as well.
+        self._device._open(private=True)
+        try:
+            self._setup_buffers()
+            for index in range(len(self._views)):
+                self._queue(index)
+            self._ioc_ops.stream_on(value=self._buffer_type)
+        except BaseException:
+            self._release_buffers()
+            self._device.close()
+            raise
+        self._reset_statistics()
+        self._streaming = True
+
+    def stop(self):
+        """Stop streaming and release the buffers.
+
+        Note:
+            Frames still held by the application become invalid.
+        """
+        if not self._streaming:
+            return
+        self._streaming = False
+        try:
+            self._ioc_ops.stream_off(value=self._buffer_type)
+        finally:
+            self._release_buffers()
+            self._device.close()
+
+    def _reset_statistics(self):
+        self._batches = 0
+        self._batched_frames = 0
+        self._multi_frame_batches = 0
+        self._largest_batch = 0
+        self._frames = 0
+        self._errors = 0
+        self._sequence_gaps = 0
+        self._lost_frames = 0
+        self._last_sequence = None
+        self._timed_frames = 0
+        self._first_timestamp = 0.0
+        self._last_timestamp = 0.0
+        self._intervals = deque(maxlen=self.statistics_window)
+
+    @property
+    def statistics(self):
+        """The statistics of the frames dequeued since the stream was
+        started, as a :class:`V4l2StreamStatistics` (read-only).
+
+        Sequence gaps count the frames dropped by the driver, e.g., because
+        the application did not hand the buffers back in time.
+        """
+        duration = self._last_timestamp - self._first_timestamp
+        fps = (self._timed_frames - 1) / duration if duration > 0 else 0.0
+        intervals = list(self._intervals)
+        if intervals:
+            mean = sum(intervals) / len(intervals)
+            jitter = sorted(abs(interval - mean) for interval in intervals)
+            percentiles = [jitter[min(len(jitter) - 1,
+                                      int(percent * len(jitter)))]
+                           for percent in (0.5, 0.95, 0.99)]
+        else:
+            percentiles = [0.0, 0.0, 0.0]
+        return V4l2StreamStatistics(self._frames,
+                                    self._errors,
+                                    self._sequence_gaps,
+                                    self._lost_frames,
+                                    fps,
+                                    *percentiles)
+
+    def _account(self, sequence, timestamp, flags):
+        # Update the statistics with a dequeued buffer.
+        self._frames += 1
+        if flags & _ERROR_FLAG:
+            self._errors += 1
+        last_sequence = self._last_sequence
+        if last_sequence is not None and sequence > last_sequence + 1:
+            self._sequence_gaps += 1
+            self._lost_frames += sequence - last_sequence - 1
+        self._last_sequence = sequence
+        if timestamp:
+            if self._timed_frames:
+                self._intervals.append(timestamp - self._last_timestamp)
+            else:
+                self._first_timestamp = timestamp
+            self._last_timestamp = timestamp
+            self._timed_frames += 1
+
+    @property
+    def batch_statistics(self):
+        """The statistics of the batches dequeued by :meth:`drain` since the
+        stream was started, as a :class:`V4l2BatchStatistics` (read-only).
+
+        Batches of more than one frame mean the consumer fell behind the
+        driver.
+        """
+        return V4l2BatchStatistics(self._batches,
+                                   self._batched_frames,
+                                   self._multi_frame_batches,
+                                   self._largest_batch)
+
+    def _setup_buffers(self):
+        # Request the buffers from the driver and fill self._views.
+        raise NotImplementedError
+
+    def _release_buffers(self):
+        # Undo _setup_buffers, also if it failed halfway.
+        raise NotImplementedError
+
+    def _request_buffers(self, count):
+        req = self._ioc_ops.request_buffers(count=count,
+                                            type=self._buffer_type,
+                                            memory=self._memory)
+        if req.count == 0:
+            raise IoctlError(self._device.device,
+                             self._ioc_ops.request_buffers.name,
+                             self._ioc_ops.request_buffers.code,
+                             0,
+                             "The driver did not grant any buffers.")
+        return req.count
+
+    def _free_buffers(self):
+        try:
+            self._ioc_ops.request_buffers(count=0,
+                                          type=self._buffer_type,
+                                          memory=self._memory)
+        except IoctlError:
+            # Buffers which are still mapped can't be freed, they will be
+            # freed anyway when the device is closed.
+            pass
+
+    ###########################################################################
+    # Buffer exchange.
+    ###########################################################################
+    def _queue(self, index):
+        self._queue_buffer(index=index)
+
+    def _requeue(self, index):
+        # Frames released after the stream was stopped have no buffer to
+        # return to.
+        with self._queue_lock:
+            if self._streaming:
+                self._queue(index)
+
+    def dequeue(self, timeout=None):
+        """Dequeue the next filled buffer.
+
+        Keyword arguments:
+            timeout (float): maximum time to wait in seconds. None waits
+                forever (default None).
+
+        Returns:
+            a :class:`V4l2CapturedFrame` or None if timed out.
+        """
+        if not self._streaming:
+            raise ValueError("The stream is not running.")
+
+        fd = self._device.fileno()
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            ready, _, _ = select.select((fd,), (), (), timeout)
+            if not ready:
+                return None
+            try:
+                return self._make_frame(self._dequeue_buffer())
+            except IoctlWouldBlock:
+                # The device file is non-blocking, and the buffer was gone
+                # when dequeuing it (e.g., taken by another thread).
+                pass
+            if deadline is not None:
+                timeout = max(deadline - monotonic(), 0)
+
+    def try_dequeue(self):
+        """Dequeue the next filled buffer, if there is one.
+
+        Note:
+            This never waits, since the device file is non-blocking (see
+            :class:`~v4l2ctl.utils.fdpool.FdPool`), unless it was made
+            blocking by the application.
+
+        Returns:
+            a :class:`V4l2CapturedFrame` or None if no buffer is ready.
+        """
+        if not self._streaming:
+            raise ValueError("The stream is not running.")
+        try:
+            buf = self._dequeue_buffer()
+        except IoctlWouldBlock:
+            return None
+        return self._make_frame(buf)
+
+    def _make_frame(self, buf):
+        views = self._views[buf.index]
+        sequence = buf.sequence
+        timestamp = buf.timestamp.tv_sec + buf.timestamp.tv_usec / 1e6
+        flags = buf.flags
+        self._account(sequence, timestamp, flags)
+        if self._planes is None:
+            return V4l2CapturedFrame(self,
+                                     buf.index,
+                                     views[0][:buf.bytesused],
+                                     buf.bytesused,
+                                     None,
+                                     sequence,
+                                     timestamp,
+                                     flags,
+                                     buf.field,
+                                     )
+        planes = _plane_views(views, self._planes, buf.length)
+        return V4l2CapturedFrame(self,
+                                 buf.index,
+                                 planes[0].data,
+                                 planes[0].bytesused,
+                                 planes,
+                                 sequence,
+                                 timestamp,
+                                 flags,
+                                 buf.field,
+                                 )
+
+    def __iter__(self):
+        """Iterate over the captured frames.
+
+        Every frame is released automatically when the next one is requested,
+        unless it was already released by the consumer.
+        """
+        frame = None
+        try:
+            while self._streaming:
+                if frame is not None:
+                    frame.release()
+                frame = self.dequeue()
+                yield frame
+        finally:
+            if frame is not None and self._streaming:
+                frame.release()
+
+    def drain(self, max_frames):
+        """Dequeue all ready buffers without waiting, up to max_frames.
+
+        Note:
+            The device file must be non-blocking (see :meth:`iter_batches`).
+
+        Returns:
+            a list of :class:`V4l2CapturedFrame`, empty if no buffer is ready.
+        """
+        frames = []
+        while len(frames) < max_frames:
+            frame = self.try_dequeue()
+            if frame is None:
+                break
+            frames.append(frame)
+        count = len(frames)
+        if count:
+            self._batches += 1
+            self._batched_frames += count
+            if count > 1:
+                self._multi_frame_batches += 1
+            if count > self._largest_batch:
+                self._largest_batch = count
+        return frames
+
+    def iter_batches(self, batch_size=None, timeout=None):
+        """Iterate over batches of captured frames.
+
+        Every time the device becomes readable, all ready buffers are
+        dequeued in one go (see :meth:`drain`), which saves waiting for each
+        of them when the consumer fell behind. The device file is made
+        non-blocking while iterating.
+
+        Every batch is released automatically when the next one is requested,
+        except the frames already released by the consumer.
+
+        Keyword arguments:
+            batch_size (int): the maximum number of frames per batch, None for
+                as many as there are buffers (default None).
+            timeout (float): maximum time to wait for a batch in seconds.
+                None waits forever (default None).
+
+        Returns:
+            a generator of lists of :class:`V4l2CapturedFrame`. A batch is
+            empty if timed out.
+        """
+        if batch_size is None:
+            batch_size = len(self._views)
+        if batch_size < 1:
+            raise ValueError("The batch size must be at least 1.")
+        fd = self._device.fileno()
+        blocking = os.get_blocking(fd)
+        os.set_blocking(fd, False)
+        batch = []
+        try:
+            while self._streaming:
+                for frame in batch:
+                    frame.release()
+                ready, _, _ = select.select((fd,), (), (), timeout)
+                batch = self.drain(batch_size) if ready else []
+                if batch or not ready:
+                    yield batch
+        finally:
+            # Once stopped, the descriptor may be closed (or even reused).
+            if self._streaming:
+                os.set_blocking(fd, blocking)
+                for frame in batch:
+                    frame.release()
+
+    async def aiter_frames(self):
+        """Iterate asynchronously over the captured frames.
+
+        While no buffer is ready, the device file is watched by the running
+        event loop (see loop.add_reader()), and buffers are only dequeued once
+        it is readable, so one event loop can serve many devices. The device
+        file is made non-blocking while iterating.
+
+        Like :meth:`__iter__`, every frame is released automatically when the
+        next one is requested, unless it was already released by the
+        consumer.
+
+        Example:
+            Capture in a coroutine::
+
+                with device.stream() as stream:
+                    async for frame in stream.aiter_frames():
+                        await process(frame.data)
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        fd = self._device.fileno()
+        readable = asyncio.Event()
+        blocking = os.get_blocking(fd)
+        os.set_blocking(fd, False)
+        frame = None
+        try:
+            while self._streaming:
+                if frame is not None:
+                    frame.release()
+                frame = self.try_dequeue()
+                if frame is None:
+                    # The reader is level-triggered, so it is only registered
+                    # while waiting. Otherwise, it would be called over and
+                    # over while the consumer holds a frame and the next
+                    # buffer is ready.
+                    readable.clear()
+                    loop.add_reader(fd, readable.set)
+                    try:
+                        await readable.wait()
+                    finally:
+                        loop.remove_reader(fd)
+                    continue
+                yield frame
+        finally:
+            # Once stopped, the descriptor may be closed (or even reused).
+            if self._streaming:
+                os.set_blocking(fd, blocking)
+                if frame is not None:
+                    frame.release()
+
+    def export_buffers(self, flags=os.O_RDONLY | os.O_CLOEXEC):
+        """Export the buffers as DMABUF file descriptors (see
+        :meth:`V4l2MmapStream.export_buffers`).
+
+        Raises:
+            FeatureNotSupported: if the buffers are not allocated by the
+                driver, e.g., for a :class:`V4l2UserPtrStream`.
+        """
+        raise FeatureNotSupported(
+            "Only buffers allocated by the driver can be exported, not " +
+            self._memory.name + " buffers.")
+
+    def __repr__(self):
+        return "<{} object for '{}'>".format(type(self).__name__,
+                                             self._device.device)
+
+
+class V4l2MmapStream(V4l2Stream):
+    """A memory-mapped streaming capture.
+
+    The driver's buffers are requested and mapped once when the stream is
+    started. Afterwards, they are only cycled between the driver and the
+    application, i.e., frames are never copied.
+
+    Keyword arguments:
+        device (V4l2Device): the video device to capture from.
+        buffer_count (int): the number of buffers to request (default 4).
+            The driver may grant a different number.
+
+    Multi-planar buffers are supported as well: every plane is mapped on its
+    own, and the frames have one view per plane (see
+    :attr:`V4l2CapturedFrame.planes`).
+
+    Example:
+        Capture 100 frames::
+
+            with device.stream() as stream:
+                for frame, _ in zip(stream, range(100)):
+                    process(frame.data)
+    """
+
+    _memory = V4l2Memory.MMAP
+
+    #: The buffer types supported by this stream.
+    buffer_types = [V4l2BufferType.VIDEO_CAPTURE,
+                    V4l2BufferType.VIDEO_CAPTURE_MPLANE,
+                    V4l2BufferType.VBI_CAPTURE,
+                    V4l2BufferType.SLICED_VBI_CAPTURE,
+                    V4l2BufferType.SDR_CAPTURE,
+                    V4l2BufferType.META_CAPTURE,
+                    ]
+
+    def __init__(self, device, buffer_count=4):
+        super().__init__(device)
+        self._requested_count = buffer_count
+        self._maps = []
+        self._dmabuf_fds = None
+
+    def _setup_buffers(self):
+        count = self._request_buffers(self._requested_count)
+        fd = self._device.fileno()
+        for index in range(count):
+            buf = self._ioc_ops.query_buffer(index=index,
+                                             **self._buffer_fields)
+            if self._planes is None:
+                # The length and offset of the one and only plane.
+                planes = [(buf.length, buf.m.offset)]
+            else:
+                # The driver reports the number of planes in length.
+                planes = [(plane.length, plane.m.mem_offset)
+                          for plane in self._planes[:buf.length]]
+            mappings = tuple(mmap.mmap(fd,
+                                       length,
+                                       mmap.MAP_SHARED,
+                                       mmap.PROT_READ,
+                                       offset=offset,
+                                       )
+                             for length, offset in planes)
+            self._maps.append(mappings)
+            self._views.append(tuple(memoryview(mapping)
+                                     for mapping in mappings))
+
+    def _release_buffers(self):
+        self._close_dmabuf_fds()
+        for views in self._views:
+            for view in views:
+                view.release()
+        for mappings in self._maps:
+            for mapping in mappings:
+                try:
+                    mapping.close()
+                except BufferError:
+                    # A frame is still exported somewhere. The mapping will be
+                    # removed once the last reference to it is gone.
+                    pass
+        self._views = []
+        self._maps = []
+        self._free_buffers()
+
+    ###########################################################################
+    # DMABUF export.
+    ###########################################################################
+    def export_buffers(self, flags=os.O_RDONLY | os.O_CLOEXEC):
+        """Export the buffers as DMABUF file descriptors.
+
+        All buffers are exported once, on the first call. Later calls return
+        the same descriptors, which stay valid until the stream is stopped.
+
+        Keyword arguments:
+            flags (int): the flags of the new file descriptors, only used on
+                the first call (default os.O_RDONLY | os.O_CLOEXEC).
+
+        Returns:
+            a tuple with a tuple of descriptors (one per plane) per buffer,
+            indexed like the buffers (see :attr:`V4l2CapturedFrame.index`).
+        """
+        if self._dmabuf_fds is not None:
+            return self._dmabuf_fds
+        if not self._streaming:
+            raise ValueError("The stream is not running.")
+
+        export_buffer = self._ioc_ops.export_buffer.precompile(
+            type=self._buffer_type, flags=flags)
+        fds = []
+        try:
+            for index, mappings in enumerate(self._maps):
+                plane_fds = []
+                fds.append(plane_fds)
+                for plane in range(len(mappings)):
+                    plane_fds.append(export_buffer(index=index,
+                                                   plane=plane).fd)
+        except BaseException:
+            for plane_fds in fds:
+                for fd in plane_fds:
+                    os.close(fd)
+            raise
+        self._dmabuf_fds = tuple(map(tuple, fds))
+        return self._dmabuf_fds
+
+    def _close_dmabuf_fds(self):
+        if self._dmabuf_fds is not None:
+            for plane_fds in self._dmabuf_fds:
+                for fd in plane_fds:
+                    os.close(fd)
+            self._dmabuf_fds = None
+
+
+def _pin(buffer):
+    # Lock a caller's buffer in place (e.g., a bytearray can't be resized
+    # while exported) and return its address and a byte view of it.
+    try:
+        view = memoryview(buffer).cast("B")
+    except TypeError:
+        raise ValueError("The buffers must be contiguous.") from None
+    if view.readonly:
+        view.release()
+        raise ValueError("The buffers must be writable.")
+    address = ctypes.addressof(ctypes.c_char.from_buffer(view))
+    if address % _PAGE_SIZE:
+        view.release()
+        raise ValueError("The buffers must start at a page boundary "
+                         "(see V4l2UserPtrStream.allocate_buffers()).")
+    return address, view
+
+
+class V4l2UserPtrStream(V4l2Stream):
+    """A streaming capture into buffers owned by the caller (user pointers).
+
+    The driver writes the frames directly into the given buffers, so they
+    land in memory the application already owns, without any copy. The
+    buffers are locked in place while streaming, e.g., a bytearray can't be
+    resized.
+
+    Keyword arguments:
+        device (V4l2Device): the video device to capture from.
+        buffers (iterable): writable, contiguous buffers (e.g., mmap objects,
+            bytearrays or NumPy arrays), each starting at a page boundary and
+            holding at least sizeimage bytes of the active format (see
+            :attr:`V4l2Device.active_format`). The index of a frame is the
+            index of its buffer.
+
+    Raises:
+        ValueError: if a buffer is not writable, not contiguous or not page
+            aligned. Buffers smaller than sizeimage are rejected when the
+            stream is started.
+
+    Note:
+        Only single-planar video capture is supported.
+
+    Example:
+        Capture into page-aligned buffers::
+
+            buffers = V4l2UserPtrStream.allocate_buffers(
+                4, device.active_format.sizeimage)
+            with device.stream(buffers=buffers) as stream:
+                for frame in stream:
+                    process(buffers[frame.index])
+    """
+
+    _memory = V4l2Memory.USERPTR
+
+    #: The buffer types supported by this stream.
+    buffer_types = [V4l2BufferType.VIDEO_CAPTURE]
+
+    def __init__(self, device, buffers):
+        super().__init__(device)
+        self._buffers = list(buffers)
+        if not self._buffers:
+            raise ValueError("At least one buffer is required.")
+        for buffer in self._buffers:
+            _pin(buffer)[1].release()
+        # Every buffer has its own precompiled queue request, holding its
+        # address and length.
+        self._queue_requests = []
+
+    @staticmethod
+    def allocate_buffers(count, size):
+        """Allocate page-aligned buffers for a :class:`V4l2UserPtrStream`.
+
+        Keyword arguments:
+            count (int): the number of buffers.
+            size (int): the minimum size of every buffer in bytes, e.g., the
+                sizeimage of the active format. It is rounded up to whole
+                pages.
+
+        Returns:
+            a list of anonymous mmap objects.
+        """
+        size = -(-size // _PAGE_SIZE) * _PAGE_SIZE
+        return [mmap.mmap(-1, size) for _ in range(count)]
+
+    @property
+    def buffers(self):
+        """The caller's buffers (read-only)."""
+        return tuple(self._buffers)
+
+    def _setup_buffers(self):
+        sizeimage = self._device.active_format.sizeimage
+        pinned = []
+        try:
+            for index, buffer in enumerate(self._buffers):
+                address, view = _pin(buffer)
+                pinned.append((address, view))
+                if view.nbytes < sizeimage:
+                    raise ValueError(
+                        "Buffer {} holds {} bytes, but the format requires "
+                        "{}.".format(index, view.nbytes, sizeimage))
+
+            count = min(self._request_buffers(len(pinned)), len(pinned))
+            for _, view in pinned[count:]:
+                view.release()
+            template = V4l2IoctlBuffer()
+            queue_buffer = self._ioc_ops.queue_buffer
+            for index, (address, view) in enumerate(pinned[:count]):
+                template.m.userptr = address
+                self._queue_requests.append(queue_buffer.precompile(
+                    index=index,
+                    m=template.m,
+                    length=view.nbytes,
+                    **self._buffer_fields))
+                self._views.append((view,))
+        except BaseException:
+            # Unpin the buffers which _release_buffers() does not know of
+            # yet, or the caller's buffers stay locked (e.g., if the driver
+            # does not support user pointers at all).
+            for _, view in pinned[len(self._views):]:
+                view.release()
+            raise
+
+    def _release_buffers(self):
+        for views in self._views:
+            for view in views:
+                try:
+                    view.release()
+                except BufferError:
+                    # A frame is still exported somewhere. The buffer stays
+                    # locked until the last reference to it is gone.
+                    pass
+        self._views = []
+        self._queue_requests = []
+        self._free_buffers()
+
+    def _queue(self, index):
+        self._queue_requests[index]()
@@ -15,15 +15,215 @@
 # limitations under the Licence.
 ###############################################################################
 from fractions import Fraction
+from numbers import Real
+from operator import lt, le, gt, ge, add, sub, mul, truediv
+from math import inf, nan
+import sys
 from dataclasses import dataclass
-from .ioctls.v4l2ioctlstructs import V4l2IoctlRect
+from .ioctls.v4l2ioctlstructs import V4l2IoctlRect, V4l2IoctlFract, \
+                                    V4l2IoctlFormat
+from .ioctls.v4l2ioctlenums import V4l2BufferType
 
 
-class V4l2Fraction(Fraction):
+_HASH_MODULUS = sys.hash_info.modulus
+_HASH_INF = sys.hash_info.inf
+
+# The values of fractions with a zero denominator, by the numerator's sign.
+_ZERO_DENOMINATOR_FLOATS = {1: inf, -1: -inf, 0: nan}
+
+# The buffer types using struct v4l2_pix_format_mplane.
+_MPLANE_BUFFER_TYPES = frozenset((V4l2BufferType.VIDEO_CAPTURE_MPLANE,
+                                  V4l2BufferType.VIDEO_OUTPUT_MPLANE))
+
+
+def _inverse(value):
+    # The modular inverse used for hashing, 0 if there is none.
+    try:
+        return pow(value, -1, _HASH_MODULUS)
+    except ValueError:
+        # Either there is no inverse, or python < 3.8, which doesn't support
+        # negative exponents. The modulus is prime, so Fermat's little
+        # theorem applies.
+        return pow(value, _HASH_MODULUS - 2, _HASH_MODULUS)
+
+
+class V4l2Fraction(object):
+    """A fraction as reported by the driver, e.g., a frame interval.
+
+    Unlike :class:`fractions.Fraction`, the numerator and the denominator are
+    kept as they are, without normalizing them, which makes creating,
+    comparing and hashing cheap. Fractions of the same value are equal and
+    hash alike, also when compared to a Fraction or an int.
+
+    Arithmetic operations return a :class:`fractions.Fraction`.
+
+    Drivers may report a zero denominator, e.g., a 0/0 frame interval when it
+    is unknown. Such fractions behave like the float they convert to: n/0 like
+    infinity (with the sign of n), and 0/0 like NaN, which is unordered and
+    only equal to other 0/0 fractions.
+
+    Keyword arguments:
+        numerator (int): the numerator.
+        denominator (int): the denominator (default 1).
+    """
+    __slots__ = ("_numerator", "_denominator")
+
+    def __init__(self, numerator, denominator=1):
+        self._numerator = numerator
+        self._denominator = denominator
+
     @classmethod
     def _from_v4l2(cls, v4l2_frac):
         return cls(v4l2_frac.numerator, v4l2_frac.denominator)
 
+    def _to_v4l2(self):
+        return V4l2IoctlFract(numerator=self._numerator,
+                              denominator=self._denominator)
+
+    @property
+    def numerator(self):
+        """The numerator (read-only)."""
+        return self._numerator
+
+    @property
+    def denominator(self):
+        """The denominator (read-only)."""
+        return self._denominator
+
+    @property
+    def reciprocal(self):
+        """The reciprocal, e.g., the frame rate of a frame interval
+        (read-only)."""
+        return V4l2Fraction(self._denominator, self._numerator)
+
+    @property
+    def fps(self):
+        """The frame rate of a frame interval in frames per second as a float
+        (read-only)."""
+        if self._numerator == 0:
+            return inf
+        return self._denominator / self._numerator
+
+    def as_fraction(self):
+        """Return the value as a :class:`fractions.Fraction`."""
+        return Fraction(self._numerator, self._denominator)
+
+    def __float__(self):
+        if self._denominator == 0:
+            return _ZERO_DENOMINATOR_FLOATS[(self._numerator > 0) -
+                                            (self._numerator < 0)]
+        return self._numerator / self._denominator
+
+    def __bool__(self):
+        return self._numerator != 0
+
+    ###########################################################################
+    # Comparison.
+    ###########################################################################
+    def __eq__(self, other):
+        if type(other) is V4l2Fraction:
+            if self._denominator and other._denominator:
+                return (self._numerator * other._denominator ==
+                        other._numerator * self._denominator)
+            # Cross-multiplying would make them equal to everything.
+            return (self._denominator == other._denominator == 0 and
+                    (self._numerator > 0) - (self._numerator < 0) ==
+                    (other._numerator > 0) - (other._numerator < 0))
+        if isinstance(other, Real):
+            if self._denominator == 0:
+                return self._numerator != 0 and float(self) == other
+            return self.as_fraction() == other
+        return NotImplemented
+
+    def __hash__(self):
+        # The same hash as the equal Fraction, without normalizing. See
+        # "Hashing of numeric types" in the python documentation.
+        if self._denominator == 0 and self._numerator == 0:
+            # Only equal to other 0/0 fractions.
+            return 0
+        inverse = _inverse(self._denominator)
+        if inverse == 0:
+            hash_value = _HASH_INF
+        else:
+            hash_value = hash(hash(abs(self._numerator)) * inverse)
+        if self._numerator < 0:
+            hash_value = -hash_value
+        return -2 if hash_value == -1 else hash_value
+
+    def _compare(self, other, operator):
+        if type(other) is V4l2Fraction:
+            if self._denominator and other._denominator:
+                # Denominators are unsigned, so the order is kept.
+                return operator(self._numerator * other._denominator,
+                                other._numerator * self._denominator)
+            return operator(float(self), float(other))
+        if isinstance(other, Real):
+            if self._denominator == 0:
+                return operator(float(self), other)
+            return operator(self.as_fraction(), other)
+        return NotImplemented
+
+    def __lt__(self, other):
+        return self._compare(other, lt)
+
+    def __le__(self, other):
+        return self._compare(other, le)
+
+    def __gt__(self, other):
+        return self._compare(other, gt)
+
+    def __ge__(self, other):
+        return self._compare(other, ge)
+
+    ###########################################################################
+    # Arithmetic.
+    ###########################################################################
+    def _operate(self, other, operator, reverse=False):
+        if type(other) is V4l2Fraction:
+            other = other.as_fraction()
+        elif not isinstance(other, Real):
+            return NotImplemented
+        if reverse:
+            return operator(other, self.as_fraction())
+        return operator(self.as_fraction(), other)
+
+    def __add__(self, other):
+        return self._operate(other, add)
+
+    def __radd__(self, other):
+        return self._operate(other, add, True)
+
+    def __sub__(self, other):
+        return self._operate(other, sub)
+
+    def __rsub__(self, other):
+        return self._operate(other, sub, True)
+
+    def __mul__(self, other):
+        return self._operate(other, mul)
+
+    def __rmul__(self, other):
+        return self._operate(other, mul, True)
+
+    def __truediv__(self, other):
+        return self._operate(other, truediv)
+
+    def __rtruediv__(self, other):
+        return self._operate(other, truediv, True)
+
+    def __neg__(self):
+        return -self.as_fraction()
+
+    def __abs__(self):
+        return abs(self.as_fraction())
+
+    def __str__(self):
+        return "{}/{}".format(self._numerator, self._denominator)
+
+    def __repr__(self):
+        return "V4l2Fraction({}, {})".format(self._numerator,
+                                             self._denominator)
+
 
 @dataclass(frozen=True)
 class V4l2Area(object):
@@ -69,3 +269,97 @@ class V4l2CroppingCapabilities:
                    V4l2Rectangle._from_v4l2(v4l2_cropcap.defrect),
                    V4l2Fraction._from_v4l2(v4l2_cropcap.pixelaspect),
                    )
+
+
+@dataclass(frozen=True)
+class V4l2PlaneFormat:
+    sizeimage: int = 0
+    bytesperline: int = 0
+
+
+@dataclass(frozen=True)
+class V4l2DataFormat:
+    """The data format of a video buffer type (see
+    :attr:`V4l2Device.active_format`).
+
+    The same class describes single- and multi-planar formats. A
+    multi-planar format has one :class:`V4l2PlaneFormat` per plane, a
+    single-planar one has none. The enumerated fields (field, colorspace,
+    etc.) are kept as plain ints; 0 lets the driver choose.
+
+    The sizes (bytesperline, sizeimage and the plane formats) are filled in by
+    the driver and may be left out when requesting a format.
+    """
+    pixel_format: int
+    width: int
+    height: int
+    field: int = 0
+    bytesperline: int = 0
+    sizeimage: int = 0
+    colorspace: int = 0
+    flags: int = 0
+    ycbcr_enc: int = 0
+    quantization: int = 0
+    xfer_func: int = 0
+    planes: tuple = ()
+
+    @property
+    def multiplanar(self):
+        """Whether this is a multi-planar format (read-only)."""
+        return bool(self.planes)
+
+    @classmethod
+    def _from_v4l2(cls, v4l2_format):
+        if v4l2_format.type in _MPLANE_BUFFER_TYPES:
+            pix_mp = v4l2_format.fmt.pix_mp
+            planes = tuple(V4l2PlaneFormat(plane.sizeimage, plane.bytesperline)
+                           for plane in pix_mp.plane_fmt[:pix_mp.num_planes])
+            return cls(pix_mp.pixelformat,
+                       pix_mp.width,
+                       pix_mp.height,
+                       pix_mp.field,
+                       planes[0].bytesperline if planes else 0,
+                       sum(plane.sizeimage for plane in planes),
+                       pix_mp.colorspace,
+                       pix_mp.flags,
+                       pix_mp.ycbcr_enc,
+                       pix_mp.quantization,
+                       pix_mp.xfer_func,
+                       planes,
+                       )
+        pix = v4l2_format.fmt.pix
+        return cls(pix.pixelformat,
+                   pix.width,
+                   pix.height,
+                   pix.field,
+                   pix.bytesperline,
+                   pix.sizeimage,
+                   pix.colorspace,
+                   pix.flags,
+                   pix.ycbcr_enc,
+                   pix.quantization,
+                   pix.xfer_func,
+                   )
+
+    def _to_v4l2(self, buffer_type):
+        v4l2_format = V4l2IoctlFormat(type=buffer_type)
+        if buffer_type in _MPLANE_BUFFER_TYPES:
+            pix = v4l2_format.fmt.pix_mp
+            pix.num_planes = len(self.planes)
+            for plane, plane_format in zip(pix.plane_fmt, self.planes):
+                plane.sizeimage = plane_format.sizeimage
+                plane.bytesperline = plane_format.bytesperline
+        else:
+            pix = v4l2_format.fmt.pix
+            pix.bytesperline = self.bytesperline
+            pix.sizeimage = self.sizeimage
+        pix.pixelformat = self.pixel_format
+        pix.width = self.width
+        pix.height = self.height
+        pix.field = self.field
+        pix.colorspace = self.colorspace
+        pix.flags = self.flags
+        pix.ycbcr_enc = self.ycbcr_enc
+        pix.quantization = self.quantization
+        pix.xfer_func = self.xfer_func
+        return v4l2_format